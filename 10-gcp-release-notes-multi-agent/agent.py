@@ -1,9 +1,22 @@
+import os
+
 from google.adk.agents import Agent, SequentialAgent, LlmAgent, ParallelAgent
-from toolbox_core import ToolboxSyncClient
 
-# Load the toolbox client and the toolset for Google Cloud Platform release notes
-toolbox = ToolboxSyncClient("http://127.0.0.1:7000")
-tools = toolbox.load_toolset('my_bq_toolset')
+from adk_common.memoize import memoize_agent
+from adk_common.tool_cache import ToolResultCache, load_cache_policies
+from adk_common.tool_metrics import instrument_agent
+from adk_common.turn_accounting import account_model_calls, account_turns
+from adk_common.tool_results import ResultPaging, parse_rows
+from adk_common.toolbox import PooledToolboxToolset
+from .fanout import ReleaseNotesFanOutAgent
+
+# The toolset for Google Cloud Platform release notes is loaded lazily through a
+# shared, pooled toolbox client (TOOLBOX_URL, default http://127.0.0.1:7000).
+# Query results are cached per tool with the TTLs in tool_cache.json, and large
+# results come back as compact pages grouped by product_name.
+result_cache = ToolResultCache(load_cache_policies(os.path.join(os.path.dirname(__file__), "tool_cache.json")))
+result_paging = ResultPaging(group_by={"search_release_notes_bq": "product_name"}, page_rows=60)
+tools = PooledToolboxToolset('my_bq_toolset', result_cache=result_cache, result_paging=result_paging)
 
 # Note: The two agents are designed to work together, with the first agent retrieving the release notes and the second agent translating them.
 # The first agent can be used to fetch the release notes, and the second agent can be used to translate them into the desired language.
@@ -18,11 +31,12 @@ release_notes_retrieval_agent = LlmAgent(
     instruction=(
         """
         You are a helpful agent who can assist users in retrieving Google Cloud Platform release notes for the specific date. Use the tools provided to fetch the relevant information and include all the records. Do not skip any of the results returned by the tool. Group the results by the product_name.
+        The release notes tool returns its rows already grouped by product_name as a compact table, one page at a time. If the response has more than one page, call read_result_page with its result_id for each remaining page before answering.
         Summarize the release notes for each product in a concise manner, ensuring that the summary is clear and informative. If there are no release notes for a product, indicate that there are no updates available.
         Use the tools to answer the question. If you are unable to find any release notes, inform the user that there are no updates available for that product.
         """
     ),
-    tools=tools,
+    tools=[tools],
     output_key="release_notes",
 )
 
@@ -60,6 +74,9 @@ release_notes_translation_agent_hindi = LlmAgent(
     output_key="translated_release_notes_hindi",
 )
 
+memoize_agent(release_notes_translation_agent_cantonese, inputs=["release_notes"])
+memoize_agent(release_notes_translation_agent_hindi, inputs=["release_notes"])
+
 root_translation_agent = ParallelAgent(
     name="google_release_notes_translation_root_agent",
     sub_agents=[release_notes_translation_agent_cantonese, release_notes_translation_agent_hindi],
@@ -68,10 +85,67 @@ root_translation_agent = ParallelAgent(
     ),
 )
 
-root_agent = SequentialAgent(
+sequential_root_agent = SequentialAgent(
     name="google_release_notes_root_agent",
     sub_agents=[release_notes_retrieval_agent, root_translation_agent],
     description=(
         "Root agent to manage the retrieval and translation of Google Cloud Platform release notes."
     ),
-)
\ No newline at end of file
+)
+
+
+FAN_OUT_AGENT_NAME = "google_release_notes_fan_out_agent"
+
+
+async def fetch_release_notes() -> list[dict]:
+    # Not called by a model, so the tool callbacks do not see it; it is recorded explicitly.
+    return parse_rows(await tools.call("search_release_notes_bq", {}, agent_name=FAN_OUT_AGENT_NAME)) or []
+
+
+# The fan-out pipeline summarizes product batches concurrently and starts translating
+# each batch as soon as its summary is ready. RELEASE_NOTES_PIPELINE=sequential
+# selects the original single-summary pipeline above.
+fan_out_root_agent = ReleaseNotesFanOutAgent(
+    name=FAN_OUT_AGENT_NAME,
+    description=(
+        "Root agent to manage the retrieval and translation of Google Cloud Platform release notes."
+    ),
+    fetch_rows=fetch_release_notes,
+    model="gemini-2.0-flash",
+    summary_instruction=(
+        """
+        You are a helpful agent who summarizes Google Cloud Platform release notes. The release notes below are grouped by product_name.
+        Include all the records. Do not skip any of the rows. For each product, write the product_name as a heading followed by a concise, clear and informative summary of its release notes.
+        """
+    ),
+    translation_instructions={
+        "translated_release_notes_cantonese": (
+            """
+            You are a helpful agent who translates Google Cloud Platform release notes into Cantonese language.
+            Ensure that the translations are accurate and maintain the original meaning of the release notes.
+            Do not translate the product_name, only the release notes.
+            """
+        ),
+        "translated_release_notes_hindi": (
+            """
+            You are a helpful agent who translates Google Cloud Platform release notes into Hindi language.
+            Ensure that the translations are accurate and maintain the original meaning of the release notes.
+            Do not translate the product_name, only the release notes.
+            """
+        ),
+    },
+    partition_rows=int(os.environ.get("RELEASE_NOTES_PARTITION_ROWS", "40")),
+    max_parallel=int(os.environ.get("RELEASE_NOTES_MAX_PARALLEL", "4")),
+    # The partition agents are given their rows or summary in the instruction, so
+    # it is their only input; memoized answers are not counted as model calls.
+    instrument=lambda agent: account_model_calls(memoize_agent(agent, inputs=[])),
+)
+
+instrument_agent(sequential_root_agent)
+account_turns(sequential_root_agent)
+account_turns(fan_out_root_agent)
+
+if os.environ.get("RELEASE_NOTES_PIPELINE", "fanout").lower() == "sequential":
+    root_agent = sequential_root_agent
+else:
+    root_agent = fan_out_root_agent
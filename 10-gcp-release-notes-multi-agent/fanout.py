@@ -0,0 +1,181 @@
+"""Per-product fan-out for the release notes pipeline.
+
+Instead of one LLM call that summarizes every product and only then starting
+the translations, `ReleaseNotesFanOutAgent`:
+
+1. fetches the rows directly from the toolbox,
+2. partitions them by product_name into batches of whole products,
+3. runs one `PartitionPipeline` per batch with bounded parallelism; each
+   pipeline summarizes its products and immediately translates that summary
+   into every language in parallel,
+4. merges the partition outputs into `release_notes` and the translation keys,
+   in product order, so the result does not depend on which call finished first.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent, ParallelAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field
+
+from adk_common.tool_results import columns_of, group_rows, grouped_table, iter_group_batches
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = "release_notes"
+
+
+def _final_text(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+
+
+def _fixed_instruction(text: str) -> Callable[[Any], str]:
+    # An instruction provider is used as-is, so braces in the release notes are
+    # not mistaken for state placeholders.
+    return lambda _context: text
+
+
+class PartitionPipeline(BaseAgent):
+    """Summarizes one batch of products, then translates the summary in parallel."""
+
+    index: int
+    table: str
+    model: str
+    summary_instruction: str
+    translation_instructions: dict[str, str]
+    semaphore: Any
+    # Applied to the agents created per run, e.g. to add accounting callbacks.
+    instrument: Optional[Callable[[BaseAgent], Any]] = None
+    # Summary and translations by state key, filled in as the pipeline runs.
+    outputs: dict[str, str] = Field(default_factory=dict)
+
+    def _adopt(self, agent: BaseAgent) -> None:
+        # Agents built per run are not in the tree; the parent link attributes
+        # their model calls to this partition.
+        agent.parent_agent = self
+        if self.instrument is not None:
+            self.instrument(agent)
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async with self.semaphore:
+            summarizer = LlmAgent(
+                name=f"summarize_partition_{self.index}",
+                model=self.model,
+                instruction=_fixed_instruction(f"{self.summary_instruction}\n\nRelease notes:\n{self.table}"),
+                include_contents="none",
+            )
+            self._adopt(summarizer)
+            async for event in summarizer.run_async(ctx):
+                if event.author == summarizer.name and event.is_final_response():
+                    self.outputs[SUMMARY_KEY] = _final_text(event)
+                yield event
+
+            summary = self.outputs.get(SUMMARY_KEY, "")
+            if not summary or not self.translation_instructions:
+                return
+            translators = {
+                f"translate_partition_{self.index}_{key}": key for key in self.translation_instructions
+            }
+            translation = ParallelAgent(
+                name=f"translate_partition_{self.index}",
+                sub_agents=[
+                    LlmAgent(
+                        name=name,
+                        model=self.model,
+                        instruction=_fixed_instruction(
+                            f"{self.translation_instructions[key]}\n\nRelease notes:\n{summary}"
+                        ),
+                        include_contents="none",
+                    )
+                    for name, key in translators.items()
+                ],
+            )
+            self._adopt(translation)
+            async for event in translation.run_async(ctx):
+                if event.author in translators and event.is_final_response():
+                    self.outputs[translators[event.author]] = _final_text(event)
+                yield event
+
+
+class ReleaseNotesFanOutAgent(BaseAgent):
+    """Fetches release notes, summarizes and translates them per product batch, then merges.
+
+    Attributes:
+        fetch_rows: Coroutine function returning the release note rows.
+        model: Model used for summaries and translations.
+        summary_instruction: Instruction for summarizing one batch of products.
+        translation_instructions: Map of state key to the instruction producing
+            that translation.
+        group_by: Column the rows are partitioned by.
+        partition_rows: Maximum rows per partition; small products share a partition.
+        max_parallel: Maximum partitions processed at the same time.
+        instrument: Called with each LLM agent tree created during a run.
+    """
+
+    fetch_rows: Callable[[], Awaitable[list[dict]]]
+    model: str
+    summary_instruction: str
+    translation_instructions: dict[str, str]
+    group_by: str = "product_name"
+    partition_rows: int = 40
+    max_parallel: int = 4
+    instrument: Optional[Callable[[BaseAgent], Any]] = None
+
+    def _final_event(self, ctx: InvocationContext, text: str, state_delta: dict) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        keys = [SUMMARY_KEY, *self.translation_instructions]
+        try:
+            rows = await self.fetch_rows()
+        except ConnectionError as e:
+            yield self._final_event(ctx, f"The release notes database is currently unavailable: {e}", {})
+            return
+        if not rows:
+            message = "There are no Google Cloud release notes for this date."
+            yield self._final_event(ctx, message, {key: message for key in keys})
+            return
+
+        # Sorting (stable) by product makes the partitions and the merged order deterministic.
+        rows = sorted(rows, key=lambda row: str(row.get(self.group_by, "")))
+        partitions = list(iter_group_batches(group_rows(rows, self.group_by), self.partition_rows))
+        columns = columns_of(rows)
+        logger.info(f"Summarizing {len(rows)} release notes in {len(partitions)} partitions, "
+                    f"{self.max_parallel} at a time")
+
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        pipelines = [
+            PartitionPipeline(
+                name=f"release_notes_partition_{index}",
+                index=index,
+                table=grouped_table(batch, self.group_by, columns),
+                model=self.model,
+                summary_instruction=self.summary_instruction,
+                translation_instructions=self.translation_instructions,
+                semaphore=semaphore,
+                instrument=self.instrument,
+            )
+            for index, batch in enumerate(partitions)
+        ]
+        fan_out = ParallelAgent(name=f"{self.name}_partitions", sub_agents=pipelines)
+        fan_out.parent_agent = self
+        async for event in fan_out.run_async(ctx):
+            yield event
+
+        # Merge in partition (product) order, not completion order.
+        merged = {
+            key: "\n\n".join(pipeline.outputs[key] for pipeline in pipelines if pipeline.outputs.get(key))
+            for key in keys
+        }
+        yield self._final_event(ctx, merged[SUMMARY_KEY], merged)
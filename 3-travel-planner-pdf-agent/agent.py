@@ -1,26 +1,37 @@
 # Import necessary libraries for agent creation, web requests, feed parsing, and HTML parsing.
+import asyncio
 import logging
 import os
 
 
 from google.adk.agents import Agent
-from google.cloud import storage
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from google.adk.tools.tool_context import ToolContext
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv()
 
-def write_text_to_pdf_to_gcs(text_content: str) -> str:
+from adk_common.lazy import storage_client
+from adk_common.pdf_artifacts import get_pdf_artifact, paginate_lines, read_pdf_page, save_pdf_artifact
+from adk_common.tool_metrics import instrument_agent
+
+# Approximate number of 12pt lines that fit between the start position and the bottom margin.
+LINES_PER_PAGE = 48
+
+
+async def write_text_to_pdf_to_gcs(text_content: str, tool_context: ToolContext) -> dict:
     """
     Writes text content to a PDF file and uploads it to a Google Cloud Storage bucket.
 
+    The rendered PDF is also kept as a session artifact, so it can be sent again
+    or read page by page with `get_pdf_artifact` and `read_pdf_page`.
+
     Args:
         text_content: The string content to write into the PDF.
 
     Returns:
-        The GCS URI of the uploaded PDF file, or None if an error occurs.
+        A dictionary with the status, the GCS URI of the uploaded PDF file and
+        the artifact handle of the rendered PDF.
     """
 
     bucket_name = os.environ.get('GOOGLE_CLOUD_STORAGE_BUCKET', 'news-feed-pdfs')
@@ -31,34 +42,41 @@ def write_text_to_pdf_to_gcs(text_content: str) -> str:
 
     # Create a PDF in memory
     try:
+        # reportlab is imported on first use to keep the agent's cold start fast.
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+
         # Use BytesIO to handle the PDF content in memory.
         from io import BytesIO
         buffer = BytesIO()
         c = canvas.Canvas(buffer, pagesize=letter)
 
-        # Add text to the PDF
-        # Need to handle text wrapping and pagination for long text
-        # This is a basic implementation; for production, consider more robust text flow
-        # Begin a new text object at the specified coordinates.
-        textobject = c.beginText(40, 750) # Start position
-        textobject.setFont("Times-Roman", 12)
-
         # Simple line splitting (doesn't handle words splitting across lines)
-        lines = text_content.split('\n')
+        wrapped_lines = []
         # Iterate over each line of the text content.
-        for line in lines:
+        for line in text_content.split('\n'):
             # Basic wrapping: split line if it's too long (approximate)
             while len(line) > 80: # Approximate character limit per line
                 split_point = line[:80].rfind(' ') # Find last space before limit
                 if split_point == -1: # No space found, force split
                     split_point = 80
-                textobject.textLine(line[:split_point])
+                wrapped_lines.append(line[:split_point])
                 # Update the line to the remaining part.
                 line = line[split_point:].lstrip() # Remove leading space from next line
-            textobject.textLine(line)
+            wrapped_lines.append(line)
 
-        # Draw the text object onto the canvas.
-        c.drawText(textobject)
+        # Add text to the PDF, starting a new page whenever the current one is full.
+        pages = paginate_lines(wrapped_lines, LINES_PER_PAGE)
+        for page_number, page_lines in enumerate(pages):
+            if page_number:
+                c.showPage()
+            # Begin a new text object at the specified coordinates.
+            textobject = c.beginText(40, 750) # Start position
+            textobject.setFont("Times-Roman", 12)
+            for line in page_lines:
+                textobject.textLine(line)
+            # Draw the text object onto the canvas.
+            c.drawText(textobject)
         # Save the PDF to the buffer.
         c.save()
 
@@ -71,25 +89,35 @@ def write_text_to_pdf_to_gcs(text_content: str) -> str:
     except Exception as e:
         # Log an error if PDF creation fails.
         logging.error(f"Error creating PDF content: {e}", exc_info=True)
-        return None
+        return {"status": "error", "message": f"Error creating PDF content: {e}"}
+
+    # Keep the rendered PDF and its page text for follow-up requests.
+    artifact = await save_pdf_artifact(
+        tool_context, news_feed_pdf_file, pdf_content, ['\n'.join(page) for page in pages]
+    )
+
     # Upload the PDF to Google Cloud Storage
     try:
-        # Initialize the Google Cloud Storage client.
-        storage_client = storage.Client()
-        # Get the target bucket.
-        bucket = storage_client.bucket(bucket_name)
+        # Get the target bucket from the shared Cloud Storage client (created on first use).
+        bucket = (await asyncio.to_thread(storage_client)).bucket(bucket_name)
         # Create a new blob (file) in the bucket.
         blob = bucket.blob(news_feed_pdf_file)
-        # Upload the PDF content from the string.
-        blob.upload_from_string(pdf_content, content_type='application/pdf')
+        # Upload the PDF content from the string, off the event loop.
+        await asyncio.to_thread(blob.upload_from_string, pdf_content, content_type='application/pdf')
         # Construct the GCS URI of the uploaded PDF.
         pdf_uri = f"gs://{bucket_name}/{news_feed_pdf_file}"
+        artifact.gcs_uri = pdf_uri
         # Log the successful upload to GCS.
         logging.info(f"PDF successfully uploaded to GCS: {pdf_uri}")
-        return pdf_uri
+        return {"status": "success", "gcs_uri": pdf_uri, "artifact": artifact.handle, "page_count": len(pages)}
     except Exception as e:
         logging.error(f"Error uploading PDF to GCS: {e}", exc_info=True)
-        return None
+        return {
+            "status": "error",
+            "message": f"Error uploading PDF to GCS: {e}",
+            "artifact": artifact.handle,
+            "page_count": len(pages),
+        }
 
 root_agent = Agent(
     name="travel_planner_pdf_agent",
@@ -100,7 +128,12 @@ root_agent = Agent(
         Help them plan their trips, find travel information, and provide recommendations.
         If there is no more information needed, you can write the trip planning details to a PDF file.
         Use the `write_text_to_pdf_to_gcs` tool to write the trip planning details to a PDF file.
+        The tool returns an artifact handle for the PDF. If the user asks for the document again,
+        use `get_pdf_artifact` with that handle, and use `read_pdf_page` to answer questions about
+        a specific page, instead of writing the PDF again.
         """
     ),
-    tools=[write_text_to_pdf_to_gcs],
+    tools=[write_text_to_pdf_to_gcs, get_pdf_artifact, read_pdf_page],
 )
+
+instrument_agent(root_agent)
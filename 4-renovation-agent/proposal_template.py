@@ -0,0 +1,251 @@
+"""Structured template for the kitchen renovation proposal document.
+
+The proposal is split into named sections. Each section is a small text
+template with `{field}` placeholders, and every field has a default value taken
+from the original sample proposal. The agent only sends the field values that
+differ from the defaults; the document itself is rendered locally.
+
+Rendered sections are kept between edits (see `render_sections`), so editing
+one field only re-renders the sections that reference it.
+"""
+import string
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProposalField:
+    """A fillable value in the proposal template."""
+    name: str
+    description: str
+    default: str
+
+
+@dataclass(frozen=True)
+class ProposalSection:
+    """A named block of the proposal with `{field}` placeholders."""
+    name: str
+    template: str
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Names of the fields referenced by this section, in order of appearance."""
+        names = []
+        for _, field_name, _, _ in string.Formatter().parse(self.template):
+            if field_name and field_name not in names:
+                names.append(field_name)
+        return tuple(names)
+
+
+DEFAULT_EXHIBITS = """Exhibits:
+Exhibit A: Cabinet Design (detailed drawings, specifications)
+
+Image of the design goes here.
+
+I. Overall Style and Design
+Style: Modern, European-style, minimalist.
+Layout: Wall cabinets, base cabinets, and a tall pantry-style cabinet. An island is visible but not
+fully detailed in the image.
+Color Palette: Primarily white cabinets with a dark countertop. Walls are a neutral grey/beige.
+II. Cabinet Construction Specifications
+Cabinet Type: Frameless (European-style). This means the doors and drawers attach directly to
+the cabinet boxes, without a face frame.
+Box Material: Likely constructed from particleboard or MDF (Medium-Density Fiberboard). The
+interior finish is not visible.
+Door and Drawer Front Material: High-gloss white finish. Likely acrylic, laminate, or a high-gloss
+lacquer applied to an MDF core.
+Edge Banding: Color-matched to the door/drawer front, likely a thin PVC or ABS edge banding.
+Hardware:
+Pulls: Long, horizontal, stainless steel or brushed nickel finish pulls. Appear to be mounted on
+the center of the drawers and doors.
+Hinges: Concealed, European-style hinges (soft-close likely).
+Drawer Slides: Full-extension, soft-close drawer slides.
+Toe Kick: Recessed, likely white to match cabinets.
+III. Cabinet Dimensions (Estimated).
+
+Wall Cabinet Height: Appears to be close to ceiling height, perhaps 30-36" high depending on
+ceiling height.
+Wall Cabinet Depth: Standard depth, likely 12-14".
+Base Cabinet Height: Standard counter height, approximately 36" including countertop.
+Base Cabinet Depth: Standard depth, approximately 24".
+Pantry Cabinet Height: Floor to ceiling.
+Pantry Cabinet Depth: Likely 24".
+IV. Cabinet Breakdown
+Wall Cabinets:
+Several cabinets above the countertop, configured to fit the available space.
+The cabinet directly above the cooktop is likely shallower to accommodate the range hood.
+Under-cabinet lighting is present (LED strip lights).
+Base Cabinets:
+One cabinet to the left of the tall cabinet.
+Multiple drawers, including one directly under the cooktop.
+A cabinet at the very end of the counter next to the right wall.
+Tall Cabinet:
+Full-height pantry-style cabinet.
+Two doors, one above the other.
+Island:
+Dark countertop matching the perimeter countertops.
+Cabinets on the visible side are white.
+
+V. Countertop Specifications
+Material: Dark solid surface or stone countertop. Could be quartz, granite, or a similar
+engineered stone.
+Edge Profile: Slightly eased edge, possibly a small radius.
+Thickness: Likely 1 1/4" (3cm).
+VI. Appliance Considerations
+Cooktop: Integrated, flat, black cooktop (likely induction or electric).
+Range Hood: Stainless steel, integrated into the wall cabinets.
+Outlets: Outlets are present on the back splash.
+VII. Additional Details
+Backsplash: Rectangular tile with a horizontal orientation, likely ceramic or glass, in a light color
+with some variation.
+Lighting: Recessed ceiling lights and under-cabinet lighting."""
+
+DEFAULT_SCOPE_ITEMS = """Demolition of existing kitchen cabinets, countertops, and flooring.
+Installation of new custom cabinets (specified in Exhibit A – Cabinet Design).
+Installation of granite countertops (specified in Exhibit B – Countertop Selection).
+Installation of tile backsplash (specified in Exhibit C – Backsplash Tile).
+Installation of new stainless steel sink and faucet.
+Installation of new recessed lighting (6 fixtures).
+Installation of new flooring (specified in Exhibit D – Flooring Selection).
+Painting of walls and ceiling (2 coats, color specified in Exhibit E – Paint Color).
+Plumbing work necessary for sink and dishwasher connections.
+Electrical work necessary for lighting and appliance connections (GFCI outlets)."""
+
+PROPOSAL_FIELDS = [
+    ProposalField("proposal_date", "Date the proposal is made", "16th day of March, 2025"),
+    ProposalField("homeowner_name", "Full name of the homeowner", "Alice Smith"),
+    ProposalField("homeowner_address", "Address of the home being renovated", "123 Main Street, Anytown, CA 91234"),
+    ProposalField("contractor_name", "Contractor company name", "Bob's Renovations, Inc."),
+    ProposalField("contractor_description", "Legal description of the contractor", "a California corporation"),
+    ProposalField("contractor_address", "Contractor's principal place of business", "456 Oak Avenue, Anytown, CA 91235"),
+    ProposalField("contractor_license", "Contractor license number", "1234567"),
+    ProposalField("contractor_signatory", "Person signing for the contractor", "Bob Johnson"),
+    ProposalField("project_title", "Short title of the renovation", "Kitchen Remodel"),
+    ProposalField("scope_items", "Work items, one per line", DEFAULT_SCOPE_ITEMS),
+    ProposalField("contract_price", "Total price in figures", "$30,000.00"),
+    ProposalField("contract_price_words", "Total price in words", "Thirty Thousand Dollars"),
+    ProposalField("deposit_amount", "Deposit due on signing", "$10,000.00"),
+    ProposalField("phase_1_amount", "Payment after demolition and rough-in", "$5,000.00"),
+    ProposalField("phase_2_amount", "Payment after cabinet and countertop installation", "$10,000.00"),
+    ProposalField("final_payment_amount", "Payment on final inspection", "$5,000.00"),
+    ProposalField("start_date", "Date work commences", "May 22, 2025"),
+    ProposalField("duration", "Time to substantial completion", "6 weeks"),
+    ProposalField("warranty_period", "Labor warranty period", "one (1) year"),
+    ProposalField("exhibits", "Exhibit text (design, materials, specifications)", DEFAULT_EXHIBITS),
+]
+
+PROPOSAL_SECTIONS = [
+    ProposalSection("parties", """PROPOSAL DOCUMENT
+This proposal is made and entered into this {proposal_date}, by and between:
+Homeowner: {homeowner_name}, residing at {homeowner_address}
+Contractor: {contractor_name}, {contractor_description}, with its principal place of
+business at {contractor_address} (License #{contractor_license})"""),
+    ProposalSection("scope_of_work", """1. Scope of Work:
+Contractor agrees to perform the following work:
+{project_title}
+{scope_items}
+All work will be performed in a professional and workmanlike manner in accordance with local
+building codes."""),
+    ProposalSection("price", """2. Proposal Price:
+The total contract price for the work described above is {contract_price} ({contract_price_words})."""),
+    ProposalSection("payment_schedule", """3. Payment Schedule:
+Deposit: {deposit_amount} due upon signing of this proposal.
+
+Phase 1 (Demolition & Rough-in): {phase_1_amount} due upon completion of demolition and
+rough-in plumbing and electrical.
+Phase 2 (Cabinet & Countertop Installation): {phase_2_amount} due upon completion of cabinet
+and countertop installation.
+Final Payment: {final_payment_amount} due upon final inspection and completion of all work."""),
+    ProposalSection("change_orders", """4. Change Orders:
+Any changes to the scope of work must be agreed upon in writing and signed by both parties.
+Changes may result in adjustments to the contract price and schedule."""),
+    ProposalSection("timeline", """5. Timeline:
+The work shall commence on {start_date}, and be substantially completed within {duration}.
+This timeline is subject to change due to unforeseen circumstances (e.g., material delays,
+weather)."""),
+    ProposalSection("permits_and_insurance", """6. Permits:
+Contractor is responsible for obtaining all necessary permits for the work.
+7. Insurance:
+Contractor shall maintain general liability insurance and workers' compensation insurance. Proof
+of insurance will be provided upon request."""),
+    ProposalSection("warranty", """8. Warranty:
+Contractor warrants all labor for a period of {warranty_period} from the date of completion.
+Manufacturer warranties apply to materials."""),
+    ProposalSection("legal_terms", """9. Dispute Resolution:
+Any disputes arising out of this contract shall be resolved through mediation. If mediation fails,
+the parties agree to binding arbitration.
+10. Termination:
+This proposal may be terminated by either party with written notice if the other party breaches
+the proposal.
+11. Entire Agreement:
+This proposal constitutes the entire agreement between the parties and supersedes all prior
+discussions and agreements."""),
+    ProposalSection("signatures", """IN WITNESS WHEREOF, the parties have executed this contract as of the date first written
+above.
+
+____________{homeowner_name}________________
+{homeowner_name} (Homeowner)
+_____________{contractor_signatory}_______________
+{contractor_signatory} (Contractor, {contractor_name})"""),
+    ProposalSection("exhibits", "{exhibits}"),
+]
+
+FIELD_DEFAULTS = {f.name: f.default for f in PROPOSAL_FIELDS}
+_SECTIONS_BY_NAME = {s.name: s for s in PROPOSAL_SECTIONS}
+
+
+def describe_fields() -> str:
+    """Returns a compact, one-line-per-field catalog for the agent instruction."""
+    return "\n".join(f"- {f.name}: {f.description}" for f in PROPOSAL_FIELDS)
+
+
+def unknown_fields(field_updates: dict) -> list[str]:
+    """Returns the names in `field_updates` that are not template fields."""
+    return sorted(name for name in field_updates if name not in FIELD_DEFAULTS)
+
+
+def sections_using(field_names) -> list[str]:
+    """Returns the names of the sections that reference any of `field_names`."""
+    wanted = set(field_names)
+    return [s.name for s in PROPOSAL_SECTIONS if wanted.intersection(s.fields)]
+
+
+def _render_section(section: ProposalSection, values: dict) -> str:
+    return section.template.format(**{name: str(values[name]) for name in section.fields})
+
+
+def render_sections(field_values: dict, names=None, previous: dict = None) -> dict[str, str]:
+    """Renders the proposal sections by name.
+
+    Args:
+        field_values: Overrides for the template fields. Missing fields use their defaults.
+        names: Sections to render; every section if None.
+        previous: Sections rendered before, reused for the sections not in `names`.
+
+    Returns:
+        The text of every section, by section name.
+    """
+    values = {**FIELD_DEFAULTS, **field_values}
+    previous = previous or {}
+    wanted = None if names is None else set(names)
+    return {
+        s.name: previous[s.name] if wanted is not None and s.name not in wanted and s.name in previous
+        else _render_section(s, values)
+        for s in PROPOSAL_SECTIONS
+    }
+
+
+def join_sections(sections: dict[str, str]) -> str:
+    """Joins rendered sections into the proposal text, in document order."""
+    return "\n".join(sections[s.name] for s in PROPOSAL_SECTIONS) + "\n"
+
+
+def render_proposal(field_values: dict) -> str:
+    """Renders the full proposal text.
+
+    Args:
+        field_values: Overrides for the template fields. Missing fields use their defaults.
+
+    Returns:
+        The proposal document as plain text.
+    """
+    return join_sections(render_sections(field_values))
@@ -1,9 +1,13 @@
 from google.adk.agents import Agent
 from google.adk.tools import google_search
 
+from .search_cache import cached_search_model
+
 root_agent = Agent(
     name="basic_search_agent",
-    model="gemini-2.0-flash",
+    # Grounded answers are cached by normalized question (see search_cache.py;
+    # SEARCH_CACHE=off to disable), so repeated questions skip the search.
+    model=cached_search_model("gemini-2.0-flash"),
     description="Agent to answer questions using Google Search.",
     instruction="I can answer your questions by searching the internet. Just ask me anything!",
     # google_search is a pre-built tool which allows the agent to perform Google searches.
@@ -0,0 +1,183 @@
+"""Cache of Google Search grounded answers, shared by all users of the agent.
+
+`google_search` is a built-in tool that Gemini runs inside the model call, so
+there is no tool call to intercept. `CachedSearchLlm` wraps the model instead
+and caches whole grounded responses (text plus grounding metadata):
+
+- Keys are the normalized question (case, punctuation, whitespace, contractions
+  and politeness fillers removed), the model, the instruction and, for follow-up
+  turns, the earlier conversation, so only equivalent requests share an answer.
+- Questions are classified as news (time-sensitive words such as "today",
+  "latest", "score", a year) or evergreen, and each class has its own TTL.
+- Concurrent identical requests are coalesced into one model call.
+- Answers live in an in-memory LRU backed by an SQLite file, so they survive
+  restarts and are shared between worker processes.
+
+Environment: SEARCH_CACHE=off disables it, SEARCH_CACHE_NEWS_TTL_SECONDS
+(default 900), SEARCH_CACHE_EVERGREEN_TTL_SECONDS (default 7 days),
+SEARCH_CACHE_MAX_ENTRIES (memory tier, default 1024), SEARCH_CACHE_DIR (disk
+tier, default ~/.cache/adk-projects/search; "off" keeps the cache in memory only).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import string
+import unicodedata
+from typing import Any, AsyncGenerator, Optional, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import Field
+
+from adk_common.caching import DiskCache, SingleFlight, TieredCache, TTLCache
+
+logger = logging.getLogger(__name__)
+
+NEWS = "news"
+EVERGREEN = "evergreen"
+DEFAULT_TTL_SECONDS = {NEWS: 900, EVERGREEN: 7 * 24 * 3600}
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "adk-projects", "search")
+
+_NEWS_PATTERN = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent(ly)?|breaking|news|headlines?|"
+    r"this (week|month|year|season)|live|score|scores|results?|weather|forecast|price|prices|stock|stocks|"
+    r"election|poll|polls|update|updates|(19|20)\d\d)\b"
+)
+_CONTRACTIONS = {
+    "what's": "what is", "who's": "who is", "where's": "where is", "when's": "when is", "how's": "how is",
+    "it's": "it is", "that's": "that is", "there's": "there is", "whats": "what is", "whos": "who is",
+}
+_FILLERS = re.compile(
+    r"^(hey|hi|hello|ok|okay|please|so)\b\s*|\b(please|thanks|thank you)\b|"
+    r"^(can|could|would|will) you (please )?(tell me|let me know|find out|search( for)?)\s*|^(tell me|i want to know)\s*"
+)
+_PUNCTUATION = str.maketrans({c: " " for c in string.punctuation if c not in "'+#$%."})
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a question, so trivially different phrasings share a key."""
+    text = unicodedata.normalize("NFKC", text).casefold().replace("’", "'")
+    text = " ".join(_CONTRACTIONS.get(word, word) for word in text.split())
+    text = text.translate(_PUNCTUATION).replace("'", "")
+    # Sentence-final dots, not decimal points or abbreviations like "u.s.".
+    text = re.sub(r"\.(\s|$)", " ", text)
+    text = " ".join(text.split())
+    previous = None
+    while previous != text:
+        previous, text = text, " ".join(_FILLERS.sub(" ", text).split())
+    return text
+
+
+def classify_query(normalized: str) -> str:
+    """Returns NEWS for time-sensitive questions and EVERGREEN otherwise."""
+    return NEWS if _NEWS_PATTERN.search(normalized) else EVERGREEN
+
+
+def _content_text(content) -> str:
+    return "".join(part.text for part in (content.parts or []) if part.text)
+
+
+def request_key(llm_request: LlmRequest) -> Optional[tuple[str, str]]:
+    """Returns (cache key, query class) for a request, or None if it should not be cached."""
+    contents = llm_request.contents or []
+    if not contents or contents[-1].role != "user":
+        return None
+    question = normalize_query(_content_text(contents[-1]))
+    if not question:
+        return None
+    # Earlier turns are part of the key: a follow-up like "and tomorrow?" only
+    # matches the same follow-up in the same conversation.
+    history = json.dumps(
+        [(c.role, _content_text(c)) for c in contents[:-1]], ensure_ascii=False
+    )
+    instruction = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+    digest = hashlib.sha256(
+        "\x00".join([llm_request.model or "", instruction, history, question]).encode("utf-8")
+    ).hexdigest()
+    return digest, classify_query(question)
+
+
+class CachedSearchLlm(BaseLlm):
+    """Wraps a model and reuses its complete responses for equivalent questions.
+
+    Attributes:
+        inner: The model doing the actual (grounded) generation.
+        cache: Where serialized responses are kept.
+        ttl_seconds: TTL by query class (NEWS / EVERGREEN).
+    """
+
+    inner: BaseLlm
+    cache: Any
+    ttl_seconds: dict[str, float] = Field(default_factory=lambda: dict(DEFAULT_TTL_SECONDS))
+    single_flight: Any = Field(default_factory=SingleFlight)
+    hits: int = 0
+    misses: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        keyed = request_key(llm_request)
+        if keyed is None:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+        key, query_class = keyed
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Search cache hit ({query_class}) for {key[:12]}")
+            for data in json.loads(cached):
+                response = LlmResponse.model_validate(data)
+                response.custom_metadata = {**(response.custom_metadata or {}), "search_cache": "hit"}
+                yield response
+            return
+        self.misses += 1
+        # Streaming is not passed on: the complete answer is what gets cached and shared.
+        responses = await self.single_flight.run(key, lambda: self._generate(key, query_class, llm_request))
+        for response in responses:
+            yield response.model_copy(deep=True)
+
+    async def _generate(self, key: str, query_class: str, llm_request: LlmRequest) -> list[LlmResponse]:
+        responses = [r async for r in self.inner.generate_content_async(llm_request, stream=False)]
+        answered = responses and responses[-1].content and _content_text(responses[-1].content)
+        if answered and not any(r.error_code for r in responses):
+            data = json.dumps([r.model_dump(mode="json", exclude_none=True) for r in responses])
+            ttl = self.ttl_seconds.get(query_class, DEFAULT_TTL_SECONDS[EVERGREEN])
+            await asyncio.to_thread(self.cache.set, key, data, ttl)
+        return responses
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.single_flight.coalesced,
+            "disk_hits": getattr(self.cache, "disk_hits", 0),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def cached_search_model(model: str) -> Union[str, BaseLlm]:
+    """Returns `model` wrapped in a search cache configured from the environment.
+
+    With SEARCH_CACHE=off the model name is returned unchanged.
+    """
+    if os.environ.get("SEARCH_CACHE", "on").lower() == "off":
+        return model
+    memory = TTLCache(max_entries=int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", "1024")))
+    cache_dir = os.environ.get("SEARCH_CACHE_DIR", DEFAULT_CACHE_DIR)
+    disk = None if cache_dir.lower() == "off" else DiskCache(os.path.join(cache_dir, "answers.sqlite3"))
+    ttl_seconds = {
+        NEWS: float(os.environ.get("SEARCH_CACHE_NEWS_TTL_SECONDS", DEFAULT_TTL_SECONDS[NEWS])),
+        EVERGREEN: float(os.environ.get("SEARCH_CACHE_EVERGREEN_TTL_SECONDS", DEFAULT_TTL_SECONDS[EVERGREEN])),
+    }
+    # Same model name as the wrapped model, so google_search accepts it as Gemini.
+    return CachedSearchLlm(
+        model=model,
+        inner=LLMRegistry.new_llm(model),
+        cache=TieredCache(memory, disk),
+        ttl_seconds=ttl_seconds,
+    )
@@ -1,27 +1,17 @@
-import os
-
 from google.adk.agents import Agent
-from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
-from vertexai.preview import rag
 
 from dotenv import load_dotenv
+from adk_common.lazy import LazyToolset
+from adk_common.tool_metrics import instrument_agent
 from .prompts import return_instructions_root
+from .retrieval import build_retrieval_tool
 
 load_dotenv()
 
-ask_vertex_retrieval = VertexAiRagRetrieval(
-    name='retrieve_rag_documentation',
-    description=(
-        'Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,'
-    ),
-    rag_resources=[
-        rag.RagResource(
-            rag_corpus=os.environ.get("RAG_CORPUS")
-        )
-    ],
-    similarity_top_k=10,
-    vector_distance_threshold=0.6,
-)
+# Vertex AI RAG Engine by default; RAG_BACKEND=local searches an on-disk index instead.
+# The tool is built on the first model turn, so the Vertex AI SDK (or the local
+# index) is not loaded while the agent is imported.
+ask_vertex_retrieval = LazyToolset(build_retrieval_tool)
 
 root_agent = Agent(
     model='gemini-2.0-flash-001',
@@ -30,4 +20,6 @@ root_agent = Agent(
     tools=[
         ask_vertex_retrieval,
     ]
-)
\ No newline at end of file
+)
+
+instrument_agent(root_agent)
@@ -0,0 +1,105 @@
+"""Text embedding backends for the local RAG index.
+
+`VertexTextEmbedder` calls the Vertex AI / Gemini embedding API. `HashingEmbedder`
+is a dependency-free feature-hashing embedder that runs fully offline; it is
+meant for development, tests and benchmarks rather than answer quality.
+
+The backend is chosen with RAG_EMBEDDING_MODEL: "hashing" (optionally
+"hashing:<dimension>") selects the offline embedder, anything else is used as
+the Vertex embedding model name (default "text-embedding-005").
+"""
+import hashlib
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-005"
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(ABC):
+    """Turns texts into fixed-size float vectors."""
+
+    dimension: int
+    name: str
+
+    @abstractmethod
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        """Embeds chunks that are stored in the index."""
+
+    @abstractmethod
+    def embed_queries(self, texts: list[str]) -> np.ndarray:
+        """Embeds search queries."""
+
+
+class VertexTextEmbedder(Embedder):
+    """Embeddings from the Vertex AI text embedding models via google-genai."""
+
+    # The embedding API accepts a limited number of texts per request.
+    MAX_BATCH = 250
+
+    def __init__(self, model: str = DEFAULT_EMBEDDING_MODEL, dimension: int = 768, client=None):
+        self.name = model
+        self.dimension = dimension
+        self._client = client
+
+    def _embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        from google.genai import types
+
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        vectors = []
+        for start in range(0, len(texts), self.MAX_BATCH):
+            response = self._client.models.embed_content(
+                model=self.name,
+                contents=texts[start:start + self.MAX_BATCH],
+                config=types.EmbedContentConfig(task_type=task_type, output_dimensionality=self.dimension),
+            )
+            vectors.extend(embedding.values for embedding in response.embeddings)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dimension)
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        return self._embed(texts, "RETRIEVAL_DOCUMENT")
+
+    def embed_queries(self, texts: list[str]) -> np.ndarray:
+        return self._embed(texts, "RETRIEVAL_QUERY")
+
+
+class HashingEmbedder(Embedder):
+    """Offline bag-of-words embedder using signed feature hashing of word unigrams and bigrams."""
+
+    def __init__(self, dimension: int = 512):
+        self.name = f"hashing:{dimension}"
+        self.dimension = dimension
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        tokens = _TOKEN_RE.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimension] += sign
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.stack([self._embed_one(t) for t in texts])
+
+    def embed_queries(self, texts: list[str]) -> np.ndarray:
+        return self.embed_documents(texts)
+
+
+def embedder_from_env(model: Optional[str] = None) -> Embedder:
+    """Returns the embedder selected by RAG_EMBEDDING_MODEL (or `model` if given)."""
+    model = model or os.environ.get("RAG_EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+    if model.startswith("hashing"):
+        _, _, dimension = model.partition(":")
+        return HashingEmbedder(int(dimension) if dimension else 512)
+    return VertexTextEmbedder(model, int(os.environ.get("RAG_EMBEDDING_DIMENSION", "768")))
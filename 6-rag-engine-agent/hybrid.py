@@ -0,0 +1,245 @@
+"""Hybrid lexical + vector retrieval with reranking and a context-token budget.
+
+Retrieval runs in three stages:
+
+1. Candidates: the top `candidate_k` chunks by vector similarity and the top
+   `candidate_k` by BM25 over the chunk texts, fused with reciprocal rank fusion
+   (RRF), so exact keyword matches that embeddings miss still surface.
+2. Rerank: a cheap lexical reranker rescores the fused candidates by query-term
+   coverage, cosine similarity and fused rank, and drops weak ones.
+3. Budget: chunks are taken in reranked order until the estimated token count
+   would exceed `token_budget` (or `max_chunks` is reached).
+
+Only the chunks that survive all three stages are returned to the model.
+"""
+import logging
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from typing import Optional
+
+import numpy as np
+
+from .local_index import LocalVectorIndex, normalize
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Rough characters-per-token ratio used to estimate prompt tokens without a tokenizer.
+CHARS_PER_TOKEN = 4
+RRF_K = 60
+DEFAULT_CANDIDATE_K = 30
+DEFAULT_TOKEN_BUDGET = 2048
+DEFAULT_MAX_CHUNKS = 6
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+class BM25Index:
+    """In-memory Okapi BM25 inverted index over the chunks of a `LocalVectorIndex`.
+
+    Postings are kept as NumPy arrays per term, so scoring a query is a handful of
+    vectorised updates to a score array rather than a loop over documents.
+    """
+
+    def __init__(self, texts: list[str], deleted: Optional[np.ndarray] = None, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.count = len(texts)
+        self.deleted = deleted if deleted is not None else np.zeros(self.count, dtype=bool)
+        postings = defaultdict(list)
+        lengths = np.zeros(self.count, dtype=np.float32)
+        for row, text in enumerate(texts):
+            if self.deleted[row]:
+                continue
+            terms = Counter(tokenize(text))
+            lengths[row] = sum(terms.values())
+            for term, tf in terms.items():
+                postings[term].append((row, tf))
+        live = int((~self.deleted).sum())
+        average_length = float(lengths.sum() / live) if live else 1.0
+        self._norms = self.k1 * (1 - self.b + self.b * lengths / max(average_length, 1e-9))
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray, float]] = {}
+        for term, entries in postings.items():
+            rows = np.fromiter((r for r, _ in entries), dtype=np.int64, count=len(entries))
+            tfs = np.fromiter((tf for _, tf in entries), dtype=np.float32, count=len(entries))
+            idf = math.log(1 + (live - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = (rows, tfs, idf)
+
+    @classmethod
+    def from_index(cls, index: LocalVectorIndex) -> "BM25Index":
+        return cls([chunk.get("text", "") for chunk in index.chunks], index.deleted_mask)
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """Returns up to `top_k` (row, score) pairs with a positive BM25 score, best first."""
+        scores = np.zeros(self.count, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            rows, tfs, idf = posting
+            scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + self._norms[rows])
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > top_k:
+            matched = matched[np.argpartition(-scores[matched], top_k - 1)[:top_k]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(row), float(scores[row])) for row in matched]
+
+
+def reciprocal_rank_fusion(rankings: list[list[int]], k: int = RRF_K) -> dict[int, float]:
+    """Fuses ranked lists of row ids: score(row) = sum over lists of 1 / (k + rank)."""
+    fused: dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            fused[row] += 1.0 / (k + rank)
+    return dict(fused)
+
+
+class Reranker(ABC):
+    """Reorders retrieved chunks and drops those that are not worth sending."""
+
+    @abstractmethod
+    def rerank(self, query: str, chunks: list[dict]) -> list[dict]:
+        """Returns the chunks to keep, best first, each with a `score`."""
+
+
+class LexicalReranker(Reranker):
+    """Cheap reranker mixing query-term coverage, cosine similarity and fused rank.
+
+    Args:
+        min_score: Chunks scoring below this are dropped.
+        coverage_weight, similarity_weight, fusion_weight: Mixing weights.
+    """
+
+    def __init__(
+        self,
+        min_score: float = 0.2,
+        coverage_weight: float = 0.4,
+        similarity_weight: float = 0.4,
+        fusion_weight: float = 0.2,
+    ):
+        self.min_score = min_score
+        self.coverage_weight = coverage_weight
+        self.similarity_weight = similarity_weight
+        self.fusion_weight = fusion_weight
+
+    def rerank(self, query: str, chunks: list[dict]) -> list[dict]:
+        query_terms = set(tokenize(query))
+        best_fusion = max((c.get("fusion_score", 0.0) for c in chunks), default=0.0) or 1.0
+        scored = []
+        for chunk in chunks:
+            chunk_terms = set(tokenize(chunk.get("text", "")))
+            coverage = len(query_terms & chunk_terms) / len(query_terms) if query_terms else 0.0
+            similarity = max(0.0, 1.0 - chunk.get("distance", 1.0))
+            score = (
+                self.coverage_weight * coverage
+                + self.similarity_weight * similarity
+                + self.fusion_weight * chunk.get("fusion_score", 0.0) / best_fusion
+            )
+            if score >= self.min_score:
+                scored.append({**chunk, "score": round(score, 4)})
+        scored.sort(key=lambda c: c["score"], reverse=True)
+        return scored
+
+
+def select_within_budget(chunks: list[dict], token_budget: int, max_chunks: int) -> list[dict]:
+    """Takes chunks in order until the token budget or `max_chunks` is reached.
+
+    The first chunk is always kept so that a single long chunk is not dropped entirely.
+    """
+    selected, used = [], 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk.get("text", ""))
+        if selected and (used + tokens > token_budget or len(selected) >= max_chunks):
+            break
+        selected.append(chunk)
+        used += tokens
+    return selected
+
+
+class HybridSearcher:
+    """BM25 + vector candidate generation over a `LocalVectorIndex`.
+
+    The BM25 index is built lazily from the chunk texts and rebuilt whenever the
+    vector index version changes.
+    """
+
+    def __init__(self, candidate_k: int = DEFAULT_CANDIDATE_K, rrf_k: int = RRF_K):
+        self.candidate_k = candidate_k
+        self.rrf_k = rrf_k
+        self._bm25: Optional[BM25Index] = None
+        self._bm25_version: Optional[int] = None
+
+    def bm25(self, index: LocalVectorIndex) -> BM25Index:
+        if self._bm25 is None or self._bm25_version != index.version:
+            started = time.perf_counter()
+            self._bm25 = BM25Index.from_index(index)
+            self._bm25_version = index.version
+            logger.info(f"Built BM25 index over {len(index)} chunks in {1000 * (time.perf_counter() - started):.1f} ms")
+        return self._bm25
+
+    def candidates(
+        self,
+        index: LocalVectorIndex,
+        query: str,
+        query_vector: np.ndarray,
+        vector_distance_threshold: Optional[float],
+        mode: str = "exact",
+    ) -> list[dict]:
+        """Returns fused candidates with `distance`, `bm25_score` and `fusion_score`."""
+        query_vector = normalize(query_vector)
+        vector_hits = index.search(
+            query_vector,
+            similarity_top_k=self.candidate_k,
+            vector_distance_threshold=vector_distance_threshold,
+            mode=mode,
+        )[0]
+        lexical_hits = self.bm25(index).search(query, self.candidate_k)
+        fused = reciprocal_rank_fusion(
+            [[hit.row for hit in vector_hits], [row for row, _ in lexical_hits]], k=self.rrf_k
+        )
+        distances = {hit.row: hit.distance for hit in vector_hits}
+        bm25_scores = dict(lexical_hits)
+        # Lexical-only candidates still need a cosine distance for the reranker.
+        missing = [row for row in fused if row not in distances]
+        if missing:
+            similarities = np.asarray(index.vectors[missing], dtype=np.float32) @ query_vector[0]
+            distances.update({row: float(1.0 - s) for row, s in zip(missing, similarities)})
+        results = []
+        for row, fusion_score in sorted(fused.items(), key=lambda item: item[1], reverse=True):
+            chunk = index.chunks[row]
+            results.append({
+                "text": chunk.get("text", ""),
+                "title": chunk.get("title", ""),
+                "source_uri": chunk.get("source_uri", ""),
+                "page": chunk.get("page"),
+                "distance": round(distances[row], 4),
+                "bm25_score": round(bm25_scores.get(row, 0.0), 4),
+                "fusion_score": fusion_score,
+            })
+        return results
+
+
+def finalize_contexts(
+    query: str,
+    candidates: list[dict],
+    reranker: Optional[Reranker],
+    token_budget: int,
+    max_chunks: int,
+) -> list[dict]:
+    """Reranks candidates, applies the token budget and strips internal scoring fields."""
+    ranked = reranker.rerank(query, candidates) if reranker else candidates
+    selected = select_within_budget(ranked, token_budget, max_chunks)
+    logger.info(
+        f"Reranked {len(candidates)} candidates to {len(ranked)}, sending {len(selected)} chunks "
+        f"(~{sum(estimate_tokens(c.get('text', '')) for c in selected)} tokens)"
+    )
+    return [{k: v for k, v in chunk.items() if k not in ("bm25_score", "fusion_score")} for chunk in selected]
@@ -0,0 +1,406 @@
+"""Incremental ingestion of PDFs into the local RAG index.
+
+Usage (from the repository root):
+
+    python -m 6-rag-engine-agent.ingest path/to/pdfs [more/paths ...]
+
+Documents are streamed page by page and split into overlapping chunks. Every
+chunk is identified by the SHA-256 of its text, and a manifest next to the index
+(`manifest.json`) records which index row holds each chunk of each document:
+
+- Unchanged files (same size, mtime and content hash) are skipped outright.
+- For changed files only chunks with a new hash are embedded; chunks that kept
+  their text reuse their stored vector, and chunks that disappeared are removed.
+- Files that no longer exist under the ingested paths are removed from the index.
+
+The manifest is checkpointed after every embedding batch, so an interrupted run
+resumes without re-embedding what was already stored. Embedding requests are
+batched and at most `--concurrency` batches are in flight at a time.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .embeddings import Embedder, embedder_from_env
+from .local_index import LocalVectorIndex
+from .retrieval import DEFAULT_LOCAL_INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+DEFAULT_CHUNK_SIZE = 1200
+DEFAULT_CHUNK_OVERLAP = 200
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_CONCURRENCY = 4
+EMBED_RETRIES = 3
+
+
+@dataclass
+class Chunk:
+    """A piece of a document as stored in the index."""
+    text: str
+    page: int
+    ordinal: int
+
+    @property
+    def hash(self) -> str:
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestStats:
+    files_scanned: int = 0
+    files_skipped: int = 0
+    files_updated: int = 0
+    files_removed: int = 0
+    chunks_embedded: int = 0
+    chunks_reused: int = 0
+    chunks_removed: int = 0
+    embedding_batches: int = 0
+    started: float = field(default_factory=time.perf_counter)
+
+    def as_dict(self) -> dict:
+        return {
+            "files_scanned": self.files_scanned,
+            "files_skipped": self.files_skipped,
+            "files_updated": self.files_updated,
+            "files_removed": self.files_removed,
+            "chunks_embedded": self.chunks_embedded,
+            "chunks_reused": self.chunks_reused,
+            "chunks_removed": self.chunks_removed,
+            "embedding_batches": self.embedding_batches,
+            "elapsed_s": round(time.perf_counter() - self.started, 2),
+        }
+
+
+# --- Reading and chunking ------------------------------------------------------
+
+def iter_pages(path: str) -> Iterator[tuple[int, str]]:
+    """Yields (page_number, text) one page at a time, starting at 1.
+
+    PDFs are read with pypdf; plain-text files are split into pages on form feeds.
+    """
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        for number, page in enumerate(reader.pages, start=1):
+            yield number, page.extract_text() or ""
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for number, text in enumerate(f.read().split("\f"), start=1):
+                yield number, text
+
+
+def chunk_pages(
+    pages: Iterable[tuple[int, str]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+) -> Iterator[Chunk]:
+    """Splits each page into word-aligned chunks of about `chunk_size` characters.
+
+    Chunks never span pages, so an edit on one page only changes that page's chunks.
+    """
+    ordinal = 0
+    for page, text in pages:
+        words = text.split()
+        start = 0
+        while start < len(words):
+            end, length = start, 0
+            while end < len(words) and (length == 0 or length + len(words[end]) + 1 <= chunk_size):
+                length += len(words[end]) + 1
+                end += 1
+            yield Chunk(" ".join(words[start:end]), page, ordinal)
+            ordinal += 1
+            if end >= len(words):
+                break
+            # Step back over roughly `chunk_overlap` characters of the previous chunk.
+            overlap_start, overlap = end, 0
+            while overlap_start > start + 1 and overlap + len(words[overlap_start - 1]) + 1 <= chunk_overlap:
+                overlap_start -= 1
+                overlap += len(words[overlap_start]) + 1
+            start = overlap_start
+
+
+def file_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discover_files(paths: list[str]) -> list[str]:
+    """Expands directories into the supported files below them."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                found.extend(
+                    os.path.join(root, name) for name in names if name.lower().endswith(SUPPORTED_EXTENSIONS)
+                )
+        elif os.path.isfile(path):
+            found.append(path)
+        else:
+            logger.warning(f"Skipping {path}: not found.")
+    return sorted(os.path.abspath(p) for p in found)
+
+
+# --- Manifest ------------------------------------------------------------------
+
+class Manifest:
+    """Maps each ingested document to its fingerprint and the index rows of its chunks.
+
+    Per document:
+        {"size", "mtime", "sha256", "complete", "chunks": {chunk_hash: {"row", "page", "ordinal"}}}
+    """
+
+    def __init__(self, path: str, data: dict):
+        self.path = path
+        self.data = data
+
+    @classmethod
+    def load(cls, index_dir: str, embedder: Embedder) -> "Manifest":
+        path = os.path.join(index_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("embedding_model") != embedder.name:
+                raise ValueError(
+                    f"Index {index_dir} was built with '{data.get('embedding_model')}', not '{embedder.name}'. "
+                    "Re-run with --rebuild to re-embed the corpus."
+                )
+            return cls(path, data)
+        return cls(path, {"version": MANIFEST_VERSION, "embedding_model": embedder.name, "documents": {}})
+
+    @property
+    def documents(self) -> dict:
+        return self.data["documents"]
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+
+    def remap_rows(self, row_map: dict[int, int]) -> None:
+        """Rewrites row ids after `LocalVectorIndex.compact`."""
+        for document in self.documents.values():
+            for entry in document["chunks"].values():
+                entry["row"] = row_map[entry["row"]]
+
+
+# --- Embedding -----------------------------------------------------------------
+
+def _embed_with_retries(embedder: Embedder, texts: list[str]) -> np.ndarray:
+    for attempt in range(EMBED_RETRIES):
+        try:
+            return embedder.embed_documents(texts)
+        except Exception as e:
+            if attempt == EMBED_RETRIES - 1:
+                raise
+            delay = 2 ** attempt
+            logger.warning(f"Embedding batch failed ({e}); retrying in {delay}s.")
+            time.sleep(delay)
+
+
+def embed_in_batches(
+    embedder: Embedder,
+    chunks: list[Chunk],
+    batch_size: int,
+    concurrency: int,
+) -> Iterator[tuple[list[Chunk], np.ndarray]]:
+    """Yields (chunks, embeddings) per batch with at most `concurrency` batches in flight.
+
+    Batches are yielded as they complete, so callers can store and checkpoint
+    them while the remaining batches are still being embedded.
+    """
+    batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+        next_batch = 0
+        while next_batch < len(batches) or pending:
+            while next_batch < len(batches) and len(pending) < concurrency:
+                batch = batches[next_batch]
+                pending[pool.submit(_embed_with_retries, embedder, [c.text for c in batch])] = batch
+                next_batch += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+# --- Ingestion -----------------------------------------------------------------
+
+class Ingestor:
+    """Keeps a `LocalVectorIndex` in sync with a set of documents."""
+
+    def __init__(
+        self,
+        index_dir: str,
+        embedder: Optional[Embedder] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.embedder = embedder or embedder_from_env()
+        self.index = LocalVectorIndex.open_or_create(index_dir, self.embedder.dimension)
+        self.manifest = Manifest.load(index_dir, self.embedder)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.stats = IngestStats()
+
+    def ingest(self, paths: list[str], prune: bool = True) -> IngestStats:
+        files = discover_files(paths)
+        for path in files:
+            self.stats.files_scanned += 1
+            self.ingest_file(path)
+        if prune:
+            roots = [os.path.abspath(p) for p in paths]
+            present = set(files)
+            for source in list(self.manifest.documents):
+                under_roots = any(source == root or source.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+                if under_roots and source not in present:
+                    self.remove_document(source)
+        return self.stats
+
+    def ingest_file(self, path: str) -> None:
+        document = self.manifest.documents.get(path)
+        fingerprint = file_fingerprint(path)
+        if document and document.get("complete") and all(document[k] == v for k, v in fingerprint.items()):
+            self.stats.files_skipped += 1
+            return
+        sha256 = file_sha256(path)
+        if document and document.get("complete") and document["sha256"] == sha256:
+            # Touched but not modified.
+            document.update(fingerprint)
+            self.manifest.save()
+            self.stats.files_skipped += 1
+            return
+
+        if document is None:
+            document = self.manifest.documents[path] = {"chunks": {}}
+        document.update(fingerprint, sha256=sha256, complete=False)
+        self.manifest.save()
+
+        title = os.path.splitext(os.path.basename(path))[0]
+        chunks: dict[str, Chunk] = {}
+        for chunk in chunk_pages(iter_pages(path), self.chunk_size, self.chunk_overlap):
+            chunks.setdefault(chunk.hash, chunk)
+        stored = document["chunks"]
+
+        # Chunks whose text is unchanged keep their vector; only their position may be refreshed.
+        moved = [
+            chunk for h, chunk in chunks.items()
+            if h in stored and (stored[h]["page"], stored[h]["ordinal"]) != (chunk.page, chunk.ordinal)
+        ]
+        if moved:
+            old_rows = [stored[c.hash]["row"] for c in moved]
+            vectors = np.asarray(self.index.vectors[old_rows], dtype=np.float32)
+            rows = self.index.add(vectors, [self._chunk_record(c, path, title) for c in moved])
+            self.index.remove(old_rows)
+            for chunk, row in zip(moved, rows):
+                stored[chunk.hash] = {"row": row, "page": chunk.page, "ordinal": chunk.ordinal}
+            self.manifest.save()
+        self.stats.chunks_reused += sum(1 for h in chunks if h in stored)
+
+        new_chunks = [chunk for h, chunk in chunks.items() if h not in stored]
+        for batch, embeddings in embed_in_batches(self.embedder, new_chunks, self.batch_size, self.concurrency):
+            rows = self.index.add(embeddings, [self._chunk_record(c, path, title) for c in batch])
+            for chunk, row in zip(batch, rows):
+                stored[chunk.hash] = {"row": row, "page": chunk.page, "ordinal": chunk.ordinal}
+            # Checkpoint so an interrupted run does not embed this batch again.
+            self.manifest.save()
+            self.stats.chunks_embedded += len(batch)
+            self.stats.embedding_batches += 1
+
+        stale = [h for h in stored if h not in chunks]
+        if stale:
+            self.index.remove([stored[h]["row"] for h in stale])
+            for h in stale:
+                del stored[h]
+            self.stats.chunks_removed += len(stale)
+        document["complete"] = True
+        self.manifest.save()
+        self.stats.files_updated += 1
+        logger.info(f"Ingested {path}: {len(new_chunks)} embedded, {len(stale)} removed, {len(chunks)} total.")
+
+    def remove_document(self, path: str) -> None:
+        document = self.manifest.documents.pop(path)
+        rows = [entry["row"] for entry in document["chunks"].values()]
+        if rows:
+            self.index.remove(rows)
+        self.manifest.save()
+        self.stats.files_removed += 1
+        self.stats.chunks_removed += len(rows)
+        logger.info(f"Removed {path}: {len(rows)} chunks.")
+
+    def compact(self) -> None:
+        """Reclaims space from removed chunks and updates the manifest's row ids."""
+        self.manifest.remap_rows(self.index.compact())
+        self.manifest.save()
+
+    @staticmethod
+    def _chunk_record(chunk: Chunk, path: str, title: str) -> dict:
+        return {
+            "text": chunk.text,
+            "title": title,
+            "source_uri": path,
+            "page": chunk.page,
+            "chunk_hash": chunk.hash,
+        }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Incrementally ingest PDFs into the local RAG index.")
+    parser.add_argument("paths", nargs="+", help="PDF files or directories to ingest.")
+    parser.add_argument("--index-dir", default=os.environ.get("RAG_LOCAL_INDEX_DIR", DEFAULT_LOCAL_INDEX_DIR))
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=DEFAULT_CHUNK_OVERLAP)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--no-prune", action="store_true", help="Keep documents that no longer exist on disk.")
+    parser.add_argument("--compact", action="store_true", help="Reclaim space from removed chunks afterwards.")
+    parser.add_argument("--rebuild", action="store_true", help="Discard the index and re-embed everything.")
+    parser.add_argument("--build-ivf", action="store_true", help="Build the IVF structure after ingesting.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.rebuild:
+        for name in os.listdir(args.index_dir) if os.path.isdir(args.index_dir) else []:
+            os.remove(os.path.join(args.index_dir, name))
+
+    ingestor = Ingestor(
+        args.index_dir,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )
+    stats = ingestor.ingest(args.paths, prune=not args.no_prune)
+    if args.compact:
+        ingestor.compact()
+    if args.build_ivf:
+        ingestor.index.build_ivf()
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""Local, on-disk vector index for the RAG agent.
+
+The index lives in a directory:
+
+    index.json      header: dimension, dtype, row count, version, tombstones
+    vectors.bin     row-major matrix of L2-normalised float32/float16 vectors
+    chunks.jsonl    one JSON object per row (text, title, source_uri, page, ...)
+    ivf.npz         optional IVF coarse quantizer (centroids + row assignment)
+    hnsw.bin        optional hnswlib graph (only if hnswlib is installed)
+
+Vectors are memory-mapped, so opening an index is cheap and the OS page cache
+keeps hot rows in memory. Exact search scores query batches against the matrix
+block by block with NumPy; the optional IVF or HNSW modes trade a little recall
+for sub-linear search on large corpora. A long-lived reader calls `refresh()`
+to pick up rows another process (such as ingest.py) added or removed since.
+
+Distances follow Vertex AI RAG Engine semantics: cosine distance (1 - cosine
+similarity), results at or above `vector_distance_threshold` are dropped, and
+at most `similarity_top_k` results are returned per query.
+"""
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HEADER_FILE = "index.json"
+VECTORS_FILE = "vectors.bin"
+CHUNKS_FILE = "chunks.jsonl"
+IVF_FILE = "ivf.npz"
+HNSW_FILE = "hnsw.bin"
+
+SUPPORTED_DTYPES = ("float32", "float16")
+# Rows scored per block in exact search; bounds the temporary score matrix.
+SEARCH_BLOCK_ROWS = 65536
+
+
+@dataclass
+class SearchHit:
+    """A chunk returned by a vector search."""
+    row: int
+    distance: float
+    chunk: dict
+
+    @property
+    def score(self) -> float:
+        return 1.0 - self.distance
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Returns float32 copies of `vectors` scaled to unit L2 norm (zero rows stay zero)."""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class LocalVectorIndex:
+    """Memory-mapped cosine-similarity index with exact, IVF and HNSW search modes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._header_stat = None
+        self._header = self._read_header()
+        self._vectors: Optional[np.ndarray] = None
+        self._chunks: Optional[list[dict]] = None
+        self._deleted: Optional[np.ndarray] = None
+        self._ivf = None
+        self._hnsw = None
+
+    def _read_header(self) -> dict:
+        header_path = os.path.join(self.path, HEADER_FILE)
+        # Stat first: if the header is replaced while it is read, the next refresh reads it again.
+        self._header_stat = _stat_key(header_path)
+        with open(header_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def refresh(self) -> bool:
+        """Picks up changes another writer (such as ingest.py) made to the index.
+
+        Costs one `stat` when nothing changed. Returns True if the index changed;
+        its views are then reloaded on next use.
+        """
+        try:
+            if _stat_key(os.path.join(self.path, HEADER_FILE)) == self._header_stat:
+                return False
+        except FileNotFoundError:
+            return False
+        header = self._read_header()
+        if header == self._header:
+            return False
+        logger.info(f"Index {self.path} changed (version {self._header['version']} -> {header['version']}); reloading.")
+        self._header = header
+        self._drop_views()
+        return True
+
+    # --- Creation and mutation -------------------------------------------------
+
+    @classmethod
+    def create(cls, path: str, dimension: int, dtype: str = "float32") -> "LocalVectorIndex":
+        """Creates an empty index directory and returns it opened."""
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}', expected one of {SUPPORTED_DTYPES}.")
+        os.makedirs(path, exist_ok=True)
+        header = {"dimension": dimension, "dtype": dtype, "count": 0, "version": 0, "deleted": []}
+        _write_json_atomic(os.path.join(path, HEADER_FILE), header)
+        open(os.path.join(path, VECTORS_FILE), "wb").close()
+        open(os.path.join(path, CHUNKS_FILE), "w", encoding="utf-8").close()
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, dimension: int, dtype: str = "float32") -> "LocalVectorIndex":
+        if os.path.exists(os.path.join(path, HEADER_FILE)):
+            return cls(path)
+        return cls.create(path, dimension, dtype)
+
+    @property
+    def dimension(self) -> int:
+        return self._header["dimension"]
+
+    @property
+    def dtype(self) -> str:
+        return self._header["dtype"]
+
+    @property
+    def version(self) -> int:
+        """Incremented on every change; used to invalidate caches built on the index."""
+        return self._header["version"]
+
+    def __len__(self) -> int:
+        """Number of live (not deleted) rows."""
+        return self._header["count"] - len(self._header["deleted"])
+
+    def add(self, embeddings: np.ndarray, chunks: list[dict]) -> list[int]:
+        """Appends embeddings and their chunk metadata. Returns the new row ids."""
+        vectors = normalize(embeddings)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {vectors.shape[1]}.")
+        if len(vectors) != len(chunks):
+            raise ValueError("embeddings and chunks must have the same length.")
+        start = self._header["count"]
+        with open(os.path.join(self.path, VECTORS_FILE), "ab") as f:
+            f.write(vectors.astype(self.dtype).tobytes())
+        with open(os.path.join(self.path, CHUNKS_FILE), "a", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self._header["count"] = start + len(vectors)
+        self._commit()
+        return list(range(start, start + len(vectors)))
+
+    def remove(self, rows: list[int]) -> None:
+        """Marks rows as deleted. Space is reclaimed by `compact`."""
+        deleted = set(self._header["deleted"])
+        deleted.update(int(r) for r in rows)
+        self._header["deleted"] = sorted(deleted)
+        self._commit()
+
+    def compact(self) -> dict[int, int]:
+        """Rewrites the index without deleted rows. Returns a map of old -> new row ids."""
+        deleted = set(self._header["deleted"])
+        live = [row for row in range(self._header["count"]) if row not in deleted]
+        vectors = np.array(self.vectors[live]) if live else np.zeros((0, self.dimension), dtype=self.dtype)
+        chunks = [self.chunks[row] for row in live]
+        with open(os.path.join(self.path, VECTORS_FILE + ".tmp"), "wb") as f:
+            f.write(vectors.astype(self.dtype).tobytes())
+        with open(os.path.join(self.path, CHUNKS_FILE + ".tmp"), "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self._vectors = None
+        os.replace(os.path.join(self.path, VECTORS_FILE + ".tmp"), os.path.join(self.path, VECTORS_FILE))
+        os.replace(os.path.join(self.path, CHUNKS_FILE + ".tmp"), os.path.join(self.path, CHUNKS_FILE))
+        self._header["count"] = len(live)
+        self._header["deleted"] = []
+        self._commit()
+        return {old: new for new, old in enumerate(live)}
+
+    def _commit(self) -> None:
+        """Persists the header and drops views and approximate structures that are now stale."""
+        self._header["version"] += 1
+        header_path = os.path.join(self.path, HEADER_FILE)
+        _write_json_atomic(header_path, self._header)
+        self._header_stat = _stat_key(header_path)
+        self._drop_views()
+        for name in (IVF_FILE, HNSW_FILE):
+            stale = os.path.join(self.path, name)
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    def _drop_views(self) -> None:
+        self._vectors = None
+        self._chunks = None
+        self._deleted = None
+        self._ivf = None
+        self._hnsw = None
+
+    # --- Lazily loaded views ---------------------------------------------------
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The (count, dimension) memory-mapped vector matrix."""
+        if self._vectors is None:
+            count = self._header["count"]
+            if count == 0:
+                self._vectors = np.zeros((0, self.dimension), dtype=self.dtype)
+            else:
+                self._vectors = np.memmap(
+                    os.path.join(self.path, VECTORS_FILE),
+                    dtype=self.dtype,
+                    mode="r",
+                    shape=(count, self.dimension),
+                )
+        return self._vectors
+
+    @property
+    def chunks(self) -> list[dict]:
+        if self._chunks is None:
+            with open(os.path.join(self.path, CHUNKS_FILE), "r", encoding="utf-8") as f:
+                self._chunks = [json.loads(line) for line in f if line.strip()]
+        return self._chunks
+
+    @property
+    def deleted_mask(self) -> np.ndarray:
+        if self._deleted is None:
+            mask = np.zeros(self._header["count"], dtype=bool)
+            mask[self._header["deleted"]] = True
+            self._deleted = mask
+        return self._deleted
+
+    # --- Approximate search structures ----------------------------------------
+
+    def build_ivf(self, n_lists: Optional[int] = None, n_iter: int = 10, seed: int = 0) -> None:
+        """Builds an IVF coarse quantizer with spherical k-means and saves it next to the index."""
+        count = self._header["count"]
+        if count == 0:
+            return
+        n_lists = n_lists or max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(seed)
+        data = np.asarray(self.vectors, dtype=np.float32)
+        centroids = data[rng.choice(count, size=min(n_lists, count), replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = _assign(data, centroids)
+            for c in range(len(centroids)):
+                members = data[assignment == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = normalize(centroids)
+        assignment = _assign(data, centroids)
+        np.savez(os.path.join(self.path, IVF_FILE), centroids=centroids, assignment=assignment)
+        self._ivf = _inverted_lists(centroids, assignment)
+
+    def build_hnsw(self, m: int = 16, ef_construction: int = 200) -> None:
+        """Builds an HNSW graph with hnswlib (optional dependency)."""
+        import hnswlib
+
+        count = self._header["count"]
+        graph = hnswlib.Index(space="cosine", dim=self.dimension)
+        graph.init_index(max_elements=max(count, 1), M=m, ef_construction=ef_construction)
+        if count:
+            graph.add_items(np.asarray(self.vectors, dtype=np.float32), np.arange(count))
+        graph.save_index(os.path.join(self.path, HNSW_FILE))
+        self._hnsw = graph
+
+    def _load_ivf(self):
+        if self._ivf is None:
+            ivf_path = os.path.join(self.path, IVF_FILE)
+            if not os.path.exists(ivf_path):
+                self.build_ivf()
+            else:
+                with np.load(ivf_path) as data:
+                    self._ivf = _inverted_lists(data["centroids"], data["assignment"])
+        return self._ivf
+
+    def _load_hnsw(self):
+        if self._hnsw is None:
+            import hnswlib
+
+            hnsw_path = os.path.join(self.path, HNSW_FILE)
+            if not os.path.exists(hnsw_path):
+                self.build_hnsw()
+            else:
+                graph = hnswlib.Index(space="cosine", dim=self.dimension)
+                graph.load_index(hnsw_path, max_elements=max(self._header["count"], 1))
+                self._hnsw = graph
+        return self._hnsw
+
+    # --- Search ----------------------------------------------------------------
+
+    def search(
+        self,
+        queries: np.ndarray,
+        similarity_top_k: int = 10,
+        vector_distance_threshold: Optional[float] = None,
+        mode: str = "exact",
+        n_probe: int = 8,
+    ) -> list[list[SearchHit]]:
+        """Finds the nearest chunks for a batch of query embeddings.
+
+        Args:
+            queries: A (dimension,) vector or a (n_queries, dimension) matrix.
+            similarity_top_k: Maximum number of results per query.
+            vector_distance_threshold: Only results with a cosine distance below
+                this value are returned. None disables the filter.
+            mode: "exact", "ivf" or "hnsw".
+            n_probe: Number of IVF lists scanned per query in "ivf" mode.
+
+        Returns:
+            One list of hits per query, nearest first.
+        """
+        queries = normalize(queries)
+        if self._header["count"] == 0 or similarity_top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        if mode == "exact":
+            rows, scores = self._search_exact(queries, similarity_top_k)
+        elif mode == "ivf":
+            rows, scores = self._search_ivf(queries, similarity_top_k, n_probe)
+        elif mode == "hnsw":
+            rows, scores = self._search_hnsw(queries, similarity_top_k)
+        else:
+            raise ValueError(f"Unknown search mode '{mode}'.")
+
+        results = []
+        for query_rows, query_scores in zip(rows, scores):
+            hits = []
+            for row, score in zip(query_rows, query_scores):
+                if row < 0:
+                    continue
+                distance = float(1.0 - score)
+                if vector_distance_threshold is not None and distance >= vector_distance_threshold:
+                    continue
+                hits.append(SearchHit(row=int(row), distance=distance, chunk=self.chunks[row]))
+            results.append(hits)
+        return results
+
+    def _search_exact(self, queries: np.ndarray, top_k: int):
+        count = self._header["count"]
+        deleted = self.deleted_mask
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + SEARCH_BLOCK_ROWS], dtype=np.float32)
+            scores = queries @ block.T
+            scores[:, deleted[start:start + len(block)]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            best_rows, best_scores = _top_k(best_rows, best_scores, top_k)
+        return _drop_masked(best_rows, best_scores)
+
+    def _search_ivf(self, queries: np.ndarray, top_k: int, n_probe: int):
+        centroids, list_rows, offsets = self._load_ivf()
+        deleted = self.deleted_mask
+        centroid_scores = queries @ centroids.T
+        n_probe = min(n_probe, len(centroids))
+        probe = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+        all_rows, all_scores = [], []
+        for query, lists in zip(queries, probe):
+            candidates = np.concatenate([list_rows[offsets[l]:offsets[l + 1]] for l in lists])
+            candidates = candidates[~deleted[candidates]]
+            scores = np.asarray(self.vectors[candidates], dtype=np.float32) @ query
+            rows, scores = _top_k(candidates[None, :], scores[None, :], top_k)
+            all_rows.append(rows[0])
+            all_scores.append(scores[0])
+        return all_rows, all_scores
+
+    def _search_hnsw(self, queries: np.ndarray, top_k: int):
+        graph = self._load_hnsw()
+        # Over-fetch so that deleted rows can be dropped without losing results.
+        k = min(self._header["count"], top_k + len(self._header["deleted"]))
+        graph.set_ef(max(k, 50))
+        labels, distances = graph.knn_query(queries, k=k)
+        deleted = self.deleted_mask
+        all_rows, all_scores = [], []
+        for rows, dists in zip(labels, distances):
+            keep = ~deleted[rows]
+            all_rows.append(rows[keep][:top_k])
+            all_scores.append((1.0 - dists[keep])[:top_k])
+        return all_rows, all_scores
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignment = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), SEARCH_BLOCK_ROWS):
+        block = data[start:start + SEARCH_BLOCK_ROWS]
+        assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def _inverted_lists(centroids: np.ndarray, assignment: np.ndarray):
+    """Groups row ids by IVF list: rows of list l are list_rows[offsets[l]:offsets[l + 1]]."""
+    list_rows = np.argsort(assignment, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+    return centroids, list_rows, offsets
+
+
+def _top_k(rows: np.ndarray, scores: np.ndarray, k: int):
+    """Keeps the k best (row, score) pairs per query, sorted by descending score."""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        rows = np.take_along_axis(rows, part, axis=1)
+        scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def _drop_masked(rows: np.ndarray, scores: np.ndarray):
+    """Turns rows scored -inf (deleted) into -1 so callers can skip them."""
+    rows = np.where(np.isneginf(scores), -1, rows)
+    return list(rows), list(scores)
+
+
+def _stat_key(path: str) -> tuple[int, int, int]:
+    # Headers are replaced atomically, so a new inode shows a rewrite even within one mtime tick.
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _write_json_atomic(path: str, data: dict) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
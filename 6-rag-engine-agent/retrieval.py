@@ -0,0 +1,265 @@
+"""Pluggable retrieval backends for the RAG agent.
+
+RAG_BACKEND selects where `retrieve_rag_documentation` gets its chunks from:
+
+    vertex        (default) Vertex AI RAG Engine corpus named by RAG_CORPUS,
+                  attached to the model as a built-in retrieval tool.
+    vertex_query  The same corpus, queried from a function tool so that the
+                  results can be cached locally.
+    local         On-disk vector index in RAG_LOCAL_INDEX_DIR, searched in-process.
+                  RAG_LOCAL_INDEX_MODE picks "exact" (default), "ivf" or "hnsw".
+
+All backends use the same similarity_top_k and vector_distance_threshold.
+The local backend fuses BM25 and vector candidates unless RAG_RETRIEVAL=vector.
+Function-tool backends rerank their candidates (RAG_RERANK=off to disable) and
+send only as many chunks as fit RAG_CONTEXT_TOKEN_BUDGET (at most RAG_MAX_CHUNKS).
+Function-tool backends are wrapped in a `RetrievalCache` unless RAG_CACHE=off;
+RAG_CACHE_SEMANTIC=off keeps only the exact-match tier.
+"""
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from google.adk.tools import FunctionTool
+
+from .embeddings import Embedder, embedder_from_env
+from .hybrid import (
+    DEFAULT_CANDIDATE_K,
+    DEFAULT_MAX_CHUNKS,
+    DEFAULT_TOKEN_BUDGET,
+    HybridSearcher,
+    LexicalReranker,
+    Reranker,
+    finalize_contexts,
+)
+from .local_index import LocalVectorIndex
+from .retrieval_cache import CachedRetrievalBackend, RetrievalCache
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_TOOL_NAME = "retrieve_rag_documentation"
+RETRIEVAL_TOOL_DESCRIPTION = (
+    "Use this tool to retrieve documentation and reference materials for the question from the RAG corpus,"
+)
+SIMILARITY_TOP_K = 10
+VECTOR_DISTANCE_THRESHOLD = 0.6
+DEFAULT_LOCAL_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rag_index")
+
+
+class RetrievalBackend(ABC):
+    """Returns the chunks relevant to a query."""
+
+    @abstractmethod
+    def retrieve(self, query: str, query_vector=None) -> list[dict]:
+        """Returns chunks as dicts with at least `text`, `title` and `distance`.
+
+        Backends that embed queries with the same embedder as the cache may use
+        `query_vector` instead of embedding the query again.
+        """
+
+    @property
+    def corpus_version(self) -> str:
+        """Identifies the current corpus contents; changes when the corpus changes."""
+        return "static"
+
+
+class LocalIndexBackend(RetrievalBackend):
+    """Retrieval from a `LocalVectorIndex` with an in-process embedder."""
+
+    def __init__(
+        self,
+        index_dir: str,
+        embedder: Optional[Embedder] = None,
+        similarity_top_k: int = SIMILARITY_TOP_K,
+        vector_distance_threshold: Optional[float] = VECTOR_DISTANCE_THRESHOLD,
+        mode: str = "exact",
+        hybrid: Optional[HybridSearcher] = None,
+        reranker: Optional[Reranker] = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+    ):
+        self.index_dir = index_dir
+        self.embedder = embedder or embedder_from_env()
+        self.similarity_top_k = similarity_top_k
+        self.vector_distance_threshold = vector_distance_threshold
+        self.mode = mode
+        self.hybrid = hybrid
+        self.reranker = reranker
+        self.token_budget = token_budget
+        self.max_chunks = max_chunks
+        self._index: Optional[LocalVectorIndex] = None
+
+    @property
+    def index(self) -> LocalVectorIndex:
+        """The index, reloaded if ingest.py has changed it since the last lookup."""
+        if self._index is None:
+            self._index = LocalVectorIndex(self.index_dir)
+        else:
+            self._index.refresh()
+        return self._index
+
+    @property
+    def corpus_version(self) -> str:
+        return f"{self.index_dir}@{self.index.version}"
+
+    def retrieve(self, query: str, query_vector=None) -> list[dict]:
+        started = time.perf_counter()
+        if query_vector is None:
+            query_vector = self.embedder.embed_queries([query])
+        embedded = time.perf_counter()
+        index = self.index
+        if self.hybrid is not None:
+            candidates = self.hybrid.candidates(
+                index, query, query_vector, self.vector_distance_threshold, mode=self.mode
+            )
+        else:
+            hits = index.search(
+                query_vector,
+                similarity_top_k=self.similarity_top_k,
+                vector_distance_threshold=self.vector_distance_threshold,
+                mode=self.mode,
+            )[0]
+            candidates = [
+                {
+                    "text": hit.chunk.get("text", ""),
+                    "title": hit.chunk.get("title", ""),
+                    "source_uri": hit.chunk.get("source_uri", ""),
+                    "page": hit.chunk.get("page"),
+                    "distance": round(hit.distance, 4),
+                }
+                for hit in hits
+            ]
+        searched = time.perf_counter()
+        contexts = finalize_contexts(query, candidates, self.reranker, self.token_budget, self.max_chunks)
+        logger.info(
+            f"Local retrieval: {len(contexts)} of {len(candidates)} chunks, embed {1000 * (embedded - started):.1f} ms, "
+            f"search {1000 * (searched - embedded):.1f} ms, rerank {1000 * (time.perf_counter() - searched):.1f} ms"
+        )
+        return contexts
+
+
+class VertexRagQueryBackend(RetrievalBackend):
+    """Retrieval from a Vertex AI RAG Engine corpus through the retrieval_query API."""
+
+    def __init__(
+        self,
+        rag_corpus: str,
+        similarity_top_k: int = SIMILARITY_TOP_K,
+        vector_distance_threshold: Optional[float] = VECTOR_DISTANCE_THRESHOLD,
+        reranker: Optional[Reranker] = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+    ):
+        self.rag_corpus = rag_corpus
+        self.similarity_top_k = similarity_top_k
+        self.vector_distance_threshold = vector_distance_threshold
+        self.reranker = reranker
+        self.token_budget = token_budget
+        self.max_chunks = max_chunks
+
+    @property
+    def corpus_version(self) -> str:
+        # Bump RAG_CORPUS_VERSION after re-importing files to invalidate cached results.
+        return f"{self.rag_corpus}@{os.environ.get('RAG_CORPUS_VERSION', '1')}"
+
+    def retrieve(self, query: str, query_vector=None) -> list[dict]:
+        from vertexai.preview import rag
+
+        response = rag.retrieval_query(
+            text=query,
+            rag_resources=[rag.RagResource(rag_corpus=self.rag_corpus)],
+            rag_retrieval_config=rag.RagRetrievalConfig(
+                top_k=self.similarity_top_k,
+                filter=rag.Filter(vector_distance_threshold=self.vector_distance_threshold),
+            ),
+        )
+        candidates = [
+            {
+                "text": context.text,
+                "title": context.source_display_name,
+                "source_uri": context.source_uri,
+                "distance": round(context.distance, 4),
+            }
+            for context in response.contexts.contexts
+        ]
+        return finalize_contexts(query, candidates, self.reranker, self.token_budget, self.max_chunks)
+
+
+def make_retrieval_tool(backend: RetrievalBackend) -> FunctionTool:
+    """Wraps a backend in the `retrieve_rag_documentation` function tool."""
+
+    def retrieve_rag_documentation(query: str) -> dict:
+        """Use this tool to retrieve documentation and reference materials for the question from the RAG corpus.
+
+        Args:
+            query: The question or search terms to look up in the corpus.
+
+        Returns:
+            A dictionary with the retrieved chunks, each with its text and title.
+        """
+        return {"status": "success", "contexts": backend.retrieve(query)}
+
+    return FunctionTool(retrieve_rag_documentation)
+
+
+def backend_from_env() -> Optional[RetrievalBackend]:
+    """Returns the in-process backend selected by RAG_BACKEND, or None for the Vertex built-in tool."""
+    backend_name = os.environ.get("RAG_BACKEND", "vertex").lower()
+    selection = {
+        "reranker": None if os.environ.get("RAG_RERANK", "on").lower() == "off" else LexicalReranker(),
+        "token_budget": int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET))),
+        "max_chunks": int(os.environ.get("RAG_MAX_CHUNKS", str(DEFAULT_MAX_CHUNKS))),
+    }
+    if backend_name == "local":
+        hybrid = None
+        if os.environ.get("RAG_RETRIEVAL", "hybrid").lower() == "hybrid":
+            hybrid = HybridSearcher(candidate_k=int(os.environ.get("RAG_CANDIDATE_K", str(DEFAULT_CANDIDATE_K))))
+        backend = LocalIndexBackend(
+            os.environ.get("RAG_LOCAL_INDEX_DIR", DEFAULT_LOCAL_INDEX_DIR),
+            mode=os.environ.get("RAG_LOCAL_INDEX_MODE", "exact"),
+            hybrid=hybrid,
+            **selection,
+        )
+        # The local backend can reuse the query embedding computed by the cache.
+        cache_embedder = backend.embedder
+    elif backend_name == "vertex_query":
+        backend = VertexRagQueryBackend(os.environ.get("RAG_CORPUS"), **selection)
+        cache_embedder = embedder_from_env()
+    else:
+        return None
+
+    if os.environ.get("RAG_CACHE", "on").lower() == "off":
+        return backend
+    if os.environ.get("RAG_CACHE_SEMANTIC", "on").lower() == "off":
+        cache_embedder = None
+    cache = RetrievalCache(
+        embedder=cache_embedder,
+        max_entries=int(os.environ.get("RAG_CACHE_MAX_ENTRIES", "1024")),
+        ttl_seconds=float(os.environ.get("RAG_CACHE_TTL_SECONDS", "3600")),
+        similarity_threshold=float(os.environ.get("RAG_CACHE_SIMILARITY", "0.92")),
+    )
+    return CachedRetrievalBackend(backend, cache)
+
+
+def build_retrieval_tool():
+    """Builds the retrieval tool for the backend selected by RAG_BACKEND."""
+    backend = backend_from_env()
+    if backend is not None:
+        return make_retrieval_tool(backend)
+
+    from google.adk.tools.retrieval.vertex_ai_rag_retrieval import VertexAiRagRetrieval
+    from vertexai.preview import rag
+
+    return VertexAiRagRetrieval(
+        name=RETRIEVAL_TOOL_NAME,
+        description=RETRIEVAL_TOOL_DESCRIPTION,
+        rag_resources=[
+            rag.RagResource(
+                rag_corpus=os.environ.get("RAG_CORPUS")
+            )
+        ],
+        similarity_top_k=SIMILARITY_TOP_K,
+        vector_distance_threshold=VECTOR_DISTANCE_THRESHOLD,
+    )
@@ -0,0 +1,211 @@
+"""Query-result cache in front of `retrieve_rag_documentation`.
+
+Lookups go through two tiers:
+
+1. Exact: the query is normalised (case, whitespace, punctuation) and hashed.
+2. Semantic: the query embedding is compared with the embeddings of cached
+   queries; the nearest one is reused if its cosine similarity is at least
+   `similarity_threshold`, so paraphrases of a cached question also hit.
+
+Entries expire after a TTL and the least recently used ones are evicted. The
+whole cache is dropped when the backend reports a new corpus version, so results
+never outlive a re-index.
+"""
+import hashlib
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from adk_common.caching import TTLCache
+from adk_common.tool_metrics import note_cache_hit
+
+from .embeddings import Embedder
+from .local_index import normalize
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_query(query: str) -> str:
+    """Lower-cases the query and collapses punctuation and whitespace."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", query.lower()).split())
+
+
+def query_key(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _CachedResult:
+    contexts: list[dict]
+    vector: Optional[np.ndarray]
+    latency_ms: float
+
+
+class RetrievalCache:
+    """Exact + semantic cache of retrieval results with TTL, LRU and corpus versioning."""
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.92,
+    ):
+        """
+        Args:
+            embedder: Embeds queries for the semantic tier; None disables that tier.
+            max_entries: Maximum number of cached queries.
+            ttl_seconds: Lifetime of a cached result.
+            similarity_threshold: Minimum cosine similarity for a semantic hit.
+        """
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._corpus_version: Optional[str] = None
+        self._lock = threading.Lock()
+        # Matrix of cached query vectors for the semantic tier, rebuilt lazily.
+        self._semantic_keys: list[str] = []
+        self._semantic_matrix: Optional[np.ndarray] = None
+        self._semantic_dirty = False
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_ms = 0.0
+
+    def _check_version(self, corpus_version: str) -> None:
+        if corpus_version != self._corpus_version:
+            if self._corpus_version is not None:
+                logger.info(f"Corpus changed ({self._corpus_version} -> {corpus_version}); clearing retrieval cache.")
+                self.invalidations += 1
+            self._entries.clear()
+            self._semantic_keys = []
+            self._semantic_matrix = None
+            self._corpus_version = corpus_version
+
+    def embed(self, query: str) -> Optional[np.ndarray]:
+        """Returns the normalised query embedding, or None without a semantic tier."""
+        if self.embedder is None:
+            return None
+        return normalize(self.embedder.embed_queries([query]))[0]
+
+    def lookup(
+        self, query: str, corpus_version: str, query_vector: Optional[np.ndarray] = None
+    ) -> tuple[Optional[list[dict]], Optional[str], Optional[np.ndarray]]:
+        """Looks a query up in the exact tier, then the semantic tier.
+
+        The query is only embedded when the exact tier misses (unless
+        `query_vector` is given).
+
+        Returns:
+            (contexts, tier, query_vector): tier is "exact", "semantic" or None on
+            a miss, and query_vector is the embedding to pass on to `store`.
+        """
+        with self._lock:
+            self._check_version(corpus_version)
+            entry = self._entries.get(query_key(query))
+            if entry is not None:
+                self.exact_hits += 1
+                self.saved_ms += entry.latency_ms
+                return entry.contexts, "exact", query_vector
+        if query_vector is None:
+            query_vector = self.embed(query)
+        with self._lock:
+            if query_vector is not None:
+                entry = self._nearest(query_vector)
+                if entry is not None:
+                    self.semantic_hits += 1
+                    self.saved_ms += entry.latency_ms
+                    return entry.contexts, "semantic", query_vector
+            self.misses += 1
+            return None, None, query_vector
+
+    def store(
+        self,
+        query: str,
+        contexts: list[dict],
+        latency_ms: float,
+        corpus_version: str,
+        query_vector: Optional[np.ndarray] = None,
+    ) -> None:
+        with self._lock:
+            self._check_version(corpus_version)
+            self._entries.set(query_key(query), _CachedResult(contexts, query_vector, latency_ms))
+            if query_vector is not None:
+                self._semantic_dirty = True
+
+    def _nearest(self, query_vector: np.ndarray) -> Optional[_CachedResult]:
+        if self._semantic_dirty or self._semantic_matrix is None:
+            self._rebuild_semantic_index()
+        if not self._semantic_keys:
+            return None
+        similarities = self._semantic_matrix @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        entry = self._entries.get(self._semantic_keys[best])
+        if entry is None:
+            # Expired or evicted since the matrix was built.
+            self._semantic_dirty = True
+        return entry
+
+    def _rebuild_semantic_index(self) -> None:
+        keys, vectors = [], []
+        for key, entry in self._entries.items():
+            if entry.vector is not None:
+                keys.append(key)
+                vectors.append(entry.vector)
+        self._semantic_keys = keys
+        self._semantic_matrix = np.stack(vectors) if vectors else None
+        self._semantic_dirty = False
+
+    def metrics(self) -> dict:
+        """Hit counts, hit rate and the retrieval latency saved by cache hits."""
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "lookups": lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(self.saved_ms, 1),
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+            "evictions": self._entries.stats.evictions,
+            "expirations": self._entries.stats.expirations,
+        }
+
+
+class CachedRetrievalBackend:
+    """Wraps a retrieval backend with a `RetrievalCache`."""
+
+    def __init__(self, backend, cache: RetrievalCache):
+        self.backend = backend
+        self.cache = cache
+
+    @property
+    def corpus_version(self) -> str:
+        return self.backend.corpus_version
+
+    def retrieve(self, query: str, query_vector: Optional[np.ndarray] = None) -> list[dict]:
+        corpus_version = self.backend.corpus_version
+        contexts, tier, query_vector = self.cache.lookup(query, corpus_version, query_vector)
+        if contexts is not None:
+            note_cache_hit()
+            logger.info(f"Retrieval cache {tier} hit; metrics={self.cache.metrics()}")
+            return contexts
+
+        started = time.perf_counter()
+        contexts = self.backend.retrieve(query, query_vector=query_vector)
+        latency_ms = 1000 * (time.perf_counter() - started)
+        self.cache.store(query, contexts, latency_ms, corpus_version, query_vector)
+        logger.info(f"Retrieval cache miss ({latency_ms:.1f} ms); metrics={self.cache.metrics()}")
+        return contexts
@@ -1,12 +1,17 @@
-from google.adk.agents import Agent
-from toolbox_core import ToolboxSyncClient
+import os
 
-toolbox = ToolboxSyncClient("http://127.0.0.1:7000")
+from google.adk.agents import Agent
+from adk_common.tool_cache import ToolResultCache, load_cache_policies
+from adk_common.tool_metrics import instrument_agent
+from adk_common.toolbox import PooledToolboxToolset
 
-# Load single tool
-# tools = toolbox.load_tool('search-hotels-by-location')
-# Load all the tools
-tools = toolbox.load_toolset('my_first_toolset')
+# The toolset is loaded lazily on the first model turn through a shared, pooled
+# toolbox client (TOOLBOX_URL, default http://127.0.0.1:7000), so the agent
+# starts even if the toolbox server is not running yet.
+# To expose a single tool: PooledToolboxToolset('my_first_toolset', tool_filter=['search-hotels-by-location'])
+# Query results are cached per tool with the TTLs in tool_cache.json.
+result_cache = ToolResultCache(load_cache_policies(os.path.join(os.path.dirname(__file__), "tool_cache.json")))
+tools = PooledToolboxToolset('my_first_toolset', result_cache=result_cache)
 
 root_agent = Agent(
     name="hotel_agent",
@@ -17,5 +22,7 @@ root_agent = Agent(
     instruction=(
         "You are a helpful agent who can answer user questions about the hotels in a specific city or hotels by name. Use the tools to answer the question"
     ),
-    tools=tools,
-)
\ No newline at end of file
+    tools=[tools],
+)
+
+instrument_agent(root_agent)
@@ -1,12 +1,12 @@
 import os
 import pickle # For storing token
 from google.adk.agents import Agent
+from google.adk.tools import ToolContext
 from google.genai import types
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from adk_common.tool_metrics import instrument_agent
+
 
 MODEL = "gemini-2.0-flash-001" # Using a more recent model
 # If modifying these scopes, delete the file token.pickle.
@@ -19,6 +19,12 @@ def get_tasks_service():
     """Shows basic usage of the Google Tasks API.
     Returns an authenticated Google Tasks API service object.
     """
+    # The OAuth flow and API discovery client are imported on first use to keep
+    # the agent's cold start fast.
+    from google.auth.transport.requests import Request
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+
     creds = None
     # The file token.pickle stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -59,19 +65,16 @@ def get_tasks_service():
 
 # --- Tool Functions (modified for Google Tasks API) ---
 
-# Cache for task list and IDs to avoid multiple API calls if agent needs it.
-# This is a simple in-memory cache for the duration of one user query processing.
-_task_list_cache = None
-_task_id_map_cache = None # Maps simple numbers (1, 2, 3...) to Google Task IDs for user convenience
-
+# The simple numbers (1, 2, 3...) shown by list_tasks are mapped to Google Task IDs
+# in the session state of the user who listed them, so concurrent users of one
+# process never see each other's numbering.
+TASK_NUMBERS_KEY = "task_numbers"
 
 
-
-def _fetch_and_cache_tasks(service):
-    """Helper to fetch tasks and populate caches."""
-    global _task_list_cache, _task_id_map_cache
-    _task_list_cache = []
-    _task_id_map_cache = {}
+def _fetch_tasks(service) -> tuple[list[dict], dict[str, str]]:
+    """Helper to fetch pending tasks and their Google Task IDs by number (as a string)."""
+    task_list = []
+    task_numbers = {}
     try:
         # Using '@default' for the primary task list
         results = service.tasks().list(tasklist='@default', showCompleted=False, showHidden=False, maxResults=100).execute()
@@ -80,35 +83,33 @@ def _fetch_and_cache_tasks(service):
             for i, task_item in enumerate(items):
                 # Only add non-completed tasks to the simplified list for the agent
                 if task_item.get('status') != 'completed':
-                    _task_list_cache.append({
+                    task_list.append({
                         'id': task_item['id'], # Google's Task ID
                         'title': task_item['title'],
                         'notes': task_item.get('notes', '')
                     })
-                    _task_id_map_cache[i + 1] = task_item['id'] # Map 1, 2, 3... to Google ID
-        return items # Return raw items as well if needed elsewhere
+                    task_numbers[str(i + 1)] = task_item['id'] # Map 1, 2, 3... to Google ID
     except HttpError as err:
         print(f"An API error occurred while fetching tasks: {err}")
-        return [] # Return empty on error to prevent crash
+    return task_list, task_numbers
 
-def list_tasks() -> str:
+def list_tasks(tool_context: ToolContext) -> str:
     """Lists all current, non-completed tasks from Google Tasks with a simple numeric ID for user interaction."""
-    global _task_list_cache, _task_id_map_cache
     service = get_tasks_service()
-    _fetch_and_cache_tasks(service) # Refresh cache
+    task_list, task_numbers = _fetch_tasks(service)
+    tool_context.state[TASK_NUMBERS_KEY] = task_numbers
 
-    if not _task_list_cache:
+    if not task_list:
         return "Your Google Tasks list is empty or all tasks are completed."
 
     output = "Your Google To-Do List (pending tasks):\n"
-    for i, task in enumerate(_task_list_cache):
+    for i, task in enumerate(task_list):
         output += f"{i + 1}. {task['title']}\n" # User sees 1, 2, 3...
     output += "\nUse the number to refer to tasks for completion."
     return output.strip()
 
 def add_task(description: str) -> str:
     """Adds a new task to the default Google Tasks list."""
-    global _task_list_cache # Invalidate cache
     service = get_tasks_service()
     task_body = {
         'title': description,
@@ -116,26 +117,26 @@ def add_task(description: str) -> str:
     }
     try:
         created_task = service.tasks().insert(tasklist='@default', body=task_body).execute()
-        _task_list_cache = None # Invalidate cache as list has changed
         return f"Task '{description}' added to Google Tasks with ID {created_task['id']}."
     except HttpError as err:
         print(f"An API error occurred while adding task: {err}")
         return f"Error adding task '{description}' to Google Tasks. Please check logs."
 
-def complete_task(task_number: int) -> str:
+def complete_task(task_number: int, tool_context: ToolContext) -> str:
     """
     Marks a task as complete in Google Tasks given its simple numeric ID from the list_tasks command.
     """
-    global _task_list_cache, _task_id_map_cache
     service = get_tasks_service()
+    task_numbers = tool_context.state.get(TASK_NUMBERS_KEY)
 
-    # If cache is empty (e.g., direct call without listing), try to populate it
-    if not _task_id_map_cache:
-        _fetch_and_cache_tasks(service)
-        if not _task_id_map_cache: # Still empty after fetch
+    # If the tasks were not listed in this session yet, number them now
+    if not task_numbers:
+        _, task_numbers = _fetch_tasks(service)
+        if not task_numbers: # Still empty after fetch
             return "Could not find tasks to complete. Please list tasks first."
+        tool_context.state[TASK_NUMBERS_KEY] = task_numbers
 
-    google_task_id = _task_id_map_cache.get(task_number)
+    google_task_id = task_numbers.get(str(task_number))
 
     if not google_task_id:
         return f"Error: Task number {task_number} not found in the current list. Please use 'list_tasks' to see available task numbers."
@@ -157,8 +158,7 @@ def complete_task(task_number: int) -> str:
             'status': 'completed'
         }
         service.tasks().update(tasklist='@default', task=google_task_id, body=updated_task_body).execute()
-        _task_list_cache = None # Invalidate cache
-        _task_id_map_cache = None
+        tool_context.state[TASK_NUMBERS_KEY] = None # The numbering has changed
         return f"Task '{task_title}' (ID: {google_task_id}) has been marked as completed in Google Tasks."
     except HttpError as err:
         if err.resp.status == 404:
@@ -186,9 +186,10 @@ If 'complete_task' is called with a description, tell the user you need the task
 root_agent = Agent(
     model=MODEL,
     name="agent_todo_google_tasks",
-    description="A conversational agent to manage a to-do list using Google Tasks."+agent_todo_instruction_text,
+    description="A conversational agent to manage a to-do list using Google Tasks.",
+    instruction=agent_todo_instruction_text,
     generate_content_config=types.GenerateContentConfig(temperature=0.2),
     tools=[list_tasks, add_task, complete_task],
 )
 
-
+instrument_agent(root_agent)
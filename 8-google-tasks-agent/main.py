@@ -1,8 +1,24 @@
+"""Runs the Google Tasks agent from the command line, streaming its replies.
+
+Usage (from the repository root):
+
+    python -m 8-google-tasks-agent.main "What tasks do I have this week?"
+    python -m 8-google-tasks-agent.main < queries.txt     # one query per line, one conversation
+
+Queries are served by a `RunnerPool` (see adk_common/serving.py), which keeps
+the runner and the user's session between queries, so follow-up questions see
+the earlier turns. Model output is printed as it is generated (set
+ADK_STREAMING=off to wait for whole responses), followed by the time to the
+first text and to the final response.
+"""
+import asyncio
 import os
+import sys
 import time
 
-# Important: Import your modified agent_todo
-from tasks_store import google_agent_todo # This will now use Google Tasks
+from adk_common.serving import RunnerPool
+from adk_common.streaming import TextStream, streaming_run_config
+from .agent import root_agent
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -11,31 +27,46 @@ MODEL = os.getenv("MODEL", "gemini-1.5-flash-latest") # Ensure this matches or i
 AGENT_APP_NAME = 'google_tasks_agent_app'
 
 
-def send_query_to_agent(agent, query):
+async def send_query_to_agent(pool, query, user_id='user'):
     """
-    Sends a query to the specified agent and prints the response.
+    Sends a query to the agent served by `pool` and prints the response as it streams.
 
     Args:
-        agent: The agent to send the query to.
+        pool: The started RunnerPool serving the agent.
         query: The query to send to the agent.
+        user_id: The user sending the query; their session is reused across queries.
 
     Returns:
         A tuple containing the elapsed time (in milliseconds) and the final response from the agent.
     """
-    # Create a new session per query. For history, move session creation outside.
-    session = session_service.create_session(app_name=AGENT_APP_NAME, user_id='user')
-
     print(f'\nUser Query: {query}')
-    content = types.Content(role='user', parts=[types.Part(text=query)])
 
     start_time = time.time()
-    runner = Runner(app_name=AGENT_APP_NAME, agent=agent, artifact_service=artifact_service, session_service=session_service)
-    events = runner.run(user_id='user', session_id=session.id, new_message=content)
+    events = pool.run(user_id, query, run_config=streaming_run_config())
 
     final_response = None
     elapsed_time_ms = 0.0
+    first_text_ms = None
+    stream = TextStream()
+    streaming_author = None
+
+    async for event in events:
+        text = stream.update(event)
+        if event.partial:
+            # Streamed text is printed as it arrives; the final event repeats it in full.
+            if text:
+                if first_text_ms is None:
+                    first_text_ms = round((time.time() - start_time) * 1000, 3)
+                if streaming_author != event.author:
+                    streaming_author = event.author
+                    print(f'\nAgent: {event.author}')
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            continue
+        if streaming_author is not None:
+            print()
+            streaming_author = None
 
-    for _, event in enumerate(events):
         is_final_response = event.is_final_response()
         function_calls = event.get_function_calls()
         function_responses = event.get_function_responses()
@@ -47,12 +78,17 @@ def send_query_to_agent(agent, query):
         if is_final_response:
             end_time = time.time()
             elapsed_time_ms = round((end_time - start_time) * 1000, 3)
+            if first_text_ms is None:
+                first_text_ms = elapsed_time_ms
             print('>>> Inside final response <<<')
             if event.content and event.content.parts:
                  final_response = event.content.parts[0].text
                  print(f'Agent: {event.author}')
+                 print(f'Time to first text: {first_text_ms} ms')
                  print(f'Response time: {elapsed_time_ms} ms\n')
-                 print(f'Final Response:\n{final_response}')
+                 if text:
+                     # Not streamed, so not printed yet.
+                     print(f'Final Response:\n{final_response}')
             else:
                 print("Final response event, but no content.")
         elif function_calls:
@@ -73,11 +109,27 @@ def send_query_to_agent(agent, query):
                      print(f'Function Results: {response_text}')
                 else:
                      print(f'Function Results: {function_response.response}') # Fallback
-        elif event.content and event.content.parts: # Interim model responses
+        elif text: # Interim model responses that were not streamed
             print("...Interim Agent Message...")
             print(f'Agent: {event.author}')
-            print(event.content.parts[0].text)
+            print(text)
 
         print("----------------------------------------------------------\n")
 
-    return elapsed_time_ms, final_response
\ No newline at end of file
+    return elapsed_time_ms, final_response
+
+
+async def main(queries):
+    async with RunnerPool(root_agent, AGENT_APP_NAME, runners=1) as pool:
+        for query in queries:
+            await send_query_to_agent(pool, query)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:]:
+        queries = [" ".join(sys.argv[1:])]
+    elif not sys.stdin.isatty():
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+    else:
+        queries = ["List my task lists."]
+    asyncio.run(main(queries))
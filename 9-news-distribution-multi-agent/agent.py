@@ -1,12 +1,79 @@
 from google.adk.agents import LlmAgent, ParallelAgent, SequentialAgent
-import requests
-import feedparser
+from google.adk.tools import ToolContext
 import logging
-from bs4 import BeautifulSoup
+import os
+import threading
+from typing import Optional
+
+from adk_common.tool_metrics import instrument_agent
+from adk_common.turn_accounting import account_turns
+from adk_common.caching import TTLCache
+from adk_common.memoize import memoize_agent
+from .dedup import DEFAULT_THRESHOLD, NearDuplicateIndex
+from .digest import FeedDigestAgent
+from .paragraphs import ParagraphTranslationAgent
+from .reader import DEFAULT_PAGE_CHARS, read_page
+from .webpage import PageSection, StreamingWebpageAgent
     
 # Configure basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def fetch_feed_links(feed_url: str) -> list[str]:
+    """
+    Fetches an RSS feed and extracts the URLs of its items (entries).
+
+    Unlike `get_rss_feed`, fetch and parsing errors are raised, so a caller
+    polling the feed on a schedule (see ingest.py) can back off.
+
+    Args:
+        feed_url: The URL of the RSS feed to process.
+
+    Returns:
+        A list of strings, where each string is the URL of an item
+        found in the feed.
+    """
+    # HTTP and feed parsing libraries are imported on first use to keep the agent's cold start fast.
+    import feedparser
+    import requests
+
+    item_urls = []
+    logging.info(f"Attempting to fetch and parse RSS feed: {feed_url}")
+
+    # 1. Fetch the feed content with a timeout
+    # Using a reasonable user-agent is good practice
+    headers = {'User-Agent': 'My RSS URL Extractor Bot (Python)'}
+    response = requests.get(feed_url, timeout=15, headers=headers)
+    response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+
+    logging.info(f"Successfully fetched feed (Status code: {response.status_code}). Parsing...")
+
+    # 2. Parse the feed content
+    # Pass response.content (bytes) to feedparser to let it handle encoding
+    feed = feedparser.parse(response.content)
+
+    # Check for parsing errors (optional but recommended)
+    if feed.bozo:
+        logging.warning(f"Feed at {feed_url} might be ill-formed. "
+                        f"Bozo reason: {getattr(feed, 'bozo_exception', 'Unknown')}")
+        # Decide if you want to proceed despite potential errors
+        # For this function, we'll try to extract links anyway.
+
+    # 3. Extract the item URLs
+    if feed.entries:
+        logging.info(f"Found {len(feed.entries)} entries in the feed. Extracting links...")
+        for entry in feed.entries:
+            # Entries usually have a 'link' attribute
+            link = entry.get('link')
+            if link:
+                item_urls.append(link)
+            else:
+                logging.debug(f"Entry found without a 'link' attribute: {entry.get('title', 'N/A')}")
+        logging.info(f"Extracted {len(item_urls)} valid links.")
+    else:
+        logging.info("No entries found in the parsed feed.")
+
+    return item_urls
+
 def get_rss_feed(feed_url: str) -> list[str]:
     """
     Fetches an RSS feed and extracts the URLs of its items (entries).
@@ -19,43 +86,10 @@ def get_rss_feed(feed_url: str) -> list[str]:
         found in the feed. Returns an empty list if fetching or
         parsing fails, or if the feed contains no items with links.
     """
-    item_urls = []
-    logging.info(f"Attempting to fetch and parse RSS feed: {feed_url}")
+    import requests
 
     try:
-        # 1. Fetch the feed content with a timeout
-        # Using a reasonable user-agent is good practice
-        headers = {'User-Agent': 'My RSS URL Extractor Bot (Python)'}
-        response = requests.get(feed_url, timeout=15, headers=headers)
-        response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-
-        logging.info(f"Successfully fetched feed (Status code: {response.status_code}). Parsing...")
-
-        # 2. Parse the feed content
-        # Pass response.content (bytes) to feedparser to let it handle encoding
-        feed = feedparser.parse(response.content)
-
-        # Check for parsing errors (optional but recommended)
-        if feed.bozo:
-            logging.warning(f"Feed at {feed_url} might be ill-formed. "
-                            f"Bozo reason: {getattr(feed, 'bozo_exception', 'Unknown')}")
-            # Decide if you want to proceed despite potential errors
-            # For this function, we'll try to extract links anyway.
-
-        # 3. Extract the item URLs
-        if feed.entries:
-            logging.info(f"Found {len(feed.entries)} entries in the feed. Extracting links...")
-            for entry in feed.entries:
-                # Entries usually have a 'link' attribute
-                link = entry.get('link')
-                if link:
-                    item_urls.append(link)
-                else:
-                    logging.debug(f"Entry found without a 'link' attribute: {entry.get('title', 'N/A')}")
-            logging.info(f"Extracted {len(item_urls)} valid links.")
-        else:
-            logging.info("No entries found in the parsed feed.")
-
+        return fetch_feed_links(feed_url)
     except requests.exceptions.Timeout:
         logging.error(f"Timeout error when trying to fetch feed: {feed_url}")
     except requests.exceptions.RequestException as e:
@@ -63,8 +97,34 @@ def get_rss_feed(feed_url: str) -> list[str]:
     except Exception as e:
         # Catch other potential errors during parsing or processing
         logging.error(f"An unexpected error occurred processing feed {feed_url}: {e}", exc_info=True) # Log traceback
+    return []
 
-    return item_urls
+# Articles already read in each run, clustered by near-duplicate text (see dedup.py).
+# NEWS_DEDUP=off returns every copy of a story.
+DEDUP_ENABLED = os.environ.get("NEWS_DEDUP", "on").lower() != "off"
+DEDUP_THRESHOLD = float(os.environ.get("NEWS_DEDUP_THRESHOLD", str(DEFAULT_THRESHOLD)))
+_article_indexes = TTLCache(max_entries=256, ttl_seconds=3600)
+_article_indexes_lock = threading.Lock()
+
+def _run_article_index(tool_context: ToolContext) -> NearDuplicateIndex:
+    with _article_indexes_lock:
+        index = _article_indexes.get(tool_context.invocation_id)
+        if index is None:
+            index = NearDuplicateIndex(threshold=DEDUP_THRESHOLD, keep_text=False)
+            _article_indexes.set(tool_context.invocation_id, index)
+        return index
+
+def _near_duplicate_note(tool_context: ToolContext, url: str, text: str) -> Optional[str]:
+    """Returns the note that replaces an article repeating one already read in this run, if it does."""
+    duplicate_of = _run_article_index(tool_context).add(url, text)
+    if duplicate_of is None:
+        return None
+    representative, score = duplicate_of
+    logging.info(f"{url} is a near-duplicate of {representative} ({score:.0%} similar).")
+    return (
+        f"This article is a near-duplicate ({score:.0%} similar) of {representative}, which was already read. "
+        f"Do not summarize it again; list {url} as another source of that story."
+    )
 
 def get_rss_feed_article(url: str) -> str:
     """
@@ -77,6 +137,9 @@ def get_rss_feed_article(url: str) -> str:
         A string containing the extracted text content of the page,
         or None if fetching or parsing fails or the content type is not HTML.
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     logging.info(f"Attempting to fetch content from URL: {url}")
 
     try:
@@ -140,6 +203,38 @@ def get_rss_feed_article(url: str) -> str:
         logging.error(f"An unexpected error occurred processing URL {url}: {e}", exc_info=True)
         return None
 
+def read_rss_feed_article(url: str, offset: int = 0, max_chars: int = DEFAULT_PAGE_CHARS, tool_context: Optional[ToolContext] = None) -> dict:
+    """
+    Reads one page of the visible text of a web page, downloading it only as far as needed.
+
+    Call it again with `next_offset` as the offset to read the next page; it
+    is None once the text ends. When the first page shows the article is a
+    near-duplicate of one already read in this run, only a short note naming
+    that article is returned instead of the text.
+
+    Args:
+        url: The URL of the web page to read.
+        offset: Characters of text to skip, 0 for the first page.
+        max_chars: Characters of text to return.
+
+    Returns:
+        A dict with the url, offset, text and next_offset of the page, or with
+        an error message if the page could not be read.
+    """
+    import requests
+
+    logging.info(f"Reading {max_chars} characters from offset {offset} of {url}")
+    try:
+        page = read_page(url, offset, max_chars)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error fetching URL {url}: {e}")
+        return {"url": url, "error": str(e)}
+    if DEDUP_ENABLED and tool_context is not None and offset == 0 and page.text:
+        note = _near_duplicate_note(tool_context, url, page.text)
+        if note is not None:
+            page.text, page.next_offset = note, None
+    return page.as_dict()
+
 GEMINI_MODEL_NAME = "gemini-2.0-flash"
 rss_feed_agent = LlmAgent(
     name="rss_feed_agent",
@@ -148,10 +243,42 @@ rss_feed_agent = LlmAgent(
         "Agent that summarizes the news items from a RSS Feed."
     ),
     instruction=(
-        "You are a helpful agent who fetches the links from a RSS Feed and summarizes them for the user. You will first get all the links for the rss feed provided by the user. Then you will extract the contents for each feed as text and summarize it. Then you will present a well formatted list of items with the title and the summary for each item."
+        "You are a helpful agent who fetches the links from a RSS Feed and summarizes them for the user. You will first get all the links for the rss feed provided by the user. Then you will extract the contents for each feed as text with read_rss_feed_article and summarize it; it returns the text a page at a time, so only read the next page (next_offset) of an article when its first page is not enough to summarize it. Then you will present a well formatted list of items with the title and the summary for each item. When an article is reported as a near-duplicate of another, summarize the story once and list all of its links as sources."
+    ),
+    tools=[get_rss_feed, read_rss_feed_article],
+    output_key="news_summary",
+)
+
+# The news is summarized by the digest by default: the articles are read and
+# summarized one at a time and only their summaries are kept, so memory and
+# prompts do not grow with the feed (see digest.py). NEWS_SUMMARY=agent lets
+# rss_feed_agent read the articles with tools and summarize them all at once.
+SUMMARY_MODE = os.environ.get("NEWS_SUMMARY", "digest").lower()
+
+article_summary_agent = LlmAgent(
+    name="article_summary_agent",
+    model=GEMINI_MODEL_NAME,
+    instruction=(
+        "Summarize the news article you are given for a news digest. Reply with a single Markdown list item: "
+        "the title of the article in bold, a summary of two or three sentences, and its link, "
+        "with any 'Also reported at' links as other sources. Reply with the list item only."
     ),
-    tools=[get_rss_feed, get_rss_feed_article],
+    description="Summarizes one news article.",
 )
+memoize_agent(article_summary_agent)
+
+if SUMMARY_MODE == "agent":
+    news_summarizer = rss_feed_agent
+else:
+    news_summarizer = FeedDigestAgent(
+        name="news_digest_agent",
+        description="Summarizes the news items from a RSS Feed one article at a time.",
+        sub_agents=[article_summary_agent],
+        fetch_links=get_rss_feed,
+        max_article_chars=int(os.environ.get("NEWS_ARTICLE_CHARS", str(DEFAULT_PAGE_CHARS))),
+        dedup_threshold=DEDUP_THRESHOLD if DEDUP_ENABLED else None,
+        output_key="news_summary",
+    )
 
 bahasa_translator = LlmAgent(
     name="BahasaAgent",
@@ -177,12 +304,58 @@ vietnamese_translator = LlmAgent(
     output_key="vietnam_version"
 )
 
-parallel_pipeline = ParallelAgent(
-    name="TranslationPipelineAgent",
-    sub_agents=[bahasa_translator, thai_translator, vietnamese_translator],
-    description="Runs multiple tranlsation agents in parallel to translate the report.",
+# The webpage is assembled from a local HTML template by default: its head and the
+# news summary are written as soon as the summary is ready and each translation is
+# appended the moment its translator finishes (see webpage.py). NEWS_WEBPAGE=llm
+# selects the original pipeline, where generate_webpage writes the whole page.
+# NEWS_WEBPAGE_INTRO=on adds a short LLM-written introduction to the templated page.
+WEBPAGE_MODE = os.environ.get("NEWS_WEBPAGE", "template").lower()
+WEBPAGE_INTRO = WEBPAGE_MODE != "llm" and os.environ.get("NEWS_WEBPAGE_INTRO", "off").lower() == "on"
+
+page_intro_agent = LlmAgent(
+    name="page_intro_agent",
+    model=GEMINI_MODEL_NAME,
+    instruction=(
+        "Write a headline and a two-sentence introduction for a webpage presenting this news summary. "
+        "Reply with the headline on the first line as a Markdown heading and the introduction below it, nothing else.\n\n"
+        "{news_summary}"
+    ),
+    description="Writes the headline and introduction of the news webpage.",
+    include_contents="none",
+    output_key="page_intro",
 )
 
+# With the templated page the summary is streamed into the translators by default:
+# each chunk of completed paragraphs is translated while the rest of the summary is
+# still being written (see paragraphs.py). NEWS_TRANSLATION=parallel translates the
+# finished summary with one ParallelAgent call per language instead.
+TRANSLATION_MODE = "parallel" if WEBPAGE_MODE == "llm" else os.environ.get("NEWS_TRANSLATION", "paragraphs").lower()
+translators = [bahasa_translator, thai_translator, vietnamese_translator]
+
+# The translators answer from the summary alone; the chunk translators of the
+# paragraph pipeline are keyed on the chunk they are sent.
+for translator in translators:
+    memoize_agent(translator, inputs=["news_summary"])
+
+if TRANSLATION_MODE == "parallel":
+    summary_stages = [news_summarizer]
+    translation_pipeline = ParallelAgent(
+        name="TranslationPipelineAgent",
+        sub_agents=[*translators, *([page_intro_agent] if WEBPAGE_INTRO else [])],
+        description="Runs multiple tranlsation agents in parallel to translate the report.",
+    )
+    translation_stages = [translation_pipeline]
+else:
+    summary_stages = []
+    translation_pipeline = ParagraphTranslationAgent(
+        name="TranslationPipelineAgent",
+        sub_agents=[news_summarizer, *translators],
+        description="Summarizes the news and translates each completed chunk of paragraphs in parallel.",
+        min_chunk_chars=int(os.environ.get("NEWS_TRANSLATION_CHUNK_CHARS", "1200")),
+    )
+    # The introduction needs the whole summary, so it is written after the translations.
+    translation_stages = [translation_pipeline, *([page_intro_agent] if WEBPAGE_INTRO else [])]
+
 generate_webpage = LlmAgent(
     name="generate_webpage",
     model=GEMINI_MODEL_NAME,
@@ -196,11 +369,39 @@ generate_webpage = LlmAgent(
     ),
     output_key="webpage_content",
 )
+memoize_agent(generate_webpage, inputs=["news_summary", "bahasa_version", "thai_version", "vietnam_version"])
+
+if WEBPAGE_MODE == "llm":
+    webpage_stages = [*translation_stages, generate_webpage]
+else:
+    webpage_stages = [
+        StreamingWebpageAgent(
+            name="generate_webpage",
+            description=(
+                "Publishes a webpage with the news summaries and their translations in Bahasa, Thai, and Vietnamese, "
+                "writing each translation as soon as it is ready."
+            ),
+            sub_agents=translation_stages,
+            title="News digest",
+            summary_section=PageSection(key="news_summary", title="News summary", lang="en", order=1),
+            sections=[
+                *([PageSection(key="page_intro", title="Introduction", lang="en", order=0)] if WEBPAGE_INTRO else []),
+                PageSection(key="bahasa_version", title="Bahasa Indonesia", lang="id", order=2),
+                PageSection(key="thai_version", title="ภาษาไทย (Thai)", lang="th", order=3),
+                PageSection(key="vietnam_version", title="Tiếng Việt (Vietnamese)", lang="vi", order=4),
+            ],
+            output_dir=os.environ.get("NEWS_WEBPAGE_DIR"),
+        )
+    ]
+
 root_agent = SequentialAgent(
     name="news_distribution_agent",
-    sub_agents=[rss_feed_agent, parallel_pipeline, generate_webpage],
+    sub_agents=[*summary_stages, *webpage_stages],
     description=(
         "A multi-agent system that fetches news from RSS feeds, summarizes them, "
         "and translates the summaries into multiple languages. If there is no RSS feed provided, do not run the translation pipeline. "        
     ),
-)
\ No newline at end of file
+)
+
+instrument_agent(root_agent)
+account_turns(root_agent)
@@ -0,0 +1,153 @@
+"""Near-duplicate detection for news articles with MinHash and banded LSH.
+
+The same wire story is published under many links, often across feeds, with
+different navigation, bylines and boilerplate around the same text. Each
+article is reduced to a MinHash signature over its word shingles; signatures
+are split into bands and articles sharing any band are candidates, confirmed
+when their estimated Jaccard similarity reaches the threshold. The first article
+of a cluster is its representative and later copies are attached to it as
+additional sources, so only one copy is summarized and translated.
+
+Articles from the same host are never compared: the pages of one site share
+their navigation and header text, which is enough to make two unrelated
+stories of the site look like copies of each other.
+"""
+import hashlib
+import random
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_SHINGLE_WORDS = 3
+
+
+class MinHasher:
+    """Computes MinHash signatures of texts over lower-cased word shingles."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_words: int = DEFAULT_SHINGLE_WORDS, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def shingles(self, text: str) -> set[int]:
+        words = _WORD.findall(text.lower())
+        size = min(self.shingle_words, len(words)) or 1
+        return {
+            int.from_bytes(hashlib.blake2b(" ".join(words[i:i + size]).encode("utf-8"), digest_size=8).digest(), "big")
+            for i in range(max(1, len(words) - size + 1))
+        }
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        shingles = self.shingles(text)
+        return tuple(min((a * x + b) % _MERSENNE_PRIME for x in shingles) for a, b in self._perms)
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def same_host(a: str, b: str) -> bool:
+    """Whether two links are on the same site, ignoring a leading "www."."""
+    def host(link: str) -> str:
+        name = (urlparse(link).hostname or "").lower()
+        return name[4:] if name.startswith("www.") else name
+    return host(a) == host(b)
+
+
+def band_keys(signature: tuple[int, ...], bands: int = DEFAULT_BANDS) -> list[str]:
+    """One hash per band of the signature; near-duplicates share at least one with high probability."""
+    rows = len(signature) // bands
+    return [
+        f"{band}:" + hashlib.blake2b(
+            b"".join(value.to_bytes(8, "big") for value in signature[band * rows:(band + 1) * rows]), digest_size=8,
+        ).hexdigest()
+        for band in range(bands)
+    ]
+
+
+@dataclass
+class Cluster:
+    """A story and the links of its near-duplicate copies."""
+    representative: str
+    text: str
+    duplicates: list[str] = field(default_factory=list)
+
+    @property
+    def links(self) -> list[str]:
+        return [self.representative, *self.duplicates]
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index that clusters articles as they are added.
+
+    With `keep_text=False` clusters do not hold their representative's text,
+    so the index grows by a signature per article, not by the articles.
+    """
+
+    def __init__(
+        self, threshold: float = DEFAULT_THRESHOLD, bands: int = DEFAULT_BANDS, hasher: Optional[MinHasher] = None,
+        keep_text: bool = True,
+    ):
+        self.hasher = hasher or MinHasher()
+        if self.hasher.num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide the signature length ({self.hasher.num_perm})")
+        self.threshold = threshold
+        self.bands = bands
+        self.keep_text = keep_text
+        self.clusters: dict[str, Cluster] = {}
+        self._signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: dict[str, list[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def find(self, signature: tuple[int, ...], link: Optional[str] = None) -> Optional[tuple[str, float]]:
+        """The most similar representative at or above the threshold, with its similarity.
+
+        Representatives on the same host as `link` are not candidates.
+        """
+        best = None
+        candidates = {key for band in band_keys(signature, self.bands) for key in self._buckets.get(band, ())}
+        for key in candidates:
+            if link is not None and same_host(link, key):
+                continue
+            score = similarity(signature, self._signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def add(self, link: str, text: str) -> Optional[tuple[str, float]]:
+        """Adds an article; returns its representative and similarity if it is a near-duplicate."""
+        signature = self.hasher.signature(text)
+        with self._lock:
+            if link in self.clusters:
+                return None
+            match = self.find(signature, link)
+            if match is not None:
+                self.clusters[match[0]].duplicates.append(link)
+                return match
+            self.clusters[link] = Cluster(link, text if self.keep_text else "")
+            self._signatures[link] = signature
+            for band in band_keys(signature, self.bands):
+                self._buckets[band].append(link)
+        return None
+
+
+def cluster_articles(articles: Iterable[tuple[str, str]], threshold: float = DEFAULT_THRESHOLD) -> list[Cluster]:
+    """Groups `(link, text)` pairs into clusters of near-duplicates, in first-seen order."""
+    index = NearDuplicateIndex(threshold=threshold)
+    for link, text in articles:
+        if text:
+            index.add(link, text)
+    return list(index.clusters.values())
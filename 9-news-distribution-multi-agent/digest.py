@@ -0,0 +1,164 @@
+"""Summarizes a feed one article at a time, keeping only the running summaries.
+
+`rss_feed_agent` reads every article with a tool and answers once they are all
+in its conversation, so the prompt, the session and the process hold the whole
+feed at once and grow with it. `FeedDigestAgent` runs a pipeline over a
+generator of articles instead:
+
+1. extract: the links of each feed URL in the user message are read one by one,
+   each only up to `max_article_chars` of its text (see reader.py); the articles
+   of a message built from the ingestion queue (see ingest.py) are taken from
+   the message the same way,
+2. summarize: each article is sent alone to a copy of the summarizer template
+   (its first sub-agent), while the next article is being read,
+3. store: the article text is dropped and only its summary is kept; each
+   summary is yielded as a partial event when the caller streams, so the
+   translations of the paragraph pipeline start with the first stories.
+
+At most two articles (the one summarized and the one read ahead) are held at a
+time, whatever the number of items in the feed. Near-duplicates of an article
+already summarized are skipped and listed as other sources of its story.
+"""
+import asyncio
+import logging
+import re
+from typing import AsyncGenerator, Callable, Iterator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from adk_common.streaming import event_text
+from adk_common.tool_metrics import tool_metrics
+from .dedup import NearDuplicateIndex
+from .paragraphs import text_agent
+from .reader import DEFAULT_PAGE_CHARS, ArticlePage, read_page
+
+logger = logging.getLogger(__name__)
+
+_URL = re.compile(r"https?://[^\s<>\"')\]]+")
+# Articles handed over by ingest.articles_message.
+_ARTICLE = re.compile(r"^Article: (\S+)$", re.MULTILINE)
+
+NO_FEED = "No RSS feed or articles were given, so there is no news to summarize."
+
+
+def _user_text(ctx: InvocationContext) -> str:
+    if ctx.user_content is None:
+        return ""
+    return "".join(part.text for part in ctx.user_content.parts or [] if part.text)
+
+
+class FeedDigestAgent(BaseAgent):
+    """Streams the articles of a feed through its summarizer one at a time.
+
+    Attributes:
+        fetch_links: Blocking function returning the article links of a feed URL.
+        read_article: Blocking function `(url, offset, max_chars) -> ArticlePage`.
+        max_article_chars: Characters of each article the summarizer is sent.
+        dedup_threshold: Estimated similarity above which an article repeats an
+            earlier story; None summarizes every article.
+        output_key: State key receiving the digest.
+    """
+
+    fetch_links: Callable[[str], list[str]]
+    read_article: Callable[[str, int, int], Optional[ArticlePage]] = read_page
+    max_article_chars: int = DEFAULT_PAGE_CHARS
+    dedup_threshold: Optional[float] = None
+    output_key: str = "news_summary"
+
+    def _articles(self, message: str, also_at: dict[str, list[str]]) -> Iterator[tuple[str, str]]:
+        """Yields `(link, text)` per article to summarize; runs on a worker thread."""
+        index = None
+        if self.dedup_threshold is not None:
+            index = NearDuplicateIndex(threshold=self.dedup_threshold, keep_text=False)
+        for link, text in self._extract(message):
+            if not text:
+                continue
+            duplicate_of = index.add(link, text) if index is not None else None
+            if duplicate_of is not None:
+                representative, score = duplicate_of
+                logger.info(f"{link} is a near-duplicate of {representative} ({score:.0%} similar).")
+                also_at.setdefault(representative, []).append(link)
+                continue
+            yield link, text
+
+    def _extract(self, message: str) -> Iterator[tuple[str, str]]:
+        blocks = list(_ARTICLE.finditer(message))
+        if blocks:
+            for block, following in zip(blocks, [*blocks[1:], None]):
+                end = following.start() if following is not None else len(message)
+                yield block.group(1), message[block.end():end].strip()[:self.max_article_chars]
+            return
+        # The feed and article reads are recorded as the tool calls the agent mode makes.
+        for feed_url in _URL.findall(message):
+            with tool_metrics.measure(self.name, "get_rss_feed", {"feed_url": feed_url}) as call:
+                call.response = links = self.fetch_links(feed_url) or []
+            for link in links:
+                args = {"url": link, "offset": 0, "max_chars": self.max_article_chars}
+                try:
+                    with tool_metrics.measure(self.name, "read_rss_feed_article", args) as call:
+                        page = self.read_article(link, 0, self.max_article_chars)
+                        call.response = page.as_dict() if page is not None else None
+                except Exception as e:
+                    logger.error(f"Error reading article {link}: {e}")
+                    continue
+                if page is not None:
+                    yield link, page.text
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        summarizer = self.sub_agents[0]
+        caller_streams = ctx.run_config is not None and ctx.run_config.streaming_mode == StreamingMode.SSE
+        also_at: dict[str, list[str]] = {}
+        articles = self._articles(_user_text(ctx), also_at)
+        summaries: list[str] = []
+
+        def summary_event(text: str, partial: bool) -> Event:
+            return Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                partial=partial or None,
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                actions=EventActions(state_delta={} if partial else {self.output_key: text}),
+            )
+
+        pending = asyncio.ensure_future(asyncio.to_thread(next, articles, None))
+        read = 0
+        try:
+            while (article := await pending) is not None:
+                # The next article is read while this one is summarized.
+                pending = asyncio.ensure_future(asyncio.to_thread(next, articles, None))
+                link, text = article
+                agent = text_agent(summarizer, f"{summarizer.name}_{read}", f"Article: {link}\n{text}")
+                read += 1
+                del article, text
+                summary = None
+                async for event in agent.run_async(ctx):
+                    if event.author == agent.name and event.is_final_response():
+                        summary = event_text(event).strip()
+                if not summary:
+                    logger.warning(f"No summary was written for {link}")
+                    continue
+                summaries.append(summary)
+                if caller_streams:
+                    yield summary_event(summary + "\n\n", partial=True)
+        finally:
+            # The generator is closed once no thread is reading from it.
+            if pending.done():
+                articles.close()
+            else:
+                pending.add_done_callback(lambda _: articles.close())
+
+        logger.info(f"Summarized {len(summaries)} of {read} articles one at a time")
+        if also_at:
+            sources = "Also reported at:\n" + "\n".join(
+                f"- {link} (same story as {representative})"
+                for representative, links in also_at.items() for link in links
+            )
+            summaries.append(sources)
+            if caller_streams:
+                yield summary_event(sources + "\n\n", partial=True)
+        yield summary_event("\n\n".join(summaries) if summaries else NO_FEED, partial=False)
@@ -0,0 +1,582 @@
+"""Scheduled ingestion of many RSS feeds into a durable queue of new articles.
+
+`get_rss_feed` handles one feed per agent run, so watching hundreds of feeds
+through the agent means hundreds of LLM-driven runs. This service polls the
+feeds itself, independently of model throughput, and queues the new articles
+for the agent pipeline:
+
+    python -m 9-news-distribution-multi-agent.ingest add --interval 300 https://example.com/rss ...
+    python -m 9-news-distribution-multi-agent.ingest add --file feeds.txt
+    python -m 9-news-distribution-multi-agent.ingest run --workers 64
+    python -m 9-news-distribution-multi-agent.ingest consume --batch 20
+    python -m 9-news-distribution-multi-agent.ingest stats
+
+- The feed registry and the article queue live in one SQLite file
+  (`--db`, default NEWS_INGEST_DB). Feeds added while the daemon runs are picked
+  up on its next registry reload.
+- A heap keeps every feed ordered by its next poll time and priority. Each poll
+  is rescheduled after `interval * (1 ± jitter)` so feeds added together spread
+  out, and feeds that cannot be fetched back off exponentially.
+- `--workers` asyncio workers poll due feeds from a bounded queue; the feed and
+  article functions of agent.py run on a thread pool of the same size, and at
+  most `--article-concurrency` articles are fetched at a time.
+- Only links never seen before are fetched. Near-duplicates of an article
+  queued within `--dedup-window` (the same story under another link on another
+  site, see dedup.py) are not queued again; their links are attached to that article as
+  additional sources. Articles are queued with their feed's priority, and `consume` leases a batch, runs the agent pipeline on it
+  and acknowledges the batch only when the run succeeded, so nothing is lost if
+  the consumer stops midway.
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from .dedup import DEFAULT_BANDS, DEFAULT_THRESHOLD, MinHasher, band_keys, same_host, similarity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB = os.environ.get("NEWS_INGEST_DB", "/tmp/news_ingest.db")
+DEFAULT_INTERVAL_SECONDS = 900
+DEFAULT_WORKERS = 32
+DEFAULT_ARTICLE_CONCURRENCY = 32
+DEFAULT_JITTER = 0.1
+MAX_BACKOFF_EXPONENT = 5
+MAX_ARTICLE_ATTEMPTS = 3
+RELOAD_SECONDS = 30
+RETENTION_SECONDS = 30 * 24 * 3600
+DEFAULT_DEDUP_WINDOW_SECONDS = 2 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    interval_seconds REAL NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    next_poll_at REAL,
+    last_polled_at REAL,
+    failures INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    link TEXT NOT NULL UNIQUE,
+    feed_url TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    text TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    leased_until REAL,
+    signature BLOB,
+    duplicate_of INTEGER
+);
+CREATE INDEX IF NOT EXISTS articles_ready ON articles (status, priority, id);
+CREATE INDEX IF NOT EXISTS articles_duplicates ON articles (duplicate_of);
+CREATE TABLE IF NOT EXISTS article_bands (
+    band TEXT NOT NULL,
+    article_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS article_bands_band ON article_bands (band);
+"""
+
+
+@dataclass
+class Feed:
+    url: str
+    interval_seconds: float
+    priority: int = 0
+    next_poll_at: Optional[float] = None
+    failures: int = 0
+
+
+@dataclass
+class QueuedArticle:
+    id: int
+    link: str
+    feed_url: str
+    text: str
+    also_at: list[str]
+
+
+def _pack(signature: tuple[int, ...]) -> bytes:
+    return b"".join(value.to_bytes(8, "big") for value in signature)
+
+
+def _unpack(data: bytes) -> tuple[int, ...]:
+    return tuple(int.from_bytes(data[i:i + 8], "big") for i in range(0, len(data), 8))
+
+
+class IngestStore:
+    """The feed registry and the durable article queue, in one SQLite file.
+
+    Articles are `pending` until leased, `leased` until acknowledged (`done`) or
+    released, and `failed` when the page could not be read; failed links are
+    retried on later polls up to `MAX_ARTICLE_ATTEMPTS` times. A lease that is
+    not acknowledged in time makes the article available again. Articles put
+    with a MinHash signature that match one queued within `dedup_window_seconds`
+    are stored as `duplicate` rows pointing at it.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_DB,
+        dedup_threshold: float = DEFAULT_THRESHOLD,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_SECONDS,
+        bands: int = DEFAULT_BANDS,
+    ):
+        self.path = path
+        self.dedup_threshold = dedup_threshold
+        self.dedup_window_seconds = dedup_window_seconds
+        self.bands = bands
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # --- Feed registry -----------------------------------------------------------
+
+    def add_feeds(self, urls: Iterable[str], interval_seconds: float, priority: int = 0) -> int:
+        """Registers feeds, updating the interval and priority of known ones; returns how many were given."""
+        rows = [(url, interval_seconds, priority) for url in urls]
+        self._transaction(lambda db: db.executemany(
+            "INSERT INTO feeds (url, interval_seconds, priority) VALUES (?, ?, ?) "
+            "ON CONFLICT (url) DO UPDATE SET interval_seconds = excluded.interval_seconds, priority = excluded.priority",
+            rows,
+        ))
+        return len(rows)
+
+    def remove_feeds(self, urls: Iterable[str]) -> None:
+        self._transaction(lambda db: db.executemany("DELETE FROM feeds WHERE url = ?", [(url,) for url in urls]))
+
+    def feeds(self) -> list[Feed]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, interval_seconds, priority, next_poll_at, failures FROM feeds"
+            ).fetchall()
+        return [Feed(*row) for row in rows]
+
+    def record_poll(self, feed: Feed, polled_at: float) -> None:
+        self._transaction(lambda db: db.execute(
+            "UPDATE feeds SET next_poll_at = ?, last_polled_at = ?, failures = ? WHERE url = ?",
+            (feed.next_poll_at, polled_at, feed.failures, feed.url),
+        ))
+
+    # --- Article queue -----------------------------------------------------------
+
+    def unseen(self, links: list[str]) -> list[str]:
+        """Returns the links that were never queued, or whose page could not be read yet."""
+        if not links:
+            return []
+        known = set()
+        with self._lock:
+            for start in range(0, len(links), 500):
+                batch = links[start:start + 500]
+                known.update(row[0] for row in self._db.execute(
+                    f"SELECT link FROM articles WHERE link IN ({','.join('?' * len(batch))}) "
+                    "AND NOT (status = 'failed' AND attempts < ?)",
+                    (*batch, MAX_ARTICLE_ATTEMPTS),
+                ))
+        return [link for link in dict.fromkeys(links) if link not in known]
+
+    def put(
+        self,
+        link: str,
+        feed_url: str,
+        text: Optional[str],
+        priority: int = 0,
+        signature: Optional[tuple[int, ...]] = None,
+    ) -> Optional[str]:
+        """Queues an article, or records a failed read when `text` is None.
+
+        Returns the link of the queued article this one is a near-duplicate of, if any.
+        """
+        def run(db: sqlite3.Connection) -> Optional[str]:
+            now = time.time()
+            status, duplicate_of, representative = ("pending" if text is not None else "failed"), None, None
+            bands = band_keys(signature, self.bands) if signature is not None and text is not None else []
+            if bands:
+                match = self._find_duplicate(db, link, signature, bands, now)
+                if match is not None:
+                    duplicate_of, representative = match
+                    status = "duplicate"
+            article_id = db.execute(
+                "INSERT INTO articles (link, feed_url, priority, text, status, attempts, enqueued_at, signature, duplicate_of) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT (link) DO UPDATE SET text = excluded.text, status = excluded.status, "
+                "attempts = articles.attempts + 1, enqueued_at = excluded.enqueued_at, "
+                "signature = excluded.signature, duplicate_of = excluded.duplicate_of "
+                "RETURNING id",
+                (
+                    link, feed_url, priority, None if duplicate_of else text, status, now,
+                    _pack(signature) if bands else None, duplicate_of,
+                ),
+            ).fetchone()[0]
+            if bands and duplicate_of is None:
+                db.executemany(
+                    "INSERT INTO article_bands (band, article_id) VALUES (?, ?)", [(band, article_id) for band in bands]
+                )
+            return representative
+        return self._transaction(run)
+
+    def _find_duplicate(
+        self, db: sqlite3.Connection, link: str, signature: tuple[int, ...], bands: list[str], now: float
+    ) -> Optional[tuple[int, str]]:
+        rows = db.execute(
+            "SELECT DISTINCT a.id, a.link, a.signature FROM article_bands b JOIN articles a ON a.id = b.article_id "
+            f"WHERE b.band IN ({','.join('?' * len(bands))}) AND a.enqueued_at >= ?",
+            (*bands, now - self.dedup_window_seconds),
+        ).fetchall()
+        best = None
+        for article_id, queued_link, packed in rows:
+            # Pages of one site share their navigation text, so they are not compared (see dedup.py).
+            if same_host(link, queued_link):
+                continue
+            score = similarity(signature, _unpack(packed))
+            if score >= self.dedup_threshold and (best is None or score > best[2]):
+                best = (article_id, queued_link, score)
+        return best[:2] if best else None
+
+    def lease(self, limit: int, lease_seconds: float = 600) -> list[QueuedArticle]:
+        """Takes up to `limit` pending articles, highest priority (lowest value) and oldest first."""
+        def run(db: sqlite3.Connection) -> list[QueuedArticle]:
+            now = time.time()
+            rows = db.execute(
+                "SELECT id, link, feed_url, text FROM articles "
+                "WHERE status = 'pending' OR (status = 'leased' AND leased_until < ?) "
+                "ORDER BY priority, id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            db.executemany(
+                "UPDATE articles SET status = 'leased', leased_until = ? WHERE id = ?",
+                [(now + lease_seconds, row[0]) for row in rows],
+            )
+            return [
+                QueuedArticle(*row, also_at=[
+                    link for (link,) in db.execute("SELECT link FROM articles WHERE duplicate_of = ? ORDER BY id", (row[0],))
+                ])
+                for row in rows
+            ]
+        return self._transaction(run)
+
+    def ack(self, ids: Iterable[int]) -> None:
+        """Marks leased articles as consumed and drops their text."""
+        self._transaction(lambda db: db.executemany(
+            "UPDATE articles SET status = 'done', text = NULL, leased_until = NULL WHERE id = ?",
+            [(article_id,) for article_id in ids],
+        ))
+
+    def release(self, ids: Iterable[int]) -> None:
+        """Returns leased articles to the queue."""
+        self._transaction(lambda db: db.executemany(
+            "UPDATE articles SET status = 'pending', leased_until = NULL WHERE id = ? AND status = 'leased'",
+            [(article_id,) for article_id in ids],
+        ))
+
+    def purge(self, older_than_seconds: float = RETENTION_SECONDS) -> int:
+        """Forgets consumed and failed articles older than the retention period; returns how many."""
+        cutoff = time.time() - older_than_seconds
+
+        def run(db: sqlite3.Connection) -> int:
+            # Near-duplicates are kept while their article is still queued, so their links stay attached.
+            purged = db.execute(
+                "DELETE FROM articles WHERE enqueued_at < ? AND (status IN ('done', 'failed') OR (status = 'duplicate' "
+                "AND duplicate_of NOT IN (SELECT id FROM articles WHERE status IN ('pending', 'leased'))))",
+                (cutoff,),
+            ).rowcount
+            db.execute("DELETE FROM article_bands WHERE article_id NOT IN (SELECT id FROM articles)")
+            return purged
+        return self._transaction(run)
+
+    def stats(self) -> dict:
+        with self._lock:
+            feeds, due = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(next_poll_at IS NULL OR next_poll_at <= ?), 0) FROM feeds",
+                (time.time(),),
+            ).fetchone()
+            articles = dict(self._db.execute("SELECT status, COUNT(*) FROM articles GROUP BY status").fetchall())
+        return {"feeds": feeds, "feeds_due": due, "articles": articles}
+
+
+class FeedScheduler:
+    """Polls every registered feed on its own interval with a bounded pool of asyncio workers.
+
+    `fetch_links` and `fetch_article` are the blocking feed and article
+    functions (by default `fetch_feed_links` and `get_rss_feed_article` from
+    agent.py); they run on a thread pool sized to the workers. `fetch_links`
+    raises when the feed cannot be read, which counts as a failed poll.
+    """
+
+    def __init__(
+        self,
+        store: IngestStore,
+        fetch_links: Callable[[str], list[str]],
+        fetch_article: Callable[[str], Optional[str]],
+        workers: int = DEFAULT_WORKERS,
+        article_concurrency: int = DEFAULT_ARTICLE_CONCURRENCY,
+        jitter: float = DEFAULT_JITTER,
+        reload_seconds: float = RELOAD_SECONDS,
+        rng: Optional[random.Random] = None,
+        hasher: Optional[MinHasher] = None,
+    ):
+        self.store = store
+        self.fetch_links = fetch_links
+        self.fetch_article = fetch_article
+        self.workers = workers
+        self.article_concurrency = article_concurrency
+        self.jitter = jitter
+        self.reload_seconds = reload_seconds
+        self._rng = rng or random.Random()
+        self.hasher = hasher
+        self._heap: list[tuple[float, int, int, str]] = []
+        self._feeds: dict[str, Feed] = {}
+        self._order = itertools.count()
+        self._fetching: set[str] = set()
+        self.polls = 0
+        self.articles_queued = 0
+        self.duplicates = 0
+
+    def _schedule(self, feed: Feed) -> None:
+        heapq.heappush(self._heap, (feed.next_poll_at, feed.priority, next(self._order), feed.url))
+
+    def _next_poll(self, feed: Feed, now: float) -> float:
+        interval = feed.interval_seconds * 2 ** min(feed.failures, MAX_BACKOFF_EXPONENT)
+        return now + interval * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    def reload(self) -> None:
+        """Schedules feeds added to the registry since the last reload and forgets removed ones."""
+        now = time.time()
+        registered = {feed.url: feed for feed in self.store.feeds()}
+        for url in set(self._feeds) - set(registered):
+            del self._feeds[url]
+        for url, feed in registered.items():
+            known = self._feeds.get(url)
+            if known is not None:
+                known.interval_seconds, known.priority = feed.interval_seconds, feed.priority
+                continue
+            if feed.next_poll_at is None:
+                # Spread the first polls of a batch of new feeds over their interval.
+                feed.next_poll_at = now + self._rng.uniform(0, feed.interval_seconds * self.jitter)
+            self._feeds[url] = feed
+            self._schedule(feed)
+
+    async def run(self, duration_seconds: Optional[float] = None) -> None:
+        """Polls due feeds until cancelled, or for `duration_seconds`."""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.workers + self.article_concurrency, thread_name_prefix="ingest")
+        due: asyncio.Queue[Feed] = asyncio.Queue(maxsize=self.workers * 2)
+        articles = asyncio.Semaphore(self.article_concurrency)
+        workers = [asyncio.create_task(self._worker(loop, executor, due, articles)) for _ in range(self.workers)]
+        deadline = time.time() + duration_seconds if duration_seconds is not None else None
+        next_reload = 0.0
+        try:
+            while deadline is None or time.time() < deadline:
+                now = time.time()
+                if now >= next_reload:
+                    await asyncio.to_thread(self.reload)
+                    purged = await asyncio.to_thread(self.store.purge)
+                    if purged:
+                        logger.info(f"Purged {purged} consumed articles")
+                    next_reload = now + self.reload_seconds
+                while self._heap and self._heap[0][0] <= now:
+                    url = heapq.heappop(self._heap)[3]
+                    feed = self._feeds.get(url)
+                    if feed is not None:
+                        # Blocks while every worker is busy, so due feeds wait in the heap.
+                        await due.put(feed)
+                wake = min(next_reload, self._heap[0][0] if self._heap else next_reload)
+                if deadline is not None:
+                    wake = min(wake, deadline)
+                await asyncio.sleep(max(0.0, min(wake - time.time(), 1.0)))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _worker(self, loop, executor, due: "asyncio.Queue[Feed]", articles: asyncio.Semaphore) -> None:
+        while True:
+            feed = await due.get()
+            started = time.time()
+            try:
+                await self._poll(loop, executor, feed, articles)
+                feed.failures = 0
+            except Exception as e:
+                feed.failures += 1
+                logger.warning(f"Polling {feed.url} failed ({feed.failures} in a row): {e}")
+            finally:
+                feed.next_poll_at = self._next_poll(feed, time.time())
+                self.polls += 1
+                await asyncio.to_thread(self.store.record_poll, feed, started)
+                if feed.url in self._feeds:
+                    self._schedule(feed)
+                due.task_done()
+
+    async def _poll(self, loop, executor, feed: Feed, articles: asyncio.Semaphore) -> None:
+        links = await loop.run_in_executor(executor, self.fetch_links, feed.url)
+        new_links = await asyncio.to_thread(self.store.unseen, list(links or []))
+        # A story linked from several feeds polled at the same time is fetched once.
+        new_links = [link for link in new_links if link not in self._fetching]
+        if not new_links:
+            return
+        self._fetching.update(new_links)
+
+        async def fetch(link: str) -> None:
+            try:
+                async with articles:
+                    text = await loop.run_in_executor(executor, self.fetch_article, link)
+                    signature = None
+                    if text and self.hasher is not None:
+                        signature = await loop.run_in_executor(executor, self.hasher.signature, text)
+                duplicate_of = await asyncio.to_thread(self.store.put, link, feed.url, text, feed.priority, signature)
+            finally:
+                self._fetching.discard(link)
+            if duplicate_of is not None:
+                self.duplicates += 1
+                logger.debug(f"{link} is a near-duplicate of {duplicate_of}")
+            elif text is not None:
+                self.articles_queued += 1
+
+        await asyncio.gather(*(fetch(link) for link in new_links))
+        logger.debug(f"Fetched {len(new_links)} new articles from {feed.url}")
+
+
+def articles_message(batch: list[QueuedArticle]) -> str:
+    """The user message that hands a batch of queued articles to the agent pipeline."""
+    parts = [
+        "Summarize the following news articles. They have already been fetched, so do not fetch any RSS feed."
+    ]
+    for article in batch:
+        sources = "".join(f"\nAlso reported at: {link}" for link in article.also_at)
+        parts.append(f"Article: {article.link}\nSource feed: {article.feed_url}{sources}\n{article.text}")
+    return "\n\n".join(parts)
+
+
+async def consume(store: IngestStore, batch_size: int, max_batches: Optional[int] = None) -> int:
+    """Runs the news pipeline on leased batches of queued articles; returns how many batches succeeded.
+
+    Each batch runs in its own session, which is deleted once the batch is
+    acknowledged or released.
+    """
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from .agent import root_agent
+
+    runner = InMemoryRunner(agent=root_agent, app_name="news_ingest")
+    done = 0
+    while max_batches is None or done < max_batches:
+        batch = await asyncio.to_thread(store.lease, batch_size)
+        if not batch:
+            break
+        ids = [article.id for article in batch]
+        session = await runner.session_service.create_session(app_name="news_ingest", user_id="ingest")
+        try:
+            message = types.Content(role="user", parts=[types.Part(text=articles_message(batch))])
+            async for _ in runner.run_async(user_id="ingest", session_id=session.id, new_message=message):
+                pass
+        except Exception:
+            await asyncio.to_thread(store.release, ids)
+            raise
+        else:
+            await asyncio.to_thread(store.ack, ids)
+        finally:
+            await runner.session_service.delete_session(app_name="news_ingest", user_id="ingest", session_id=session.id)
+        done += 1
+        logger.info(f"Published a batch of {len(batch)} queued articles")
+    return done
+
+
+def _read_feed_file(path: str) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Poll many RSS feeds into a durable queue of new articles.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="SQLite file holding the feed registry and article queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Register feeds or update their interval and priority.")
+    add.add_argument("urls", nargs="*")
+    add.add_argument("--file", help="File with one feed URL per line.")
+    add.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SECONDS, help="Poll interval in seconds.")
+    add.add_argument("--priority", type=int, default=0, help="Lower values are polled and consumed first.")
+    remove = commands.add_parser("remove", help="Unregister feeds.")
+    remove.add_argument("urls", nargs="+")
+    run = commands.add_parser("run", help="Poll the registered feeds until interrupted.")
+    run.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    run.add_argument("--article-concurrency", type=int, default=DEFAULT_ARTICLE_CONCURRENCY)
+    run.add_argument("--jitter", type=float, default=DEFAULT_JITTER)
+    run.add_argument("--duration", type=float, help="Stop after this many seconds.")
+    run.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                     help="Estimated Jaccard similarity above which articles are the same story.")
+    run.add_argument("--dedup-window", type=float, default=DEFAULT_DEDUP_WINDOW_SECONDS,
+                     help="Seconds during which a queued article absorbs its near-duplicates.")
+    run.add_argument("--no-dedup", action="store_true", help="Queue every article, even near-duplicates.")
+    consumer = commands.add_parser("consume", help="Run the agent pipeline on queued articles.")
+    consumer.add_argument("--batch", type=int, default=20)
+    consumer.add_argument("--max-batches", type=int)
+    commands.add_parser("stats", help="Print the registry and queue counts.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = IngestStore(
+        args.db,
+        dedup_threshold=getattr(args, "dedup_threshold", DEFAULT_THRESHOLD),
+        dedup_window_seconds=getattr(args, "dedup_window", DEFAULT_DEDUP_WINDOW_SECONDS),
+    )
+    try:
+        if args.command == "add":
+            urls = list(args.urls) + (_read_feed_file(args.file) if args.file else [])
+            print(f"Registered {store.add_feeds(urls, args.interval, args.priority)} feeds")
+        elif args.command == "remove":
+            store.remove_feeds(args.urls)
+        elif args.command == "run":
+            from .agent import fetch_feed_links, get_rss_feed_article
+
+            scheduler = FeedScheduler(
+                store, fetch_feed_links, get_rss_feed_article,
+                workers=args.workers, article_concurrency=args.article_concurrency, jitter=args.jitter,
+                hasher=None if args.no_dedup else MinHasher(),
+            )
+            try:
+                asyncio.run(scheduler.run(args.duration))
+            except KeyboardInterrupt:
+                pass
+            logger.info(
+                f"Polled {scheduler.polls} feeds, queued {scheduler.articles_queued} articles "
+                f"and attached {scheduler.duplicates} near-duplicates to them"
+            )
+        elif args.command == "consume":
+            asyncio.run(consume(store, args.batch, args.max_batches))
+        print(json.dumps(store.stats(), indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
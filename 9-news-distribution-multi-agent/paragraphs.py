@@ -0,0 +1,183 @@
+"""Translates the news summary paragraph by paragraph while it is still being written.
+
+`ParallelAgent` translators only start once the summarizer has finished its
+whole response. `ParagraphTranslationAgent` instead runs its first sub-agent
+(the summarizer) with streaming, cuts the streamed text into chunks of whole
+paragraphs and translates every chunk into each language as soon as it is
+complete, so translation overlaps with summarization:
+
+- the other sub-agents are translator templates: each chunk is translated by a
+  copy of a template that is sent only the chunk, with the template's model,
+  instruction and model callbacks,
+- once the summary is complete and every chunk of a language is translated,
+  the chunks are joined in order and stored under the template's `output_key`,
+- partial events reach the caller only if the caller asked for streaming.
+
+Text the summarizer writes before calling a tool is not part of the summary, so
+the paragraphs buffered for a response are dropped when that response turns
+out to be a tool call.
+"""
+import asyncio
+import contextlib
+import logging
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from adk_common.streaming import ParagraphBuffer, event_text, streaming_run_config
+
+logger = logging.getLogger(__name__)
+
+
+def _callbacks(callback: Any) -> list:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def _send_only(text: str) -> Callable:
+    def before_model(callback_context, llm_request) -> None:
+        # include_contents="none" still carries the latest turn (the whole summary,
+        # or the whole feed); `text` is all the copy is given.
+        llm_request.contents = [types.Content(role="user", parts=[types.Part(text=text)])]
+    return before_model
+
+
+def text_agent(template: LlmAgent, name: str, text: str) -> LlmAgent:
+    """A copy of `template` that is sent only `text`, with its model, instruction and model callbacks."""
+    agent = LlmAgent(
+        name=name,
+        model=template.model,
+        instruction=template.instruction,
+        include_contents="none",
+        before_model_callback=[_send_only(text), *_callbacks(template.before_model_callback)],
+        after_model_callback=template.after_model_callback,
+        on_model_error_callback=template.on_model_error_callback,
+    )
+    # The parent link attributes the copy's model calls to its template.
+    agent.parent_agent = template
+    return agent
+
+
+class _Done:
+    """Queue marker for a finished producer."""
+
+    def __init__(self, agent: BaseAgent):
+        self.agent = agent
+
+
+class ParagraphTranslationAgent(BaseAgent):
+    """Streams its first sub-agent and translates each completed chunk with the others.
+
+    Attributes:
+        min_chunk_chars: Paragraphs are grouped until a chunk has this many
+            characters, to bound the number of translation calls.
+        max_parallel: Maximum translation calls in flight.
+    """
+
+    min_chunk_chars: int = 1200
+    max_parallel: int = 6
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        source, *templates = self.sub_agents
+        caller_streams = ctx.run_config is not None and ctx.run_config.streaming_mode == StreamingMode.SSE
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_parallel)
+        buffer = ParagraphBuffer(self.min_chunk_chars)
+        chunks: list[str] = []
+        translations: dict[str, list[Optional[str]]] = {template.name: [] for template in templates}
+        published: set[str] = set()
+        tasks: list[asyncio.Task] = []
+        streaming_response = False
+
+        async def produce(
+            agent: BaseAgent, agent_ctx: InvocationContext, on_event: Callable[[Event], None],
+            limit: Optional[asyncio.Semaphore] = None,
+        ) -> None:
+            try:
+                async with limit or contextlib.nullcontext():
+                    async for event in agent.run_async(agent_ctx):
+                        # The agent resumes only once the caller has taken the event, so
+                        # its next model call sees the event in the session.
+                        resume = asyncio.Event()
+                        await queue.put((event, on_event, resume))
+                        await resume.wait()
+            finally:
+                await queue.put(_Done(agent))
+
+        def translate(chunk: str) -> None:
+            index = len(chunks)
+            chunks.append(chunk)
+            for template in templates:
+                parts = translations[template.name]
+                parts.append(None)
+                translator = text_agent(template, f"{template.name}_part_{index}", chunk)
+
+                def on_event(event: Event, translator=translator, parts=parts, index=index) -> None:
+                    if event.author == translator.name and event.is_final_response():
+                        parts[index] = event_text(event)
+
+                # Each chunk translation gets its own branch, as parallel agents do.
+                branch = f"{ctx.branch}.{translator.name}" if ctx.branch else translator.name
+                translator_ctx = ctx.model_copy(update={"branch": branch})
+                tasks.append(asyncio.create_task(produce(translator, translator_ctx, on_event, semaphore)))
+
+        def on_source_event(event: Event) -> None:
+            nonlocal streaming_response
+            if event.author != source.name:
+                return
+            if event.partial:
+                streaming_response = True
+                for chunk in buffer.feed(event_text(event)):
+                    translate(chunk)
+                return
+            if event.is_final_response():
+                if not streaming_response:
+                    buffer.feed(event_text(event))
+                for chunk in buffer.flush():
+                    translate(chunk)
+            elif event.get_function_calls():
+                buffer.discard()
+            streaming_response = False
+
+        source_ctx = ctx.model_copy(update={"run_config": streaming_run_config(ctx.run_config)})
+        tasks.append(asyncio.create_task(produce(source, source_ctx, on_source_event)))
+        finished, source_finished = 0, False
+        try:
+            while finished < len(tasks):
+                item = await queue.get()
+                if isinstance(item, _Done):
+                    finished += 1
+                    source_finished = source_finished or item.agent is source
+                else:
+                    event, on_event, resume = item
+                    on_event(event)
+                    if not event.partial or caller_streams:
+                        yield event
+                    resume.set()
+                if not source_finished:
+                    continue
+                # A language is published as soon as all of its chunks are translated.
+                for template in templates:
+                    parts = translations[template.name]
+                    if template.name in published or not parts or any(part is None for part in parts):
+                        continue
+                    published.add(template.name)
+                    text = "\n\n".join(parts)
+                    yield Event(
+                        author=template.name,
+                        invocation_id=ctx.invocation_id,
+                        branch=ctx.branch,
+                        content=types.Content(role="model", parts=[types.Part(text=text)]),
+                        actions=EventActions(state_delta={template.output_key: text} if template.output_key else {}),
+                    )
+            for task in tasks:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+        logger.info(f"Translated the summary in {len(chunks)} chunks into {len(templates)} languages")
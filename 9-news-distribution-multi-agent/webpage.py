@@ -0,0 +1,198 @@
+"""Streams the news webpage from a local HTML template as the translations complete.
+
+The page used to be written by an LLM agent after every translator had
+finished, repeating all summaries and translations token by token.
+`StreamingWebpageAgent` assembles it locally instead:
+
+1. as soon as it starts it writes the page head, and the original summary if it
+   is already in state,
+2. it runs its sub-agents (the translators, and the summarizer too when it is
+   streamed into the translations) and writes each section the moment the
+   `output_key` it shows arrives,
+3. it closes the page and stores the full HTML under `webpage_content`; its
+   final message only says how large the page is and where it was written.
+
+Sections are written in completion order; a CSS `order` on each keeps the
+displayed order fixed. Every chunk is appended and flushed to the output file
+(NEWS_WEBPAGE_DIR, one `<session id>.html` per session) and, when the caller
+streams, yielded as a partial event, so a streaming client receives the page
+section by section.
+"""
+import html
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class PageSection(BaseModel):
+    """A block of the page filled from one state key."""
+    key: str
+    title: str
+    lang: str = "en"
+    order: int = 0
+
+
+_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, sans-serif; max-width: 56rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.5; }}
+main {{ display: flex; flex-direction: column; gap: 1.5rem; }}
+section {{ border-top: 1px solid #ddd; padding-top: 1rem; }}
+h1 {{ margin-bottom: 0.25rem; }}
+.generated {{ color: #666; font-size: 0.9rem; }}
+</style>
+</head>
+<body>
+<header><h1>{title}</h1><p class="generated">Generated {generated}</p></header>
+<main>
+"""
+_PAGE_TAIL = "</main>\n</body>\n</html>\n"
+
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_HEADING = re.compile(r"^\s*(#{1,6})\s+(.*)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def _inline(text: str) -> str:
+    return _BOLD.sub(r"<strong>\1</strong>", html.escape(text.strip()))
+
+
+def text_to_html(text: str) -> str:
+    """Renders the light Markdown the agents write (headings, bullets, bold) as HTML."""
+    blocks, items = [], []
+
+    def close_list() -> None:
+        if items:
+            blocks.append("<ul>" + "".join(f"<li>{item}</li>" for item in items) + "</ul>")
+            items.clear()
+
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        for line in paragraph.splitlines():
+            if not line.strip():
+                continue
+            heading = _HEADING.match(line)
+            if heading:
+                close_list()
+                level = min(6, len(heading.group(1)) + 2)
+                blocks.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+            elif _BULLET.match(line):
+                items.append(_inline(_BULLET.sub("", line, count=1)))
+            else:
+                close_list()
+                blocks.append(f"<p>{_inline(line)}</p>")
+        close_list()
+    return "\n".join(blocks)
+
+
+def render_section(section: PageSection, text: str) -> str:
+    return (
+        f'<section id="{html.escape(section.key)}" lang="{html.escape(section.lang)}" style="order: {section.order}">\n'
+        f"<h2>{html.escape(section.title)}</h2>\n{text_to_html(text)}\n</section>\n"
+    )
+
+
+def _writes_key(agent: BaseAgent, key: str) -> bool:
+    if getattr(agent, "output_key", None) == key:
+        return True
+    return any(_writes_key(sub_agent, key) for sub_agent in agent.sub_agents)
+
+
+class StreamingWebpageAgent(BaseAgent):
+    """Writes the page head and summary, then one section per translation as each finishes.
+
+    Attributes:
+        title: Page title.
+        summary_section: Section for the news summary, written first if the
+            summary is already in state.
+        sections: Sections filled from the sub-agents' output keys.
+        output_key: State key receiving the complete HTML.
+        output_dir: Directory for `<session id>.html`; no file is written if unset.
+    """
+
+    title: str = "News digest"
+    summary_section: PageSection
+    sections: list[PageSection]
+    output_key: str = "webpage_content"
+    output_dir: Optional[str] = None
+
+    def _chunk_event(self, ctx: InvocationContext, chunk: str) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            partial=True,
+            content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        path = os.path.join(self.output_dir, f"{ctx.session.id}.html") if self.output_dir else None
+        out = None
+        if path:
+            os.makedirs(self.output_dir, exist_ok=True)
+            out = open(path, "w", encoding="utf-8")
+        chunks: list[str] = []
+        caller_streams = ctx.run_config is not None and ctx.run_config.streaming_mode == StreamingMode.SSE
+
+        def emit(chunk: str) -> list[Event]:
+            chunks.append(chunk)
+            if out is not None:
+                out.write(chunk)
+                out.flush()
+            return [self._chunk_event(ctx, chunk)] if caller_streams else []
+
+        try:
+            generated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+            head = _PAGE_HEAD.format(title=html.escape(self.title), generated=generated)
+            pending = {section.key: section for section in self.sections}
+            # A summary written by a sub-agent is shown once this run has produced it.
+            summary = None
+            if not any(_writes_key(agent, self.summary_section.key) for agent in self.sub_agents):
+                summary = ctx.session.state.get(self.summary_section.key)
+            if summary:
+                head += render_section(self.summary_section, str(summary))
+            else:
+                pending[self.summary_section.key] = self.summary_section
+            for chunk_event in emit(head):
+                yield chunk_event
+
+            for sub_agent in self.sub_agents:
+                async for event in sub_agent.run_async(ctx):
+                    yield event
+                    delta = event.actions.state_delta if event.actions else None
+                    for key in [key for key in pending if delta and delta.get(key)]:
+                        for chunk_event in emit(render_section(pending.pop(key), str(delta[key]))):
+                            yield chunk_event
+            if pending:
+                logger.warning(f"Webpage published without sections {sorted(pending)}")
+            for chunk_event in emit(_PAGE_TAIL):
+                yield chunk_event
+        finally:
+            if out is not None:
+                out.close()
+
+        page = "".join(chunks)
+        # The page itself is only in state; the message does not repeat it.
+        published = f"Published the news page ({len(page)} bytes)" + (f" to {path}" if path else "")
+        logger.info(published)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=published)]),
+            actions=EventActions(state_delta={self.output_key: page}),
+        )
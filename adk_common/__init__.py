@@ -0,0 +1,5 @@
+"""Shared building blocks used by the agent projects in this repository.
+
+The agent folders are loaded by the `adk` CLI from the repository root, which
+puts the root on `sys.path`, so every project can import `adk_common` directly.
+"""
@@ -0,0 +1,244 @@
+"""Small in-process cache primitives shared by the agent projects."""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache has been used."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    Args:
+        max_entries: Least recently used entries are evicted beyond this size.
+        ttl_seconds: Default lifetime of an entry; None means entries never expire.
+        clock: Time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the live value for `key`, or `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.stats.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Stores `value`, using `ttl_seconds` instead of the default lifetime if given."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def items(self) -> list[tuple[Hashable, Any]]:
+        """Returns a snapshot of live (key, value) pairs without touching stats or LRU order."""
+        now = self._clock()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, expires_at) in self._entries.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SingleFlight:
+    """Coalesces concurrent async calls that share a key into a single call.
+
+    The first caller for a key starts `fn()`; callers arriving while it is in
+    flight await the same result (or exception). The shared call is shielded, so
+    a cancelled waiter does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Returns the in-flight task for `key`, starting `fn()` if there is none."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        return await asyncio.shield(self.start(key, fn))
+
+
+class DiskCache:
+    """SQLite-backed string cache with per-entry expiry, shared across processes.
+
+    The file (and its directory) is created on first use, not when the cache
+    is constructed, so building one at import time touches no disk.
+
+    Args:
+        path: Database file; its directory is created if needed.
+        max_entries: Least recently used entries are pruned beyond this size.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._created = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # Called with the lock held.
+        if not self._created:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with sqlite3.connect(self.path, timeout=10) as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, used_at REAL NOT NULL)"
+                )
+            self._created = True
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key: str) -> Optional[tuple[str, Optional[float]]]:
+        """Returns (value, seconds left or None for no expiry), or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+            return value, None if expires_at is None else expires_at - now
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            db.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def pop(self, key: str) -> None:
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM cache")
+
+
+class TieredCache:
+    """An in-memory `TTLCache` in front of a `DiskCache`.
+
+    Reads check memory first and promote disk hits (with their remaining
+    lifetime) into memory; writes go to both tiers. Values are strings, so
+    callers serialize richer objects themselves.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[DiskCache] = None):
+        self.memory = memory
+        self.disk = disk
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        found = self.disk.get(key)
+        if found is None:
+            return None
+        value, ttl_left = found
+        self.disk_hits += 1
+        self.memory.set(key, value, ttl_seconds=ttl_left)
+        return value
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None) -> None:
+        self.memory.set(key, value, ttl_seconds=ttl_seconds)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl_seconds=ttl_seconds)
+
+    def pop(self, key: str) -> None:
+        self.memory.pop(key)
+        if self.disk is not None:
+            self.disk.pop(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
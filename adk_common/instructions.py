@@ -0,0 +1,274 @@
+"""Instruction management with provider-side context caching.
+
+Several agents send a large instruction that never changes between turns.
+`StaticPrefixInstruction` keeps that static prefix separate from the small
+dynamic part of the instruction (for example values read from session state):
+
+    managed = StaticPrefixInstruction(BIG_STATIC_TEXT, dynamic=current_fields)
+    root_agent = Agent(
+        ...,
+        instruction=managed.instruction,
+        before_model_callback=managed.before_model_callback,
+    )
+
+The static prefix always comes first in the system instruction, which keeps it
+eligible for the model's implicit prefix caching. When the prefix and the tool
+declarations together reach the provider's minimum cache size, the callback
+also registers them as an explicit context cache and sends only the cache
+handle plus the dynamic remainder on each turn; smaller prefixes are sent
+inline, so use it only for agents whose prefix is that large. Cache handles
+are kept in a process-wide registry and reused by every session until shortly
+before they expire. A failed creation is retried after
+`FAILURE_RETRY_SECONDS`.
+
+The backend is chosen with the INSTRUCTION_CACHE environment variable:
+"gemini" (default) uses the Gemini context cache API, "local" uses an in-memory
+stand-in for tests and fake models, and "off" disables explicit caching.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional, Union
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.models import LlmRequest
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used to skip prefixes that are too small for
+# the context cache API (which rejects caches under a model-specific minimum).
+CHARS_PER_TOKEN = 4
+DEFAULT_MIN_CACHE_TOKENS = 1024
+DEFAULT_CACHE_TTL_SECONDS = 3600
+# Handles are refreshed this many seconds before the provider expires them.
+EXPIRY_MARGIN_SECONDS = 60
+# A failed creation sends the instruction inline for this long, then is retried.
+FAILURE_RETRY_SECONDS = 60
+
+
+class ContextCacheBackend(ABC):
+    """Creates provider-side caches for a static instruction prefix."""
+
+    @abstractmethod
+    async def create(
+        self,
+        model: str,
+        system_instruction: str,
+        tools: Optional[list[types.Tool]],
+        tool_config: Optional[types.ToolConfig],
+        ttl_seconds: int,
+    ) -> str:
+        """Creates a cache and returns its handle (the cached content name)."""
+
+
+class GeminiContextCache(ContextCacheBackend):
+    """Context cache backed by the Gemini / Vertex AI cached content API."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    async def create(self, model, system_instruction, tools, tool_config, ttl_seconds) -> str:
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        cached = await self._client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                tools=tools,
+                tool_config=tool_config,
+                ttl=f"{ttl_seconds}s",
+                display_name="adk-static-instruction",
+            ),
+        )
+        return cached.name
+
+
+class LocalContextCache(ContextCacheBackend):
+    """In-memory stand-in for the provider cache, for tests and fake models."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.entries: dict[str, dict] = {}
+
+    async def create(self, model, system_instruction, tools, tool_config, ttl_seconds) -> str:
+        handle = f"cachedContents/local-{next(self._ids)}"
+        self.entries[handle] = {
+            "model": model,
+            "system_instruction": system_instruction,
+            "tools": tools,
+            "tool_config": tool_config,
+        }
+        return handle
+
+
+def default_cache_backend() -> Optional[ContextCacheBackend]:
+    """Returns the backend selected by the INSTRUCTION_CACHE environment variable."""
+    mode = os.environ.get("INSTRUCTION_CACHE", "gemini").lower()
+    if mode == "off":
+        return None
+    if mode == "local":
+        return LocalContextCache()
+    return GeminiContextCache()
+
+
+class _CacheRegistry:
+    """Process-wide map of cache key -> (handle, expiry) shared by all sessions."""
+
+    def __init__(self):
+        self._handles: dict[str, tuple[Optional[str], float]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> tuple[bool, Optional[str]]:
+        """Returns (found, handle). A found entry with no handle is a remembered failure."""
+        entry = self._handles.get(key)
+        if entry is None or entry[1] <= time.time():
+            return False, None
+        return True, entry[0]
+
+    async def get_or_create(self, key: str, create: Callable, ttl_seconds: int) -> Optional[str]:
+        found, handle = self.lookup(key)
+        if found:
+            self.hits += 1
+            return handle
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            found, handle = self.lookup(key)
+            if found:
+                self.hits += 1
+                return handle
+            self.misses += 1
+            try:
+                handle = await create()
+            except Exception as e:
+                # Remember the failure briefly so every turn does not retry the API call.
+                logger.warning(f"Context cache creation failed, sending instruction inline: {e}")
+                self._handles[key] = (None, time.time() + min(ttl_seconds, FAILURE_RETRY_SECONDS))
+                return None
+            self._handles[key] = (handle, time.time() + ttl_seconds - EXPIRY_MARGIN_SECONDS)
+            return handle
+
+
+_registry = _CacheRegistry()
+
+
+class StaticPrefixInstruction:
+    """An agent instruction split into a cacheable static prefix and a dynamic part."""
+
+    def __init__(
+        self,
+        static_prefix: str,
+        dynamic: Union[str, Callable[[ReadonlyContext], str]] = "",
+        *,
+        cache: Optional[ContextCacheBackend] = None,
+        ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+        min_cache_tokens: int = DEFAULT_MIN_CACHE_TOKENS,
+    ):
+        """
+        Args:
+            static_prefix: Instruction text that is identical on every turn.
+            dynamic: Text, or a function of the readonly context returning text,
+                that is appended after the static prefix.
+            cache: Backend used to register the static prefix. Defaults to the
+                backend selected by INSTRUCTION_CACHE.
+            ttl_seconds: Lifetime requested for each provider cache.
+            min_cache_tokens: Estimated size of the prefix and tool declarations
+                below which explicit caching is skipped.
+        """
+        self.static_prefix = static_prefix.strip()
+        self._dynamic = dynamic
+        self._cache = cache if cache is not None else default_cache_backend()
+        self._ttl_seconds = ttl_seconds
+        self._min_cache_tokens = min_cache_tokens
+
+    def dynamic_text(self, context: ReadonlyContext) -> str:
+        """Returns the dynamic part of the instruction for the current turn."""
+        if callable(self._dynamic):
+            return (self._dynamic(context) or "").strip()
+        return self._dynamic.strip()
+
+    def instruction(self, context: ReadonlyContext) -> str:
+        """Instruction provider for `LlmAgent.instruction`: static prefix first, then dynamic text."""
+        dynamic = self.dynamic_text(context)
+        return f"{self.static_prefix}\n\n{dynamic}" if dynamic else self.static_prefix
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> None:
+        """Swaps the static part of the request for a context cache handle."""
+        if self._cache is None:
+            return None
+        config = llm_request.config
+        system_instruction = config.system_instruction if config else None
+        if not isinstance(system_instruction, str) or config.cached_content:
+            return None
+        split_at = system_instruction.find(self.static_prefix)
+        if split_at < 0:
+            return None
+
+        # Everything up to the end of the static prefix (the agent identity
+        # preamble included) is the same on every turn and goes in the cache.
+        cached_text = system_instruction[: split_at + len(self.static_prefix)]
+        remainder = system_instruction[split_at + len(self.static_prefix):].strip()
+        model = llm_request.model
+        tools = config.tools
+        tool_config = config.tool_config
+        if _estimate_tokens(cached_text, tools, tool_config) < self._min_cache_tokens:
+            return None
+        key = _cache_key(model, cached_text, tools, tool_config)
+        handle = await _registry.get_or_create(
+            key,
+            lambda: self._cache.create(model, cached_text, tools, tool_config, self._ttl_seconds),
+            self._ttl_seconds,
+        )
+        if not handle:
+            return None
+
+        # The cached content API does not accept system_instruction, tools or
+        # tool_config next to a cache handle, so they are sent only via the cache.
+        config.cached_content = handle
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        if remainder:
+            llm_request.contents.insert(
+                0, types.Content(role="user", parts=[types.Part(text=remainder)])
+            )
+        return None
+
+
+def _estimate_tokens(system_instruction, tools, tool_config) -> int:
+    """Rough token count of what goes into a context cache."""
+    chars = len(system_instruction)
+    chars += sum(len(json.dumps(t.model_dump(mode="json", exclude_none=True))) for t in tools or [])
+    if tool_config:
+        chars += len(json.dumps(tool_config.model_dump(mode="json", exclude_none=True)))
+    return chars // CHARS_PER_TOKEN
+
+
+def _cache_key(model, system_instruction, tools, tool_config) -> str:
+    """Stable hash of everything that goes into a context cache."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "system_instruction": system_instruction,
+            "tools": [t.model_dump(mode="json", exclude_none=True) for t in tools or []],
+            "tool_config": tool_config.model_dump(mode="json", exclude_none=True) if tool_config else None,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_stats() -> dict:
+    """Returns hit/miss counts of the process-wide cache handle registry."""
+    return {"hits": _registry.hits, "misses": _registry.misses}
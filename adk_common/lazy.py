@@ -0,0 +1,97 @@
+"""Deferred construction of clients and tools, to keep agent imports cheap.
+
+On serverless deployments every cold start pays for whatever an agent module
+does at import time. Heavy SDKs (Cloud Storage, Vertex AI, reportlab, Google
+API discovery) are therefore imported inside the functions that use them, and
+clients and tools are built on first use:
+
+- `once(factory)` turns a zero-argument factory into a thread-safe accessor
+  that builds its value on the first call and returns the same value afterwards.
+- `LazyToolset(factory)` exposes tools that are only built when the agent first
+  asks for its tools (the first model turn), not when the module is imported.
+
+`python -m benchmarks.import_profile` reports per-module import times to catch
+regressions.
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+from typing import Callable, Optional, TypeVar, Union
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def once(factory: Callable[[], T]) -> Callable[[], T]:
+    """Returns an accessor that calls `factory` on first use and caches its result.
+
+    A failed construction is not cached, so the next call tries again.
+    """
+    lock = threading.Lock()
+    built: list = []
+
+    @functools.wraps(factory)
+    def get() -> T:
+        if not built:
+            with lock:
+                if not built:
+                    built.append(factory())
+        return built[0]
+
+    return get
+
+
+def required_env(name: str) -> str:
+    """Reads a required environment variable when it is needed, not at import time."""
+    value = os.environ.get(name)
+    if not value:
+        raise RuntimeError(f"Environment variable {name} is not set.")
+    return value
+
+
+@once
+def storage_client():
+    """The process-wide Cloud Storage client, created on first use."""
+    from google.cloud import storage
+
+    return storage.Client()
+
+
+class LazyToolset(BaseToolset):
+    """Toolset whose tools are built by `factory` on the first `get_tools` call.
+
+    The factory runs in a worker thread, so slow imports and client setup do not
+    block the event loop, and it runs once even if several sessions start at the
+    same time.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Union[BaseTool, list[BaseTool]]],
+        tool_filter: Optional[list[str]] = None,
+    ):
+        super().__init__(tool_filter=tool_filter)
+        self._factory = factory
+        self._tools: Optional[list[BaseTool]] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[BaseTool]:
+        if self._tools is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._tools is None:
+                    built = await asyncio.to_thread(self._factory)
+                    self._tools = built if isinstance(built, list) else [built]
+                    logger.info(f"Built tools {[tool.name for tool in self._tools]} on first use")
+        return [tool for tool in self._tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,195 @@
+"""Memoization of LLM agent responses.
+
+Translators and page generators are often asked the same thing again: the same
+summary into the same language, the same page from the same sections. A
+memoized agent looks up each model call before it is made and, on a hit,
+answers with the stored text without calling the model. The answer goes
+through the normal response path, so the agent's `output_key` is written to
+state and callers see the usual final event.
+
+Keys hash the model, the resolved system instruction (state placeholders are
+already filled in), the generation config and the agent's input:
+
+- by default the request contents, i.e. the conversation the model is sent,
+- with `inputs=[...]`, the values of those state keys instead, for agents whose
+  answer depends only on the instruction and those keys (a translator of
+  `{news_summary}` should not miss because the user phrased the request
+  differently). An empty list means the instruction alone is the input.
+
+Only complete text answers are stored; tool calls, partial chunks and errors
+never are. Entries live in a pluggable store with `get(key)` and
+`set(key, value, ttl_seconds)`, by default an in-memory LRU (`TTLCache`),
+optionally backed by SQLite (`TieredCache`).
+
+Environment: AGENT_MEMO=off disables it, AGENT_MEMO_MAX_ENTRIES (default 512),
+AGENT_MEMO_TTL_SECONDS (default one day), AGENT_MEMO_DIR (adds a disk tier in
+this directory, shared between processes).
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Callable, Optional, Sequence
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .caching import DiskCache, TieredCache, TTLCache
+from .tool_metrics import add_callback
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+# Request config fields that do not change the answer.
+_CONFIG_EXCLUDE = {"system_instruction", "labels", "http_options", "cached_content"}
+
+
+def _part_key(part: types.Part) -> Any:
+    if part.text is not None:
+        return ["thought" if part.thought else "text", part.text]
+    if part.function_call is not None:
+        # Call ids differ between runs; the name and arguments are what matters.
+        return ["call", part.function_call.name, part.function_call.args]
+    if part.function_response is not None:
+        return ["response", part.function_response.name, part.function_response.response]
+    if part.inline_data is not None:
+        return ["data", part.inline_data.mime_type, hashlib.sha256(part.inline_data.data or b"").hexdigest()]
+    if part.file_data is not None:
+        return ["file", part.file_data.mime_type, part.file_data.file_uri]
+    return None
+
+
+def _contents_key(contents: list[types.Content]) -> list:
+    return [[content.role, [_part_key(part) for part in content.parts or []]] for content in contents]
+
+
+def _config_key(config: Optional[types.GenerateContentConfig]) -> Any:
+    if config is None:
+        return None
+    return config.model_dump(mode="json", exclude_none=True, exclude=_CONFIG_EXCLUDE)
+
+
+def request_key(llm_request: LlmRequest, inputs: Optional[dict] = None) -> str:
+    """Hash of everything the answer to `llm_request` depends on.
+
+    `inputs` (state values by key) replaces the request contents in the key.
+    """
+    config = llm_request.config
+    instruction = config.system_instruction if config is not None else None
+    if isinstance(instruction, types.Content):
+        instruction = _contents_key([instruction])
+    payload = {
+        "model": llm_request.model,
+        "instruction": instruction,
+        "config": _config_key(config),
+        "input": inputs if inputs is not None else _contents_key(llm_request.contents or []),
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _answer_text(llm_response: LlmResponse) -> Optional[str]:
+    """The text of a complete answer worth storing, or None."""
+    if llm_response.partial or llm_response.error_code or not llm_response.content:
+        return None
+    parts = llm_response.content.parts or []
+    if any(part.function_call for part in parts):
+        return None
+    text = "".join(part.text for part in parts if part.text and not part.thought)
+    return text or None
+
+
+class AgentMemo:
+    """Model callbacks that answer repeated requests from a store.
+
+    Args:
+        store: Object with `get(key)` and `set(key, value, ttl_seconds)` holding
+            answer texts; an in-memory LRU of 512 entries by default.
+        ttl_seconds: Lifetime of a stored answer.
+    """
+
+    def __init__(self, store: Any = None, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        self.store = store if store is not None else TTLCache(max_entries=512)
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._pending: dict[tuple[str, str], str] = {}
+
+    def callbacks(self, agent_name: str, inputs: Optional[Sequence[str]] = None) -> tuple[Callable, Callable]:
+        """Before- and after-model callbacks memoizing the agent named `agent_name`."""
+
+        def before_model(callback_context, llm_request: LlmRequest) -> Optional[LlmResponse]:
+            # Copies of the agent (see paragraphs.py) share its callbacks but are sent
+            # other contents, so only the agent itself is keyed on its state inputs.
+            if inputs is not None and callback_context.agent_name == agent_name:
+                key = request_key(llm_request, {name: callback_context.state.get(name) for name in inputs})
+            else:
+                key = request_key(llm_request)
+            text = self.store.get(key)
+            if text is not None:
+                self.hits += 1
+                logger.info(f"Memoized answer for {callback_context.agent_name} ({key[:12]})")
+                return LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=text)]),
+                    custom_metadata={"agent_memo": "hit"},
+                )
+            self.misses += 1
+            self._pending[(callback_context.invocation_id, callback_context.agent_name)] = key
+            return None
+
+        def after_model(callback_context, llm_response: LlmResponse) -> None:
+            if llm_response.partial:
+                return None
+            key = self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+            text = _answer_text(llm_response)
+            if key is not None and text is not None:
+                self.store.set(key, text, ttl_seconds=self.ttl_seconds)
+            return None
+
+        return before_model, after_model
+
+    def on_model_error(self, callback_context, llm_request, error: Exception) -> None:
+        self._pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+        return None
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": getattr(self.store, "disk_hits", 0),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def default_memo() -> AgentMemo:
+    """An `AgentMemo` configured from the environment."""
+    memory = TTLCache(max_entries=int(os.environ.get("AGENT_MEMO_MAX_ENTRIES", "512")))
+    memo_dir = os.environ.get("AGENT_MEMO_DIR")
+    store = TieredCache(memory, DiskCache(os.path.join(memo_dir, "answers.sqlite3"))) if memo_dir else memory
+    return AgentMemo(store, ttl_seconds=float(os.environ.get("AGENT_MEMO_TTL_SECONDS", str(DEFAULT_TTL_SECONDS))))
+
+
+agent_memo = default_memo()
+
+
+def memoize_agent(agent, inputs: Optional[Sequence[str]] = None, memo: Optional[AgentMemo] = None):
+    """Memoizes every LLM agent in the tree; returns the agent.
+
+    Call it before callbacks that measure model calls are added (such as
+    `account_model_calls`), so answers served from the store are not counted
+    as calls. `inputs` applies to every LLM agent in the tree.
+    """
+    if os.environ.get("AGENT_MEMO", "on").lower() == "off":
+        return agent
+    memo = memo or agent_memo
+    if hasattr(agent, "before_model_callback"):
+        before_model, after_model = memo.callbacks(agent.name, inputs)
+        add_callback(agent, "before_model_callback", before_model)
+        add_callback(agent, "after_model_callback", after_model)
+        add_callback(agent, "on_model_error_callback", memo.on_model_error)
+    for sub_agent in agent.sub_agents:
+        memoize_agent(sub_agent, inputs, memo)
+    return agent
@@ -0,0 +1,241 @@
+"""Rendered PDF artifacts kept for follow-up turns.
+
+Tools that render a PDF register the bytes and a per-page text preview here.
+The PDF is saved through the ADK artifact service of the running session (when
+one is configured) and also kept in a process-local LRU capped by entry count
+and total bytes. The tool returns a short artifact handle to the model, and the
+`get_pdf_artifact` / `read_pdf_page` tools serve "send me that again" or "what
+did page 3 say" from memory instead of regenerating the document.
+
+Cache limits can be tuned with PDF_ARTIFACT_CACHE_ENTRIES and
+PDF_ARTIFACT_CACHE_BYTES.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+PREVIEW_MIME_TYPE = "text/plain"
+# Separates pages in the text preview artifact.
+PAGE_SEPARATOR = "\f"
+
+
+@dataclass
+class PdfArtifact:
+    """A rendered PDF plus the text that was drawn on each page."""
+    handle: str
+    filename: str
+    pdf_bytes: bytes
+    pages: list[str]
+    version: Optional[int] = None
+    gcs_uri: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.pdf_bytes) + sum(len(p.encode("utf-8")) for p in self.pages)
+
+
+class PdfArtifactCache:
+    """Thread-safe LRU of rendered PDFs bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int = 64, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, str], PdfArtifact] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, scope: str, artifact: PdfArtifact) -> None:
+        """Stores an artifact under (scope, handle), evicting least recently used entries."""
+        if artifact.size_bytes > self.max_bytes:
+            logger.info(f"PDF artifact {artifact.handle} ({artifact.size_bytes} bytes) exceeds the cache cap; not cached.")
+            return
+        key = (scope, artifact.handle)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.size_bytes
+            self._entries[key] = artifact
+            self._total_bytes += artifact.size_bytes
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.size_bytes
+
+    def get(self, scope: str, handle: str) -> Optional[PdfArtifact]:
+        """Returns the cached artifact and marks it as recently used, or None."""
+        key = (scope, handle)
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+            return artifact
+
+
+artifact_cache = PdfArtifactCache(
+    max_entries=int(os.environ.get("PDF_ARTIFACT_CACHE_ENTRIES", "64")),
+    max_bytes=int(os.environ.get("PDF_ARTIFACT_CACHE_BYTES", str(64 * 1024 * 1024))),
+)
+
+
+def paginate_lines(lines: list[str], lines_per_page: int) -> list[list[str]]:
+    """Splits already wrapped lines into pages of at most `lines_per_page` lines."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    return pages or [[]]
+
+
+def _session_scope(tool_context: ToolContext) -> str:
+    """Artifacts are only visible to the session that rendered them."""
+    session = tool_context.session
+    return f"{session.app_name}/{tool_context.user_id}/{session.id}"
+
+
+def _make_handle(filename: str, version: Optional[int]) -> str:
+    return f"{filename}#v{version}" if version is not None else f"{filename}#local-{int(time.time() * 1000)}"
+
+
+def _parse_handle(handle: str) -> tuple[str, Optional[int]]:
+    filename, _, suffix = handle.partition("#")
+    if suffix.startswith("v") and suffix[1:].isdigit():
+        return filename, int(suffix[1:])
+    return filename, None
+
+
+async def save_pdf_artifact(
+    tool_context: ToolContext,
+    filename: str,
+    pdf_bytes: bytes,
+    pages: list[str],
+    gcs_uri: Optional[str] = None,
+) -> PdfArtifact:
+    """Saves a rendered PDF as a session artifact and caches it locally.
+
+    Args:
+        tool_context: Context of the tool that rendered the PDF.
+        filename: Artifact file name, e.g. the GCS object name.
+        pdf_bytes: The rendered PDF.
+        pages: The text drawn on each page, used for previews.
+        gcs_uri: Where the PDF was uploaded, if it was.
+
+    Returns:
+        The cached `PdfArtifact`; its `handle` is what the tool should return.
+    """
+    version = None
+    try:
+        version = await tool_context.save_artifact(
+            filename, types.Part.from_bytes(data=pdf_bytes, mime_type=PDF_MIME_TYPE)
+        )
+        await tool_context.save_artifact(
+            f"{filename}.preview.txt",
+            types.Part.from_bytes(data=PAGE_SEPARATOR.join(pages).encode("utf-8"), mime_type=PREVIEW_MIME_TYPE),
+        )
+    except ValueError as e:
+        # No artifact service configured for this runner; keep the local copy only.
+        logger.info(f"Artifact service unavailable, caching {filename} locally only: {e}")
+
+    artifact = PdfArtifact(
+        handle=_make_handle(filename, version),
+        filename=filename,
+        pdf_bytes=pdf_bytes,
+        pages=pages,
+        version=version,
+        gcs_uri=gcs_uri,
+    )
+    artifact_cache.put(_session_scope(tool_context), artifact)
+    return artifact
+
+
+async def load_pdf_artifact(tool_context: ToolContext, handle: str) -> Optional[PdfArtifact]:
+    """Returns a PDF artifact from the local cache, falling back to the artifact service."""
+    scope = _session_scope(tool_context)
+    artifact = artifact_cache.get(scope, handle)
+    if artifact is not None:
+        return artifact
+
+    filename, version = _parse_handle(handle)
+    if version is None:
+        return None
+    try:
+        pdf_part = await tool_context.load_artifact(filename, version=version)
+        # The preview is saved right after its PDF, so they share a version number.
+        preview_part = await tool_context.load_artifact(f"{filename}.preview.txt", version=version)
+    except ValueError:
+        return None
+    if pdf_part is None or pdf_part.inline_data is None:
+        return None
+    pages = []
+    if preview_part is not None and preview_part.inline_data is not None:
+        pages = preview_part.inline_data.data.decode("utf-8").split(PAGE_SEPARATOR)
+    artifact = PdfArtifact(
+        handle=handle,
+        filename=filename,
+        pdf_bytes=pdf_part.inline_data.data,
+        pages=pages,
+        version=version,
+    )
+    artifact_cache.put(scope, artifact)
+    return artifact
+
+
+async def get_pdf_artifact(handle: str, tool_context: ToolContext) -> dict:
+    """Re-sends a previously generated PDF document to the user without regenerating it.
+
+    Args:
+        handle: The artifact handle returned when the PDF was created.
+
+    Returns:
+        A dictionary describing the PDF artifact, or an error status.
+    """
+    artifact = await load_pdf_artifact(tool_context, handle)
+    if artifact is None:
+        return {"status": "error", "message": f"No PDF artifact found for handle '{handle}'."}
+    if artifact.version is not None:
+        # Re-announce the artifact so the client shows it again.
+        tool_context.actions.artifact_delta[artifact.filename] = artifact.version
+    return {
+        "status": "success",
+        "artifact": artifact.handle,
+        "filename": artifact.filename,
+        "gcs_uri": artifact.gcs_uri,
+        "page_count": len(artifact.pages),
+        "size_bytes": len(artifact.pdf_bytes),
+    }
+
+
+async def read_pdf_page(handle: str, page: int, tool_context: ToolContext) -> dict:
+    """Returns the text of one page of a previously generated PDF document.
+
+    Args:
+        handle: The artifact handle returned when the PDF was created.
+        page: The 1-based page number to read.
+
+    Returns:
+        A dictionary with the page text, or an error status.
+    """
+    artifact = await load_pdf_artifact(tool_context, handle)
+    if artifact is None:
+        return {"status": "error", "message": f"No PDF artifact found for handle '{handle}'."}
+    if not 1 <= page <= len(artifact.pages):
+        return {"status": "error", "message": f"Page {page} is out of range (1-{len(artifact.pages)})."}
+    return {
+        "status": "success",
+        "page": page,
+        "page_count": len(artifact.pages),
+        "text": artifact.pages[page - 1],
+    }
@@ -0,0 +1,288 @@
+"""Serving agents to many users from one process.
+
+Building a `Runner` and a session for every query (as a simple CLI does) makes
+each query pay for setup and forget the conversation, and running queries
+one after another leaves the process idle while it waits on models and tools.
+`RunnerPool` serves one agent instead:
+
+- a fixed set of runners is built up front, with the agents' models resolved,
+  and each serves one run at a time, which caps the runs in flight,
+- requests wait in a bounded queue; when it is full, or a user already has
+  `max_user_requests` requests waiting or running, `ServerBusy` is raised at
+  once, so callers can shed load (an HTTP server answers 429) instead of piling
+  up work,
+- every user keeps a session per pool, reused across requests, and the turns of
+  one session run one at a time. Sessions are remembered for
+  `session_ttl_seconds` after their last use, and a session the session
+  service has expired is replaced by a new one. A run loads only the last
+  `max_history_events` events of its session, so a long-lived session does not
+  make every turn slower (building the model request is linear in the history),
+- the caller drives its run directly on the runner it was given, so events
+  reach it as they are produced, a slow reader slows only its own run, and a
+  caller that stops reading ends its run and returns the runner.
+
+Per-user data must live in session state (or tool context), not in module
+globals of the agent, since all users share the agent objects. `AgentServer`
+holds one pool per agent over a shared session service.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from typing import Any, AsyncGenerator, Optional, Union
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from .caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_TTL_SECONDS = 3600
+
+
+class ServerBusy(RuntimeError):
+    """The request was rejected because the pool or the user is at capacity."""
+
+
+def _llm_agents(agent) -> list[LlmAgent]:
+    found = [agent] if isinstance(agent, LlmAgent) else []
+    for sub_agent in agent.sub_agents:
+        found.extend(_llm_agents(sub_agent))
+    return found
+
+
+class RunnerPool:
+    """Serves one agent to many users with pre-warmed runners and per-user sessions.
+
+    Args:
+        agent: The root agent served.
+        app_name: App name of the runners and sessions.
+        runners: Runners built up front; at most this many runs are in flight.
+        max_queue: Requests allowed to wait for a runner before `ServerBusy`.
+        max_user_requests: Requests one user may have waiting or running.
+        session_service: Shared by all runners; in-memory by default.
+        session_ttl_seconds: How long a user's session is reused after its last request.
+        max_sessions: Users whose session is remembered (least recently used are forgotten).
+        max_history_events: Events of the session a run loads (None loads all),
+            unless the run config sets `get_session_config`.
+        run_config: Default run config of the requests.
+    """
+
+    def __init__(
+        self,
+        agent,
+        app_name: str,
+        runners: int = 4,
+        max_queue: int = 64,
+        max_user_requests: int = 2,
+        session_service: Optional[BaseSessionService] = None,
+        artifact_service: Any = None,
+        session_ttl_seconds: float = DEFAULT_SESSION_TTL_SECONDS,
+        max_sessions: int = 10000,
+        max_history_events: Optional[int] = 100,
+        run_config: Optional[RunConfig] = None,
+    ):
+        self.agent = agent
+        self.app_name = app_name
+        self.size = runners
+        self.max_queue = max_queue
+        self.max_user_requests = max_user_requests
+        self.session_service = session_service or InMemorySessionService()
+        self.artifact_service = artifact_service or InMemoryArtifactService()
+        self.max_history_events = max_history_events
+        self.run_config = run_config
+        self.served = 0
+        self.rejected = 0
+        self.failed = 0
+        self.queue_wait_ms = 0.0
+        self._sessions = TTLCache(max_entries=max_sessions, ttl_seconds=session_ttl_seconds)
+        self._locks: dict[tuple, list] = {}
+        self._user_requests: dict[str, int] = {}
+        self._waiting = 0
+        self._idle: Optional[asyncio.Queue] = None
+
+    async def start(self) -> "RunnerPool":
+        """Builds the runners and starts admitting requests; idempotent."""
+        if self._idle is not None:
+            return self
+        # Model objects are resolved (and cached on the agents) before the first request.
+        for llm_agent in _llm_agents(self.agent):
+            llm_agent.canonical_model
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(Runner(
+                app_name=self.app_name, agent=self.agent,
+                session_service=self.session_service, artifact_service=self.artifact_service,
+                auto_create_session=True,
+            ))
+        logger.info(f"Serving {self.app_name} with {self.size} runners")
+        return self
+
+    async def close(self) -> None:
+        """Stops admitting requests and waits for the runs in progress to end.
+
+        The agent's toolsets are left open: the agent, not the pool, owns them.
+        """
+        idle, self._idle = self._idle, None
+        if idle is None:
+            return
+        for _ in range(self.size):
+            await idle.get()
+
+    async def __aenter__(self) -> "RunnerPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @contextlib.asynccontextmanager
+    async def _locked(self, key: tuple):
+        # Locks are dropped once nobody holds or waits for them, so idle users cost nothing.
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                self._locks.pop(key, None)
+
+    def _session_id(self, user_id: str) -> str:
+        session_id = self._sessions.get(user_id)
+        if session_id is None:
+            # Created by the runner on first use (auto_create_session), and again
+            # if the session service has expired it since.
+            session_id = uuid.uuid4().hex
+            self._sessions.set(user_id, session_id)
+        else:
+            # Refreshes the entry's lifetime.
+            self._sessions.set(user_id, session_id)
+        return session_id
+
+    def _run_config(self, run_config: Optional[RunConfig]) -> RunConfig:
+        run_config = run_config or self.run_config or RunConfig()
+        if self.max_history_events is None or run_config.get_session_config is not None:
+            return run_config
+        return run_config.model_copy(
+            update={"get_session_config": GetSessionConfig(num_recent_events=self.max_history_events)}
+        )
+
+    def _admit(self, user_id: str) -> None:
+        if self._idle is None:
+            raise ServerBusy(f"{self.app_name} is not serving")
+        if self._user_requests.get(user_id, 0) >= self.max_user_requests:
+            self.rejected += 1
+            raise ServerBusy(f"{user_id} already has {self.max_user_requests} requests in progress")
+        if self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusy(f"{self.app_name} has {self.max_queue} requests waiting")
+        self._user_requests[user_id] = self._user_requests.get(user_id, 0) + 1
+
+    def _release(self, user_id: str) -> None:
+        remaining = self._user_requests.get(user_id, 1) - 1
+        if remaining:
+            self._user_requests[user_id] = remaining
+        else:
+            self._user_requests.pop(user_id, None)
+
+    async def run(
+        self,
+        user_id: str,
+        message: Union[str, types.Content],
+        session_id: Optional[str] = None,
+        run_config: Optional[RunConfig] = None,
+    ) -> AsyncGenerator[Event, None]:
+        """Runs `message` in the user's session and yields the events as they are produced.
+
+        Raises `ServerBusy` before any event if the request is not admitted.
+        Pass `session_id` to continue a specific conversation instead of the
+        user's default one.
+        """
+        if isinstance(message, str):
+            message = types.Content(role="user", parts=[types.Part(text=message)])
+        self._admit(user_id)
+        idle = self._idle
+        session_id = session_id or self._session_id(user_id)
+        try:
+            # Turns of one session run in order, and a turn waiting for the previous
+            # one does not hold a runner meanwhile.
+            async with self._locked((user_id, session_id)):
+                enqueued = time.perf_counter()
+                self._waiting += 1
+                try:
+                    runner = await idle.get()
+                finally:
+                    self._waiting -= 1
+                self.queue_wait_ms += 1000 * (time.perf_counter() - enqueued)
+                try:
+                    async for event in runner.run_async(
+                        user_id=user_id, session_id=session_id, new_message=message,
+                        run_config=self._run_config(run_config),
+                    ):
+                        yield event
+                    self.served += 1
+                except Exception:
+                    self.failed += 1
+                    raise
+                finally:
+                    idle.put_nowait(runner)
+        finally:
+            self._release(user_id)
+
+    def stats(self) -> dict:
+        return {
+            "runners": self.size,
+            "waiting": self._waiting,
+            "users_active": len(self._user_requests),
+            "sessions": len(self._sessions),
+            "served": self.served,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "mean_queue_wait_ms": round(self.queue_wait_ms / self.served, 3) if self.served else 0.0,
+        }
+
+
+class AgentServer:
+    """One `RunnerPool` per agent, over a shared session service.
+
+    Args:
+        agents: Root agents by app name.
+        pool_options: Passed to every `RunnerPool`.
+    """
+
+    def __init__(self, agents: dict[str, Any], session_service: Optional[BaseSessionService] = None, **pool_options):
+        session_service = session_service or InMemorySessionService()
+        self.pools = {
+            app_name: RunnerPool(agent, app_name, session_service=session_service, **pool_options)
+            for app_name, agent in agents.items()
+        }
+
+    async def start(self) -> "AgentServer":
+        for pool in self.pools.values():
+            await pool.start()
+        return self
+
+    async def close(self) -> None:
+        for pool in self.pools.values():
+            await pool.close()
+
+    async def __aenter__(self) -> "AgentServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def run(self, app_name: str, user_id: str, message: Union[str, types.Content], **options) -> AsyncGenerator[Event, None]:
+        return self.pools[app_name].run(user_id, message, **options)
+
+    def stats(self) -> dict:
+        return {app_name: pool.stats() for app_name, pool in self.pools.items()}
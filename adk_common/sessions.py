@@ -0,0 +1,498 @@
+"""SQLite session service that keeps large state values compressed and out of line.
+
+The multi-agent pipelines pass whole documents through session state with
+`output_key` (`release_notes`, `bahasa_version`, `webpage_content`, ...). With
+the in-memory session service every session keeps all of them, and its whole
+event history, in process memory for as long as the process lives.
+`CompactSqliteSessionService` keeps sessions in an SQLite file instead:
+
+- Session-scoped state values larger than `inline_limit_bytes` (JSON-encoded)
+  are zlib-compressed into their own rows. A loaded session holds only their
+  keys; a value is read from disk the first time it is accessed, so a turn
+  that never looks at `webpage_content` never loads it.
+- Events are stored as compressed JSON, with the offloaded values of their
+  state deltas replaced by the same short stand-in, and `max_events` (100 by
+  default) caps how many of the most recent ones a loaded session carries
+  (older events stay on disk).
+- Sessions expire `ttl_seconds` after their last update. Expired sessions are
+  not returned and are purged periodically, together with their values and
+  events.
+- Nothing is cached between calls, so memory is bounded by the sessions with a
+  run in progress, not by the number of users.
+
+`app:` and `user:` state is stored per app and per (app, user) as usual, and
+`temp:` state is never persisted. Run the agents with it through
+`adk web --session_service_uri compactsqlite:///path/to/sessions.db` (the
+scheme is registered in the repository's services.py) or pass it to a
+`Runner`. Session state must be JSON-serializable.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INLINE_LIMIT_BYTES = 2048
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_EVENTS = 100
+PURGE_INTERVAL_SECONDS = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL, user_id TEXT NOT NULL, id TEXT NOT NULL,
+    state TEXT NOT NULL, create_time REAL NOT NULL, update_time REAL NOT NULL, expires_at REAL,
+    PRIMARY KEY (app_name, user_id, id));
+CREATE INDEX IF NOT EXISTS sessions_expiry ON sessions (expires_at);
+CREATE TABLE IF NOT EXISTS state_values (
+    app_name TEXT NOT NULL, user_id TEXT NOT NULL, session_id TEXT NOT NULL, key TEXT NOT NULL,
+    size INTEGER NOT NULL, data BLOB NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key));
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL, user_id TEXT NOT NULL, session_id TEXT NOT NULL, seq INTEGER NOT NULL,
+    id TEXT NOT NULL, timestamp REAL NOT NULL, data BLOB NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, seq));
+CREATE TABLE IF NOT EXISTS app_states (app_name TEXT PRIMARY KEY, state TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL, user_id TEXT NOT NULL, state TEXT NOT NULL, PRIMARY KEY (app_name, user_id));
+"""
+
+
+class OffloadedValue(str):
+    """Stands in for a state value that is still on disk.
+
+    `LazyState` replaces it with the real value on access; anything reading the
+    raw dict (such as a JSON dump of the session) sees this short description.
+    """
+
+    def __new__(cls, key: str, size: int):
+        return super().__new__(cls, f"<{key}: {size} bytes, not loaded>")
+
+
+class LazyState(dict):
+    """Session state whose offloaded values are loaded on first access."""
+
+    def __init__(self, values: dict, offloaded: dict[str, int], loader: Callable[[str], Any]):
+        super().__init__(values)
+        for key, size in offloaded.items():
+            super().__setitem__(key, OffloadedValue(key, size))
+        self._pending = set(offloaded)
+        self._loader = loader
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            self._pending.discard(key)
+            super().__setitem__(key, self._loader(key))
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        self._pending.discard(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._pending.discard(key)
+        super().__delitem__(key)
+
+    def __iter__(self):
+        # Overriding __iter__ makes dict(state) and {}.update(state) go through
+        # __getitem__ instead of copying the raw values.
+        return super().__iter__()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key in self:
+            value = self[key]
+            del self[key]
+            return value
+        return super().pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, other=(), **kwargs):
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def load_all(self) -> None:
+        for key in list(self._pending):
+            self[key]
+
+    def values(self):
+        self.load_all()
+        return super().values()
+
+    def items(self):
+        self.load_all()
+        return super().items()
+
+    def copy(self) -> dict:
+        self.load_all()
+        return dict(super().items())
+
+    def __eq__(self, other):
+        self.load_all()
+        return super().__eq__(other)
+
+    @property
+    def loaded_keys(self) -> set[str]:
+        return set(self) - self._pending
+
+
+def _decompress(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def _split_state(state: dict[str, Any]) -> tuple[dict, dict, dict]:
+    """Splits state or a state delta into (app, user, session) parts, dropping temp: keys."""
+    app, user, session = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+class CompactSqliteSessionService(BaseSessionService):
+    """Persistent session service with compressed, lazily loaded large state values.
+
+    Args:
+        path: Database file; its directory is created if needed.
+        inline_limit_bytes: Session state values whose JSON is larger than this
+            are stored compressed in their own rows and loaded on access.
+        ttl_seconds: Sessions expire this long after their last update (None
+            keeps them forever).
+        max_events: At most this many recent events are loaded with a session
+            (None loads all of them).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        inline_limit_bytes: int = DEFAULT_INLINE_LIMIT_BYTES,
+        ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS,
+        max_events: Optional[int] = DEFAULT_MAX_EVENTS,
+    ):
+        self.path = path
+        self.inline_limit_bytes = inline_limit_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_events = max_events
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._last_purge = 0.0
+        self.values_loaded = 0
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def _expires_at(self, now: float) -> Optional[float]:
+        return now + self.ttl_seconds if self.ttl_seconds is not None else None
+
+    # --- Sessions ----------------------------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        await asyncio.to_thread(self._transaction, lambda db: self._create(db, app_name, user_id, session_id, state or {}))
+        await self._maybe_purge()
+        return await self.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    def _create(self, db: sqlite3.Connection, app_name: str, user_id: str, session_id: str, state: dict) -> None:
+        now = time.time()
+        row = db.execute(
+            "SELECT expires_at FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+            (app_name, user_id, session_id),
+        ).fetchone()
+        if row is not None:
+            if row[0] is None or row[0] > now:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+            self._delete(db, app_name, user_id, session_id)
+        app_delta, user_delta, session_state = _split_state(state)
+        db.execute(
+            "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time, expires_at) "
+            "VALUES (?, ?, ?, '{}', ?, ?, ?)",
+            (app_name, user_id, session_id, now, now, self._expires_at(now)),
+        )
+        self._apply_delta(db, app_name, user_id, session_id, app_delta, user_delta, session_state)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(self._get, app_name, user_id, session_id, config)
+
+    def _get(self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]) -> Optional[Session]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state, update_time, expires_at FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None or (row[2] is not None and row[2] <= time.time()):
+                return None
+            state_json, update_time, _ = row
+            offloaded = dict(self._db.execute(
+                "SELECT key, size FROM state_values WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchall())
+            events = self._load_events(app_name, user_id, session_id, config)
+            app_state = self._scoped_state("SELECT state FROM app_states WHERE app_name = ?", (app_name,))
+            user_state = self._scoped_state(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            )
+
+        values = json.loads(state_json)
+        values.update({State.APP_PREFIX + key: value for key, value in app_state.items()})
+        values.update({State.USER_PREFIX + key: value for key, value in user_state.items()})
+        session = Session(id=session_id, app_name=app_name, user_id=user_id, events=events, last_update_time=update_time)
+        # Assigned after construction: validating the field would copy it into a plain dict.
+        session.state = LazyState(values, offloaded, lambda key: self._load_value(app_name, user_id, session_id, key))
+        return session
+
+    def _load_events(self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]) -> list[Event]:
+        limit = self.max_events
+        if config is not None and config.num_recent_events is not None:
+            limit = config.num_recent_events if limit is None else min(limit, config.num_recent_events)
+        query = "SELECT data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?"
+        params: list[Any] = [app_name, user_id, session_id]
+        if config is not None and config.after_timestamp is not None:
+            query += " AND timestamp >= ?"
+            params.append(config.after_timestamp)
+        query += " ORDER BY seq DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = self._db.execute(query, params).fetchall()
+        return [Event.model_validate_json(zlib.decompress(data)) for (data,) in reversed(rows)]
+
+    def _scoped_state(self, query: str, params: tuple) -> dict:
+        row = self._db.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def _load_value(self, app_name: str, user_id: str, session_id: str, key: str) -> Any:
+        # Called from LazyState on first access; a single-row read of local data.
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM state_values WHERE app_name = ? AND user_id = ? AND session_id = ? AND key = ?",
+                (app_name, user_id, session_id, key),
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        self.values_loaded += 1
+        return _decompress(row[0])
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        def run() -> list[Session]:
+            query = "SELECT user_id, id, update_time FROM sessions WHERE app_name = ? AND (expires_at IS NULL OR expires_at > ?)"
+            params: list[Any] = [app_name, time.time()]
+            if user_id is not None:
+                query += " AND user_id = ?"
+                params.append(user_id)
+            with self._lock:
+                rows = self._db.execute(query + " ORDER BY update_time", params).fetchall()
+            return [Session(id=sid, app_name=app_name, user_id=uid, last_update_time=updated) for uid, sid, updated in rows]
+
+        return ListSessionsResponse(sessions=await asyncio.to_thread(run))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._transaction, lambda db: self._delete(db, app_name, user_id, session_id))
+
+    @staticmethod
+    def _delete(db: sqlite3.Connection, app_name: str, user_id: str, session_id: str) -> None:
+        for table, column in (("sessions", "id"), ("state_values", "session_id"), ("events", "session_id")):
+            db.execute(
+                f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND {column} = ?",
+                (app_name, user_id, session_id),
+            )
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> dict[str, Any]:
+        def run() -> dict:
+            with self._lock:
+                return self._scoped_state(
+                    "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+                )
+
+        return await asyncio.to_thread(run)
+
+    # --- Events ------------------------------------------------------------------
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session, event)
+        delta = event.actions.state_delta if event.actions and event.actions.state_delta else {}
+        data = zlib.compress(self._stored_event(event, delta).model_dump_json(exclude_none=True).encode("utf-8"), 6)
+        found = await asyncio.to_thread(self._transaction, lambda db: self._append(db, session, event, data, delta))
+        if not found:
+            raise SessionNotFoundError(f"Session {session.id} not found.")
+        session.last_update_time = event.timestamp
+        await self._maybe_purge()
+        return event
+
+    def _stored_event(self, event: Event, delta: dict) -> Event:
+        """The event as stored: session state values that go out of line are only referenced."""
+        stored_delta, offloaded = {}, False
+        for name, value in delta.items():
+            encoded = None
+            if not name.startswith((State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)):
+                encoded = json.dumps(value, ensure_ascii=False)
+            if encoded is not None and len(encoded) > self.inline_limit_bytes:
+                stored_delta[name], offloaded = OffloadedValue(name, len(encoded)), True
+            else:
+                stored_delta[name] = value
+        if not offloaded:
+            return event
+        return event.model_copy(update={"actions": event.actions.model_copy(update={"state_delta": stored_delta})})
+
+    def _append(self, db: sqlite3.Connection, session: Session, event: Event, data: bytes, delta: dict) -> bool:
+        key = (session.app_name, session.user_id, session.id)
+        if db.execute("SELECT 1 FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key).fetchone() is None:
+            return False
+        seq = db.execute(
+            "SELECT COALESCE(MAX(seq), 0) + 1 FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+        ).fetchone()[0]
+        db.execute(
+            "INSERT INTO events (app_name, user_id, session_id, seq, id, timestamp, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, seq, event.id, event.timestamp, data),
+        )
+        self._apply_delta(db, *key, *_split_state(delta))
+        now = time.time()
+        db.execute(
+            "UPDATE sessions SET update_time = ?, expires_at = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+            (event.timestamp, self._expires_at(now), *key),
+        )
+        return True
+
+    def _apply_delta(
+        self, db: sqlite3.Connection, app_name: str, user_id: str, session_id: str,
+        app_delta: dict, user_delta: dict, session_delta: dict,
+    ) -> None:
+        if app_delta:
+            state = self._scoped_state_in(db, "SELECT state FROM app_states WHERE app_name = ?", (app_name,))
+            state.update(app_delta)
+            db.execute("INSERT OR REPLACE INTO app_states (app_name, state) VALUES (?, ?)", (app_name, json.dumps(state)))
+        if user_delta:
+            state = self._scoped_state_in(
+                db, "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+            )
+            state.update(user_delta)
+            db.execute(
+                "INSERT OR REPLACE INTO user_states (app_name, user_id, state) VALUES (?, ?, ?)",
+                (app_name, user_id, json.dumps(state)),
+            )
+        if not session_delta:
+            return
+        key = (app_name, user_id, session_id)
+        inline = json.loads(db.execute(
+            "SELECT state FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?", key
+        ).fetchone()[0])
+        for name, value in session_delta.items():
+            encoded = json.dumps(value, ensure_ascii=False)
+            if len(encoded) > self.inline_limit_bytes:
+                inline.pop(name, None)
+                db.execute(
+                    "INSERT OR REPLACE INTO state_values (app_name, user_id, session_id, key, size, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, name, len(encoded), zlib.compress(encoded.encode("utf-8"), 6)),
+                )
+            else:
+                inline[name] = value
+                db.execute(
+                    "DELETE FROM state_values WHERE app_name = ? AND user_id = ? AND session_id = ? AND key = ?",
+                    (*key, name),
+                )
+        db.execute(
+            "UPDATE sessions SET state = ? WHERE app_name = ? AND user_id = ? AND id = ?", (json.dumps(inline), *key)
+        )
+
+    @staticmethod
+    def _scoped_state_in(db: sqlite3.Connection, query: str, params: tuple) -> dict:
+        row = db.execute(query, params).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    # --- Expiry ------------------------------------------------------------------
+
+    async def _maybe_purge(self) -> None:
+        if self.ttl_seconds is None or time.time() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.time()
+        purged = await asyncio.to_thread(self.purge_expired)
+        if purged:
+            logger.info(f"Purged {purged} expired sessions")
+
+    def purge_expired(self) -> int:
+        """Deletes expired sessions with their state values and events; returns how many."""
+        def run(db: sqlite3.Connection) -> int:
+            expired = db.execute(
+                "SELECT app_name, user_id, id FROM sessions WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).fetchall()
+            for app_name, user_id, session_id in expired:
+                self._delete(db, app_name, user_id, session_id)
+            return len(expired)
+
+        return self._transaction(run)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def session_service_from_uri(uri: str, **_) -> CompactSqliteSessionService:
+    """Builds the service from `compactsqlite:///path/to/sessions.db?ttl_seconds=3600&max_events=200`.
+
+    Query parameters: ttl_seconds (0 keeps sessions forever), max_events (0
+    loads every event) and inline_limit_bytes.
+    """
+    parsed = urlparse(uri)
+    path = parsed.path if parsed.netloc in ("", "localhost") else parsed.netloc + parsed.path
+    options = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+    ttl_seconds = float(options.get("ttl_seconds", DEFAULT_TTL_SECONDS)) or None
+    max_events = int(options.get("max_events", DEFAULT_MAX_EVENTS)) or None
+    return CompactSqliteSessionService(
+        path,
+        inline_limit_bytes=int(options.get("inline_limit_bytes", DEFAULT_INLINE_LIMIT_BYTES)),
+        ttl_seconds=ttl_seconds,
+        max_events=max_events,
+    )
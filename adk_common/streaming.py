@@ -0,0 +1,90 @@
+"""Helpers for streaming model output to callers and between pipeline stages.
+
+With `StreamingMode.SSE` an LLM agent yields partial events carrying each new
+piece of text, then one final event with the whole response. `TextStream`
+turns that event stream into the text a caller should display next, and
+`ParagraphBuffer` cuts streamed text into completed paragraphs so a downstream
+stage can start on the first paragraphs while the rest is still generated.
+"""
+import os
+import re
+from typing import Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def streaming_run_config(run_config: Optional[RunConfig] = None) -> RunConfig:
+    """`run_config` (or a default one) with SSE streaming, unless ADK_STREAMING=off."""
+    run_config = run_config or RunConfig()
+    if os.environ.get("ADK_STREAMING", "on").lower() == "off":
+        return run_config
+    return run_config.model_copy(update={"streaming_mode": StreamingMode.SSE})
+
+
+def event_text(event: Event) -> str:
+    """The visible text of an event, without thoughts."""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+
+
+class TextStream:
+    """Tracks which text of a run has already been shown.
+
+    `update(event)` returns the text to display for the event: the new piece
+    for a partial event, nothing for the final event of a response that was
+    already streamed, and the whole text of a response that was not streamed.
+    """
+
+    def __init__(self):
+        self._streamed: set[str] = set()
+
+    def update(self, event: Event) -> str:
+        text = event_text(event)
+        if event.partial:
+            self._streamed.add(event.author)
+            return text
+        if event.author in self._streamed:
+            self._streamed.discard(event.author)
+            return ""
+        return text
+
+
+class ParagraphBuffer:
+    """Collects streamed text and hands out completed paragraphs.
+
+    Paragraphs are separated by a blank line. Short paragraphs are held back
+    and joined with the next ones until a chunk has at least `min_chars`
+    characters, which keeps the number of downstream calls low.
+    """
+
+    def __init__(self, min_chars: int = 0):
+        self.min_chars = min_chars
+        self._text = ""
+        self._ready: list[str] = []
+
+    def feed(self, text: str) -> list[str]:
+        """Adds streamed text; returns the chunks completed by it."""
+        self._text += text
+        *paragraphs, self._text = _PARAGRAPH_BREAK.split(self._text)
+        self._ready.extend(paragraph.strip() for paragraph in paragraphs if paragraph.strip())
+        if not self._ready or sum(len(paragraph) for paragraph in self._ready) < self.min_chars:
+            return []
+        chunk, self._ready = "\n\n".join(self._ready), []
+        return [chunk]
+
+    def discard(self) -> None:
+        """Drops the text not handed out yet."""
+        self._text = ""
+        self._ready = []
+
+    def flush(self) -> list[str]:
+        """Returns whatever is left once the stream has ended."""
+        if self._text.strip():
+            self._ready.append(self._text.strip())
+        self._text = ""
+        chunk, self._ready = "\n\n".join(self._ready), []
+        return [chunk] if chunk else []
@@ -0,0 +1,165 @@
+"""Result cache for database-backed tools with per-tool staleness policies.
+
+Results are keyed by (tool name, normalized parameters). Each tool gets a
+`CachePolicy`, usually loaded from a JSON file next to the agent:
+
+    {
+      "search-hotels-by-name": {"ttl_seconds": 86400, "case_insensitive": true},
+      "search_release_notes_bq": {"ttl_seconds": 3600, "stale_seconds": 82800, "expire_at_utc_midnight": true}
+    }
+
+- ttl_seconds: how long a result is served as fresh (0 or a missing entry disables caching).
+- stale_seconds: after the TTL, serve the stale result for this much longer while a
+  background refresh runs (stale-while-revalidate).
+- expire_at_utc_midnight: never keep a result past the end of the UTC day, for
+  queries over CURRENT_DATE().
+- case_insensitive: lower-case string parameters in the key (for ILIKE queries).
+
+Concurrent identical calls are coalesced into one query (single-flight). Errors
+are never cached.
+"""
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from .caching import SingleFlight, TTLCache
+from .tool_metrics import note_cache_hit
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long results of one tool may be reused."""
+    ttl_seconds: float = 0
+    stale_seconds: float = 0
+    expire_at_utc_midnight: bool = False
+    case_insensitive: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+
+def load_cache_policies(path: str) -> dict[str, CachePolicy]:
+    """Reads per-tool policies from a JSON file; a missing file means no caching."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {name: CachePolicy(**options) for name, options in json.load(f).items()}
+
+
+def _seconds_until_utc_midnight(now: Optional[float] = None) -> float:
+    current = datetime.datetime.fromtimestamp(now if now is not None else time.time(), tz=datetime.timezone.utc)
+    midnight = (current + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - current).total_seconds()
+
+
+def _normalize_value(value: Any, case_insensitive: bool) -> Any:
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.lower() if case_insensitive else value
+    if isinstance(value, (list, tuple)):
+        return [_normalize_value(v, case_insensitive) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize_value(v, case_insensitive) for k, v in sorted(value.items())}
+    return value
+
+
+def cache_key(tool_name: str, args: dict, policy: CachePolicy) -> str:
+    normalized = _normalize_value(args, policy.case_insensitive)
+    return f"{tool_name}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fresh_until: float
+
+
+def _consume_refresh_error(task: asyncio.Task) -> None:
+    # Background refreshes have no awaiter; the stale value stays until the next attempt.
+    if not task.cancelled():
+        task.exception()
+
+
+class ToolResultCache:
+    """Caches tool results by (tool name, normalized parameters) under per-tool policies."""
+
+    def __init__(self, policies: dict[str, CachePolicy], max_entries: int = 1024):
+        self.policies = policies
+        self._entries = TTLCache(max_entries=max_entries)
+        self._single_flight = SingleFlight()
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def policy(self, tool_name: str) -> CachePolicy:
+        return self.policies.get(tool_name, CachePolicy())
+
+    async def call(self, tool_name: str, args: dict, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached result for the call, or runs `fn()` and caches its result."""
+        policy = self.policy(tool_name)
+        if not policy.enabled:
+            return await fn()
+        key = cache_key(tool_name, args, policy)
+        entry = self._entries.get(key)
+        if entry is not None:
+            note_cache_hit()
+            if time.time() < entry.fresh_until:
+                self.fresh_hits += 1
+                return entry.value
+            # Stale but within the stale window: answer now, refresh in the background.
+            self.stale_hits += 1
+            if not self._single_flight.in_flight(key):
+                self.refreshes += 1
+                refresh = self._single_flight.start(key, lambda: self._fetch(key, policy, fn))
+                refresh.add_done_callback(_consume_refresh_error)
+            return entry.value
+        self.misses += 1
+        return await self._single_flight.run(key, lambda: self._fetch(key, policy, fn))
+
+    async def _fetch(self, key: str, policy: CachePolicy, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            value = await fn()
+        except Exception as e:
+            logger.warning(f"Tool call for {key} failed ({e}); not cached.")
+            raise
+        now = time.time()
+        ttl, stale = policy.ttl_seconds, policy.stale_seconds
+        if policy.expire_at_utc_midnight:
+            until_midnight = _seconds_until_utc_midnight(now)
+            ttl = min(ttl, until_midnight)
+            stale = min(stale, until_midnight - ttl)
+        self._entries.set(key, _Entry(value, now + ttl), ttl_seconds=ttl + stale)
+        logger.info(f"Cached {key} for {ttl:.0f}s (+{stale:.0f}s stale) after "
+                    f"{1000 * (time.perf_counter() - started):.0f} ms")
+        return value
+
+    def invalidate(self, tool_name: Optional[str] = None) -> None:
+        """Drops all cached results, or only those of one tool."""
+        if tool_name is None:
+            self._entries.clear()
+            return
+        for key, _ in self._entries.items():
+            if key.startswith(f"{tool_name}:"):
+                self._entries.pop(key)
+
+    def stats(self) -> dict:
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "coalesced": self._single_flight.coalesced,
+            "hit_rate": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,330 @@
+"""Per-tool latency, payload, error and cache-hit metrics for every agent.
+
+`instrument_agent(root_agent)` attaches ADK before/after/error tool callbacks
+to every LLM agent in the tree. For each (agent, tool) pair they record:
+
+- a latency histogram (milliseconds),
+- request and response payload sizes (bytes of the JSON-encoded args/result),
+- call and error counts (a raised exception, or a result with status "error"
+  or an "error" key),
+- cache hits, reported by cache layers through `note_cache_hit()`.
+
+Tools called by code rather than by a model (a custom agent fetching its input,
+for example) are recorded with `with tool_metrics.measure(agent, tool, args)`.
+
+Export:
+
+- Prometheus text format from `tool_metrics.prometheus_text()`; with
+  TOOL_METRICS_PORT set, a background HTTP server serves it on /metrics.
+- OpenTelemetry spans ("tool <name>") with the same numbers as attributes,
+  emitted through the global tracer provider. With TOOL_METRICS_OTLP_ENDPOINT
+  set (for example http://localhost:4318/v1/traces) and the
+  opentelemetry-exporter-otlp-proto-http package installed, spans are sent to
+  that collector.
+- TOOL_METRICS=off disables the callbacks.
+"""
+import bisect
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from opentelemetry import trace
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+@dataclass
+class _CallRecord:
+    started: float
+    request_bytes: int
+    span: Any
+    cache_hit: bool = False
+    # Result of a call recorded with `measure`, set by the caller.
+    response: Any = None
+
+
+# The record of the tool call running in the current context, so cache layers
+# deep inside a tool can flag a hit without knowing about the metrics.
+_current_call: contextvars.ContextVar[Optional[_CallRecord]] = contextvars.ContextVar(
+    "tool_metrics_current_call", default=None
+)
+
+
+def note_cache_hit() -> None:
+    """Marks the tool call in progress (if any) as answered from a cache."""
+    record = _current_call.get()
+    if record is not None:
+        record.cache_hit = True
+
+
+def _payload_bytes(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, default=str, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(str(value).encode("utf-8"))
+
+
+def _is_error_result(result: Any) -> bool:
+    return isinstance(result, dict) and (result.get("status") == "error" or "error" in result)
+
+
+@dataclass
+class ToolStats:
+    """Accumulated numbers for one (agent, tool) pair."""
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    latency_sum_ms: float = 0.0
+    # Counts per LATENCY_BUCKETS_MS upper bound, plus one overflow bucket.
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+
+    def observe(self, latency_ms: float) -> None:
+        self.latency_sum_ms += latency_ms
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+
+class ToolMetrics:
+    """Collects tool metrics from ADK tool callbacks."""
+
+    def __init__(self):
+        self._stats: dict[tuple[str, str], ToolStats] = {}
+        self._calls: dict[str, _CallRecord] = {}
+        self._lock = threading.Lock()
+        self._tracer = trace.get_tracer(__name__)
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # --- ADK callbacks -----------------------------------------------------------
+
+    def before_tool(self, tool, args: dict, tool_context) -> None:
+        record = self._start(tool_context.agent_name, tool.name, args)
+        self._calls[tool_context.function_call_id] = record
+        _current_call.set(record)
+        return None
+
+    def after_tool(self, tool, args: dict, tool_context, tool_response: Any) -> None:
+        record = self._calls.pop(tool_context.function_call_id, None)
+        if record is not None:
+            self._finish(tool_context.agent_name, tool.name, record, tool_response, _is_error_result(tool_response))
+        return None
+
+    def on_tool_error(self, tool, args: dict, tool_context, error: Exception) -> None:
+        record = self._calls.pop(tool_context.function_call_id, None)
+        if record is not None:
+            self._finish(tool_context.agent_name, tool.name, record, None, True, error)
+        # Returning None lets the exception propagate as before.
+        return None
+
+    # --- Calls made without the callbacks ----------------------------------------
+
+    @contextlib.contextmanager
+    def measure(self, agent_name: str, tool_name: str, args: Any = None):
+        """Records a tool call that code makes directly, as the callbacks record a model's calls.
+
+        Set `response` on the yielded record to the result; an exception raised
+        in the block counts as an error. TOOL_METRICS=off records nothing.
+        """
+        if os.environ.get("TOOL_METRICS", "on").lower() == "off":
+            yield _CallRecord(0.0, 0, None)
+            return
+        record = self._start(agent_name, tool_name, args)
+        token = _current_call.set(record)
+        try:
+            yield record
+        except Exception as e:
+            self._finish(agent_name, tool_name, record, None, True, e)
+            raise
+        else:
+            self._finish(agent_name, tool_name, record, record.response, _is_error_result(record.response))
+        finally:
+            _current_call.reset(token)
+
+    def _start(self, agent_name: str, tool_name: str, args: Any) -> _CallRecord:
+        self._ensure_exporters()
+        span = self._tracer.start_span(
+            f"tool {tool_name}", attributes={"adk.agent": agent_name, "adk.tool": tool_name},
+        )
+        return _CallRecord(time.perf_counter(), _payload_bytes(args), span)
+
+    def _finish(
+        self, agent_name: str, tool_name: str, record: _CallRecord, response: Any, failed: bool,
+        error: Optional[Exception] = None,
+    ) -> None:
+        latency_ms = 1000 * (time.perf_counter() - record.started)
+        response_bytes = _payload_bytes(response)
+        with self._lock:
+            stats = self._stats.setdefault((agent_name, tool_name), ToolStats())
+            stats.calls += 1
+            stats.errors += int(failed)
+            stats.cache_hits += int(record.cache_hit)
+            stats.request_bytes += record.request_bytes
+            stats.response_bytes += response_bytes
+            stats.observe(latency_ms)
+        record.span.set_attributes({
+            "tool.latency_ms": round(latency_ms, 3),
+            "tool.request_bytes": record.request_bytes,
+            "tool.response_bytes": response_bytes,
+            "tool.cache_hit": record.cache_hit,
+            "tool.error": failed,
+        })
+        if error is not None:
+            record.span.record_exception(error)
+            record.span.set_status(trace.Status(trace.StatusCode.ERROR, str(error)))
+        record.span.end()
+
+    # --- Reading and exporting ---------------------------------------------------
+
+    def snapshot(self) -> dict[tuple[str, str], ToolStats]:
+        with self._lock:
+            return {
+                key: ToolStats(**{**vars(stats), "bucket_counts": list(stats.bucket_counts)})
+                for key, stats in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus_text(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = []
+        stats_by_key = sorted(self.snapshot().items())
+
+        def counter(name: str, help_text: str, attribute: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (agent, tool), stats in stats_by_key:
+                lines.append(f"{name}{{{_labels(agent, tool)}}} {getattr(stats, attribute)}")
+
+        counter("adk_tool_calls_total", "Tool calls.", "calls")
+        counter("adk_tool_errors_total", "Tool calls that raised or returned an error.", "errors")
+        counter("adk_tool_cache_hits_total", "Tool calls answered from a cache.", "cache_hits")
+        counter("adk_tool_request_bytes_total", "JSON-encoded size of tool arguments.", "request_bytes")
+        counter("adk_tool_response_bytes_total", "JSON-encoded size of tool results.", "response_bytes")
+        lines.append("# HELP adk_tool_latency_ms Tool call latency in milliseconds.")
+        lines.append("# TYPE adk_tool_latency_ms histogram")
+        for (agent, tool), stats in stats_by_key:
+            labels = _labels(agent, tool)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS_MS, stats.bucket_counts):
+                cumulative += count
+                lines.append(f'adk_tool_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'adk_tool_latency_ms_bucket{{{labels},le="+Inf"}} {stats.calls}')
+            lines.append(f"adk_tool_latency_ms_sum{{{labels}}} {stats.latency_sum_ms:.3f}")
+            lines.append(f"adk_tool_latency_ms_count{{{labels}}} {stats.calls}")
+        return "\n".join(lines) + "\n"
+
+    def _ensure_exporters(self) -> None:
+        # Started on the first tool call rather than at import, to keep cold starts cheap.
+        if self._server is None and os.environ.get("TOOL_METRICS_PORT"):
+            with self._lock:
+                if self._server is None:
+                    self._server = serve_prometheus(self, int(os.environ["TOOL_METRICS_PORT"]))
+        endpoint = os.environ.get("TOOL_METRICS_OTLP_ENDPOINT")
+        if endpoint:
+            configure_otlp(endpoint)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(agent: str, tool: str) -> str:
+    return f'agent="{_escape(agent)}",tool="{_escape(tool)}"'
+
+
+def serve_prometheus(metrics: ToolMetrics, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serves `metrics` as Prometheus text on http://host:port/metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="tool-metrics", daemon=True).start()
+    logger.info(f"Serving tool metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+_otlp_configured = False
+
+
+def configure_otlp(endpoint: str) -> bool:
+    """Sends spans to an OTLP/HTTP collector, unless a tracer provider is already set up."""
+    global _otlp_configured
+    if _otlp_configured:
+        return True
+    _otlp_configured = True
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("TOOL_METRICS_OTLP_ENDPOINT is set but opentelemetry-exporter-otlp-proto-http "
+                       "is not installed; tool spans are not exported.")
+        return False
+    if not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+        logger.info("A tracer provider is already configured; tool spans use it.")
+        return True
+    provider = TracerProvider(resource=Resource.create({"service.name": os.environ.get("OTEL_SERVICE_NAME", "adk-agents")}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint)))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+def add_callback(agent, field_name: str, callback) -> None:
+    """Adds `callback` to an agent callback field, keeping any callbacks already set."""
+    existing = getattr(agent, field_name)
+    if existing is None:
+        setattr(agent, field_name, callback)
+    elif isinstance(existing, list):
+        if callback not in existing:
+            existing.append(callback)
+    elif existing != callback:
+        setattr(agent, field_name, [existing, callback])
+
+
+def instrument_agent(agent, metrics: Optional["ToolMetrics"] = None):
+    """Adds the metrics tool callbacks to every LLM agent in the tree; returns the agent."""
+    if os.environ.get("TOOL_METRICS", "on").lower() == "off":
+        return agent
+    metrics = metrics or tool_metrics
+    if hasattr(agent, "before_tool_callback"):
+        add_callback(agent, "before_tool_callback", metrics.before_tool)
+        add_callback(agent, "after_tool_callback", metrics.after_tool)
+        add_callback(agent, "on_tool_error_callback", metrics.on_tool_error)
+    for sub_agent in agent.sub_agents:
+        instrument_agent(sub_agent, metrics)
+    return agent
+
+
+# Process-wide collector used by all agents.
+tool_metrics = ToolMetrics()
@@ -0,0 +1,207 @@
+"""Paged, compact presentation of large tabular tool results.
+
+Toolbox SQL tools return their rows as one JSON array, which is verbose (every
+row repeats every column name) and lands in the model context in one piece.
+`ResultPaging` post-processes such results:
+
+- Rows are rendered as a compact pipe-separated table with a single header.
+- Optionally rows are grouped by a column (for example `product_name`); the
+  group column is then printed once per group instead of once per row.
+- Only the first page is returned. The full result is kept in memory for the
+  session and further pages are read with the `read_result_page` tool.
+  Pages hold whole groups where possible, so each page is a self-contained batch.
+
+Non-tabular results (plain strings, errors) are passed through unchanged.
+"""
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from google.adk.tools import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+from .caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_ROWS = 50
+DEFAULT_RESULT_TTL_SECONDS = 1800
+# Cell text longer than this is truncated in the table; the full row is still paged.
+MAX_CELL_CHARS = 2000
+
+
+def parse_rows(result: Any) -> Optional[list[dict]]:
+    """Returns the rows of a tabular tool result, or None if it is not a list of objects."""
+    if isinstance(result, dict) and "result" in result:
+        result = result["result"]
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return None
+    if result is None:
+        return []
+    if isinstance(result, list) and all(isinstance(row, dict) for row in result):
+        return result
+    return None
+
+
+def _cell(value: Any) -> str:
+    text = "" if value is None else str(value)
+    text = " ".join(text.split()).replace("|", "\\|")
+    return text if len(text) <= MAX_CELL_CHARS else text[:MAX_CELL_CHARS] + "..."
+
+
+def columns_of(rows: list[dict]) -> list[str]:
+    columns: dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+
+def to_table(rows: list[dict], columns: Optional[list[str]] = None) -> str:
+    """Renders rows as a pipe-separated table with one header line."""
+    columns = columns or columns_of(rows)
+    lines = [" | ".join(columns)]
+    lines.extend(" | ".join(_cell(row.get(column)) for column in columns) for row in rows)
+    return "\n".join(lines)
+
+
+def group_rows(rows: list[dict], column: str) -> dict[str, list[dict]]:
+    """Groups rows by a column, keeping groups in order of first appearance."""
+    groups: dict[str, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(str(row.get(column, "")), []).append(row)
+    return groups
+
+
+def iter_group_batches(groups: dict[str, list[dict]], max_rows: int) -> Iterator[list[tuple[str, list[dict]]]]:
+    """Packs whole groups into batches of at most `max_rows` rows.
+
+    A group larger than `max_rows` is split over several batches on its own.
+    """
+    batch, batch_rows = [], 0
+    for name, rows in groups.items():
+        if batch and batch_rows + len(rows) > max_rows:
+            yield batch
+            batch, batch_rows = [], 0
+        if len(rows) > max_rows:
+            for start in range(0, len(rows), max_rows):
+                yield [(name, rows[start:start + max_rows])]
+            continue
+        batch.append((name, rows))
+        batch_rows += len(rows)
+    if batch:
+        yield batch
+
+
+def grouped_table(batch: list[tuple[str, list[dict]]], group_column: str, columns: list[str]) -> str:
+    """Renders a batch of groups, printing the group value once as a heading."""
+    row_columns = [c for c in columns if c != group_column]
+    sections = [f"## {group_column}: {name} ({len(rows)} rows)\n{to_table(rows, row_columns)}" for name, rows in batch]
+    return "\n\n".join(sections)
+
+
+@dataclass
+class _StoredResult:
+    tool_name: str
+    columns: list[str]
+    group_by: Optional[str]
+    pages: list[str]
+    total_rows: int
+    groups: dict[str, int]
+
+
+class ResultPaging:
+    """Pages the tabular results of selected tools and serves further pages through a tool.
+
+    Args:
+        group_by: Map of tool name to the column its rows are grouped by.
+        tools: Tool names whose results are paged; None pages every tabular result.
+        page_rows: Maximum rows per page.
+        ttl_seconds: How long stored results can be paged through.
+    """
+
+    def __init__(
+        self,
+        group_by: Optional[dict[str, str]] = None,
+        tools: Optional[list[str]] = None,
+        page_rows: int = DEFAULT_PAGE_ROWS,
+        ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS,
+    ):
+        self.group_by = group_by or {}
+        self.tools = tools
+        self.page_rows = page_rows
+        self._results = TTLCache(max_entries=256, ttl_seconds=ttl_seconds)
+        self._reader = FunctionTool(self.read_result_page)
+
+    def applies_to(self, tool_name: str) -> bool:
+        return self.tools is None or tool_name in self.tools
+
+    @property
+    def reader_tool(self) -> FunctionTool:
+        return self._reader
+
+    def paginate(self, tool_name: str, rows: list[dict]) -> _StoredResult:
+        columns = columns_of(rows)
+        group_by = self.group_by.get(tool_name)
+        if group_by:
+            groups = group_rows(rows, group_by)
+            pages = [grouped_table(batch, group_by, columns) for batch in iter_group_batches(groups, self.page_rows)]
+            group_counts = {name: len(group) for name, group in groups.items()}
+        else:
+            pages = [to_table(rows[i:i + self.page_rows], columns) for i in range(0, len(rows), self.page_rows)]
+            group_counts = {}
+        return _StoredResult(tool_name, columns, group_by, pages or [to_table([], columns)], len(rows), group_counts)
+
+    def first_page(self, tool_name: str, result: Any, tool_context: Optional[ToolContext]) -> Any:
+        """Turns a raw tool result into its first page; non-tabular results are returned as-is."""
+        rows = parse_rows(result)
+        if rows is None:
+            return result
+        stored = self.paginate(tool_name, rows)
+        result_id = uuid.uuid4().hex[:12]
+        self._results.set((_session_id(tool_context), result_id), stored)
+        logger.info(f"{tool_name}: {stored.total_rows} rows in {len(stored.pages)} pages (result {result_id})")
+        return self._page_response(result_id, stored, 1)
+
+    def _page_response(self, result_id: str, stored: _StoredResult, page: int) -> dict:
+        response = {
+            "status": "success",
+            "result_id": result_id,
+            "total_rows": stored.total_rows,
+            "page": page,
+            "page_count": len(stored.pages),
+            "rows": stored.pages[page - 1],
+        }
+        if stored.group_by:
+            response["grouped_by"] = stored.group_by
+            response["groups"] = stored.groups
+        if page < len(stored.pages):
+            response["next"] = f"Call read_result_page(result_id='{result_id}', page={page + 1}) for more rows."
+        return response
+
+    def read_result_page(self, result_id: str, page: int, tool_context: ToolContext) -> dict:
+        """Reads another page of a large query result returned earlier in this conversation.
+
+        Args:
+            result_id: The result_id returned with the first page.
+            page: The page number to read, starting at 1.
+
+        Returns:
+            A dictionary with the rows of the requested page as a compact table.
+        """
+        stored = self._results.get((_session_id(tool_context), result_id))
+        if stored is None:
+            return {"status": "error", "error_message": f"Result '{result_id}' has expired; run the query again."}
+        if not 1 <= page <= len(stored.pages):
+            return {"status": "error", "error_message": f"Page must be between 1 and {len(stored.pages)}."}
+        return self._page_response(result_id, stored, page)
+
+
+def _session_id(tool_context: Optional[ToolContext]) -> str:
+    if tool_context is None:
+        return ""
+    return tool_context.session.id
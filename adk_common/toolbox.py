@@ -0,0 +1,392 @@
+"""Lazy, pooled client for MCP Toolbox for Databases toolsets.
+
+`ToolboxSyncClient(...).load_toolset(...)` at import time blocks agent startup on
+the toolbox server, fails if it is down, and makes every tool call a blocking
+HTTP request. `PooledToolboxToolset` replaces it:
+
+    root_agent = Agent(..., tools=[PooledToolboxToolset("my_first_toolset")])
+
+- Nothing touches the network at import time; the toolset is loaded on the
+  first model turn.
+- The tool manifest (names, descriptions, parameters) is cached on disk, so the
+  agent can still declare its tools when the server is temporarily unreachable.
+- All toolsets for a URL share one async `ToolboxClient` over a keep-alive
+  `aiohttp` connection pool, and tools are invoked asynchronously, so
+  concurrent tool calls run in parallel instead of serializing.
+- Connection failures drop the client and reconnect with exponential backoff.
+
+TOOLBOX_URL overrides the server URL (default http://127.0.0.1:7000) and
+TOOLBOX_MANIFEST_DIR the manifest cache directory. Pass a `ToolResultCache`
+(see `adk_common.tool_cache`) to reuse query results; TOOLBOX_CACHE=off
+bypasses it. Pass a `ResultPaging` (see `adk_common.tool_results`) to return
+large results as compact, grouped pages.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .tool_cache import ToolResultCache
+from .tool_metrics import tool_metrics
+from .tool_results import ResultPaging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOLBOX_URL = "http://127.0.0.1:7000"
+DEFAULT_MANIFEST_DIR = os.path.join(os.path.expanduser("~"), ".cache", "adk-projects", "toolbox")
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_KEEPALIVE_SECONDS = 60
+DEFAULT_REQUEST_TIMEOUT_SECONDS = 30
+INVOKE_ATTEMPTS = 3
+
+_PARAMETER_TYPES = {
+    "string": types.Type.STRING,
+    "integer": types.Type.INTEGER,
+    "float": types.Type.NUMBER,
+    "number": types.Type.NUMBER,
+    "boolean": types.Type.BOOLEAN,
+    "array": types.Type.ARRAY,
+    "object": types.Type.OBJECT,
+}
+
+
+class ToolboxUnavailableError(ConnectionError):
+    """Raised when the toolbox server cannot be reached (or is in its backoff window)."""
+
+
+class Backoff:
+    """Exponential backoff with jitter between reconnection attempts."""
+
+    def __init__(self, initial_seconds: float = 0.5, max_seconds: float = 30.0):
+        self.initial_seconds = initial_seconds
+        self.max_seconds = max_seconds
+        self.failures = 0
+        self.next_attempt_at = 0.0
+
+    @property
+    def delay(self) -> float:
+        if self.failures == 0:
+            return 0.0
+        base = min(self.max_seconds, self.initial_seconds * 2 ** (self.failures - 1))
+        return base * random.uniform(0.5, 1.0)
+
+    def ready(self) -> bool:
+        return time.monotonic() >= self.next_attempt_at
+
+    def seconds_until_ready(self) -> float:
+        return max(0.0, self.next_attempt_at - time.monotonic())
+
+    def failed(self) -> None:
+        self.failures += 1
+        self.next_attempt_at = time.monotonic() + self.delay
+
+    def succeeded(self) -> None:
+        self.failures = 0
+        self.next_attempt_at = 0.0
+
+
+def _schema_to_dict(tool) -> dict:
+    """Extracts the declaration-relevant parts of a loaded `ToolboxTool`."""
+    return {
+        "name": tool._name,
+        "description": tool._description,
+        "parameters": [
+            {
+                "name": p.name,
+                "type": p.type,
+                "description": p.description,
+                "required": getattr(p, "required", True),
+                "items": p.items.type if getattr(p, "items", None) else None,
+            }
+            for p in tool._params
+        ],
+    }
+
+
+def _declaration_from_dict(schema: dict) -> types.FunctionDeclaration:
+    properties, required = {}, []
+    for param in schema["parameters"]:
+        prop = types.Schema(
+            type=_PARAMETER_TYPES.get(param["type"], types.Type.STRING),
+            description=param["description"],
+        )
+        if param["type"] == "array":
+            prop.items = types.Schema(type=_PARAMETER_TYPES.get(param.get("items") or "string", types.Type.STRING))
+        properties[param["name"]] = prop
+        if param.get("required", True):
+            required.append(param["name"])
+    return types.FunctionDeclaration(
+        name=schema["name"],
+        description=schema["description"],
+        parameters=types.Schema(type=types.Type.OBJECT, properties=properties, required=required)
+        if properties
+        else None,
+    )
+
+
+class ToolboxPool:
+    """One shared async toolbox client per server URL, with keep-alive pooling and reconnects.
+
+    Use `get_toolbox_pool(url)` rather than constructing pools directly so that
+    all agents in the process share the same connections.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        manifest_dir: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        keepalive_seconds: float = DEFAULT_KEEPALIVE_SECONDS,
+        request_timeout_seconds: float = DEFAULT_REQUEST_TIMEOUT_SECONDS,
+    ):
+        self.url = url
+        self.manifest_dir = manifest_dir or os.environ.get("TOOLBOX_MANIFEST_DIR", DEFAULT_MANIFEST_DIR)
+        self.max_connections = max_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.request_timeout_seconds = request_timeout_seconds
+        self.backoff = Backoff()
+        # aiohttp sessions are bound to the event loop that created them.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+        self._client = None
+        self._toolsets: dict[str, dict[str, Any]] = {}
+        self._load_locks: dict[str, asyncio.Lock] = {}
+
+    # --- Connection management -------------------------------------------------
+
+    def _bind_to_running_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._session = None
+            self._client = None
+            self._toolsets = {}
+            self._load_locks = {}
+
+    def _get_client(self):
+        import aiohttp
+        from toolbox_core import ToolboxClient
+
+        if self._client is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=self.keepalive_seconds)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout_seconds),
+            )
+            self._client = ToolboxClient(self.url, session=self._session)
+        return self._client
+
+    async def _reset(self) -> None:
+        """Drops the client and its loaded tools so the next call reconnects."""
+        session, self._session, self._client = self._session, None, None
+        self._toolsets = {}
+        if session is not None and not session.closed:
+            await session.close()
+
+    async def close(self) -> None:
+        if self._loop is asyncio.get_running_loop():
+            await self._reset()
+
+    # --- Toolsets ----------------------------------------------------------------
+
+    def _manifest_path(self, toolset_name: str) -> str:
+        url_key = hashlib.sha256(self.url.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.manifest_dir, f"{url_key}-{toolset_name}.json")
+
+    def cached_manifest(self, toolset_name: str) -> Optional[list[dict]]:
+        """Returns the last manifest seen for the toolset, or None."""
+        try:
+            with open(self._manifest_path(toolset_name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, toolset_name: str, manifest: list[dict]) -> None:
+        path = self._manifest_path(toolset_name)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not cache toolbox manifest at {path}: {e}")
+
+    async def load_toolset(self, toolset_name: str) -> dict[str, Any]:
+        """Loads a toolset from the server once per connection; returns tools by name.
+
+        Raises:
+            ToolboxUnavailableError: If the server cannot be reached.
+        """
+        self._bind_to_running_loop()
+        if toolset_name in self._toolsets:
+            return self._toolsets[toolset_name]
+        lock = self._load_locks.setdefault(toolset_name, asyncio.Lock())
+        async with lock:
+            if toolset_name in self._toolsets:
+                return self._toolsets[toolset_name]
+            if not self.backoff.ready():
+                raise ToolboxUnavailableError(f"Toolbox at {self.url} is unavailable; retrying later.")
+            started = time.perf_counter()
+            try:
+                tools = await self._get_client().load_toolset(toolset_name)
+            except Exception as e:
+                self.backoff.failed()
+                await self._reset()
+                logger.warning(f"Loading toolset '{toolset_name}' from {self.url} failed: {e}; "
+                               f"next attempt in {self.backoff.seconds_until_ready():.1f}s")
+                raise ToolboxUnavailableError(str(e)) from e
+            self.backoff.succeeded()
+            self._toolsets[toolset_name] = {tool._name: tool for tool in tools}
+            self._save_manifest(toolset_name, [_schema_to_dict(tool) for tool in tools])
+            logger.info(f"Loaded toolset '{toolset_name}' ({len(tools)} tools) in "
+                        f"{1000 * (time.perf_counter() - started):.0f} ms")
+            return self._toolsets[toolset_name]
+
+    async def invoke(self, toolset_name: str, tool_name: str, args: dict) -> Any:
+        """Invokes a tool, reconnecting with backoff if the connection fails."""
+        import aiohttp
+
+        last_error: Optional[Exception] = None
+        for attempt in range(INVOKE_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(self.backoff.seconds_until_ready())
+            try:
+                tools = await self.load_toolset(toolset_name)
+            except ToolboxUnavailableError as e:
+                last_error = e
+                continue
+            if tool_name not in tools:
+                raise ValueError(f"Tool '{tool_name}' is not in toolset '{toolset_name}'.")
+            try:
+                return await tools[tool_name](**args)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                last_error = e
+                self.backoff.failed()
+                await self._reset()
+                logger.warning(f"Toolbox call {tool_name} failed ({e}); reconnecting.")
+        raise ToolboxUnavailableError(f"Toolbox call {tool_name} failed after {INVOKE_ATTEMPTS} attempts: {last_error}")
+
+
+_pools: dict[str, ToolboxPool] = {}
+
+
+def get_toolbox_pool(url: Optional[str] = None) -> ToolboxPool:
+    """Returns the process-wide pool for a toolbox URL (TOOLBOX_URL by default)."""
+    url = url or os.environ.get("TOOLBOX_URL", DEFAULT_TOOLBOX_URL)
+    if url not in _pools:
+        _pools[url] = ToolboxPool(url)
+    return _pools[url]
+
+
+class ToolboxTool(BaseTool):
+    """A toolbox tool declared from its manifest and invoked through its toolset."""
+
+    def __init__(self, toolset: "PooledToolboxToolset", schema: dict):
+        super().__init__(name=schema["name"], description=schema["description"])
+        self.toolset = toolset
+        self.schema = schema
+
+    def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
+        return _declaration_from_dict(self.schema)
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        try:
+            result = await self.toolset.call(self.name, args)
+        except ToolboxUnavailableError as e:
+            return {"status": "error", "error_message": f"The database tool is currently unavailable: {e}"}
+        paging = self.toolset.result_paging
+        if paging is not None and paging.applies_to(self.name):
+            return paging.first_page(self.name, result, tool_context)
+        return result
+
+
+class PooledToolboxToolset(BaseToolset):
+    """Toolbox toolset that loads lazily, caches its manifest and shares a pooled client.
+
+    Args:
+        toolset_name: Name of the toolset defined in the toolbox tools.yaml.
+        url: Toolbox server URL; defaults to TOOLBOX_URL or http://127.0.0.1:7000.
+        tool_filter: Optional list of tool names to expose.
+        result_cache: Optional cache of tool results with per-tool policies.
+        result_paging: Optional paging of large tabular results; adds a
+            `read_result_page` tool to the toolset.
+    """
+
+    def __init__(
+        self,
+        toolset_name: str,
+        url: Optional[str] = None,
+        tool_filter: Optional[list[str]] = None,
+        result_cache: Optional[ToolResultCache] = None,
+        result_paging: Optional[ResultPaging] = None,
+    ):
+        super().__init__(tool_filter=tool_filter)
+        self.toolset_name = toolset_name
+        self.url = url
+        self.result_cache = result_cache
+        self.result_paging = result_paging
+        # Tools built from the live toolset, reused until the pool reloads it.
+        self._tools: list[BaseTool] = []
+        self._tools_source: Optional[dict] = None
+
+    @property
+    def pool(self) -> ToolboxPool:
+        return get_toolbox_pool(self.url)
+
+    def _make_tool(self, schema: dict) -> BaseTool:
+        return ToolboxTool(self, schema)
+
+    async def call(self, tool_name: str, args: dict, agent_name: Optional[str] = None) -> Any:
+        """Invokes a tool of this toolset directly, going through the result cache.
+
+        Calls made by a model are recorded by the agent's tool callbacks; pass
+        `agent_name` to record a direct call in the tool metrics under that agent.
+
+        Raises:
+            ToolboxUnavailableError: If the toolbox server cannot be reached.
+        """
+        if agent_name is None:
+            return await self._call(tool_name, args)
+        with tool_metrics.measure(agent_name, tool_name, args) as record:
+            record.response = await self._call(tool_name, args)
+        return record.response
+
+    async def _call(self, tool_name: str, args: dict) -> Any:
+        if self.result_cache is None or os.environ.get("TOOLBOX_CACHE", "on").lower() == "off":
+            return await self.pool.invoke(self.toolset_name, tool_name, args)
+        return await self.result_cache.call(
+            tool_name, args, lambda: self.pool.invoke(self.toolset_name, tool_name, args)
+        )
+
+    async def get_tools(self, readonly_context: Optional[ReadonlyContext] = None) -> list[BaseTool]:
+        pool = self.pool
+        try:
+            loaded = await pool.load_toolset(self.toolset_name)
+            if loaded is not self._tools_source:
+                self._tools = [self._make_tool(_schema_to_dict(tool)) for tool in loaded.values()]
+                self._tools_source = loaded
+            tools = self._tools
+        except ToolboxUnavailableError:
+            # Declare the tools from the cached manifest; calls reconnect when the server is back.
+            manifest = pool.cached_manifest(self.toolset_name)
+            if manifest is None:
+                logger.warning(f"Toolset '{self.toolset_name}' is unavailable and has no cached manifest.")
+                return []
+            tools = [self._make_tool(schema) for schema in manifest]
+        tools = [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+        if self.result_paging is not None:
+            tools.append(self.result_paging.reader_tool)
+        return tools
+
+    async def close(self) -> None:
+        await self.pool.close()
@@ -0,0 +1,262 @@
+"""Token and latency accounting of model turns, attributed through the agent tree.
+
+`account_turns(root_agent)` adds model callbacks to every LLM agent in the tree
+and run callbacks to the root. Every model call records prompt, completion,
+cached and thinking tokens, time to first token and total latency, under the
+agent's path from the root (for example
+`news_distribution_agent/parallel_pipeline/bahasa_translator`).
+
+When the root agent finishes a run, a flame-graph-style breakdown is logged:
+each agent's subtree share of model time and tokens, so it is obvious which
+stage to optimize or move to a cheaper model. With TURN_ACCOUNTING_DIR set,
+each run is also written there as JSON and as folded stacks
+(`<invocation>.latency.folded`, `<invocation>.tokens.folded`) that
+flamegraph.pl or speedscope render directly. TURN_ACCOUNTING=off disables it.
+
+Agents created while a run is in progress (such as the release notes fan-out
+pipelines) are not in the tree at import time; pass them through
+`account_model_calls` and set their `parent_agent` to attribute them.
+"""
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+from .caching import TTLCache
+from .tool_metrics import add_callback
+
+logger = logging.getLogger(__name__)
+
+BAR_WIDTH = 24
+
+
+@dataclass
+class ModelCall:
+    """One model request/response of one agent."""
+    path: tuple[str, ...]
+    started: float
+    first_token_ms: Optional[float] = None
+    latency_ms: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    thinking_tokens: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class AgentTotals:
+    """Model usage of one agent, and of the agent together with everything below it."""
+    path: tuple[str, ...]
+    calls: int = 0
+    latency_ms: float = 0.0
+    first_token_ms: list[float] = field(default_factory=list)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    thinking_tokens: int = 0
+    errors: int = 0
+    subtree_latency_ms: float = 0.0
+    subtree_tokens: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens + self.thinking_tokens
+
+    def add(self, call: ModelCall) -> None:
+        self.calls += 1
+        self.latency_ms += call.latency_ms or 0.0
+        if call.first_token_ms is not None:
+            self.first_token_ms.append(call.first_token_ms)
+        self.prompt_tokens += call.prompt_tokens
+        self.completion_tokens += call.completion_tokens
+        self.cached_tokens += call.cached_tokens
+        self.thinking_tokens += call.thinking_tokens
+        self.errors += int(call.error is not None)
+
+
+@dataclass
+class RunReport:
+    """All model calls of one invocation, aggregated per agent path."""
+    invocation_id: str
+    wall_ms: float
+    calls: list[ModelCall]
+
+    def totals(self) -> dict[tuple[str, ...], AgentTotals]:
+        """Per-agent totals for every path, including agents without model calls of their own."""
+        totals: dict[tuple[str, ...], AgentTotals] = {}
+        for call in self.calls:
+            for depth in range(1, len(call.path) + 1):
+                prefix = call.path[:depth]
+                node = totals.setdefault(prefix, AgentTotals(prefix))
+                node.subtree_latency_ms += call.latency_ms or 0.0
+                node.subtree_tokens += call.prompt_tokens + call.completion_tokens + call.thinking_tokens
+            totals[call.path].add(call)
+        return totals
+
+    def folded(self, metric: str = "latency") -> str:
+        """Folded stacks ("a;b;c value" per line) of model latency (ms) or tokens per agent."""
+        lines = []
+        for path, node in sorted(self.totals().items()):
+            value = round(node.latency_ms) if metric == "latency" else node.tokens
+            if node.calls and value:
+                lines.append(f"{';'.join(path)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def render(self) -> str:
+        """Indented tree with each agent's share of the run's model time and tokens."""
+        totals = self.totals()
+        all_latency = sum(n.latency_ms for n in totals.values()) or 1.0
+        all_tokens = sum(n.tokens for n in totals.values())
+        prompt = sum(n.prompt_tokens for n in totals.values())
+        completion = sum(n.completion_tokens for n in totals.values())
+        lines = [
+            f"Run {self.invocation_id}: wall {self.wall_ms / 1000:.2f} s, {len(self.calls)} model calls, "
+            f"model time {all_latency / 1000:.2f} s, tokens {prompt} prompt + {completion} completion"
+        ]
+        width = max((2 * (len(path) - 1) + len(path[-1]) for path in totals), default=0)
+        for path in sorted(totals):
+            node = totals[path]
+            share = node.subtree_latency_ms / all_latency
+            bar = "#" * max(1, round(share * BAR_WIDTH)) if node.subtree_latency_ms else ""
+            label = "  " * (len(path) - 1) + path[-1]
+            line = (f"{label:<{width}} {bar:<{BAR_WIDTH}} {share:6.1%} {node.subtree_latency_ms / 1000:7.2f} s "
+                    f"{node.subtree_tokens:>8} tok")
+            if node.calls:
+                ttft = sum(node.first_token_ms) / len(node.first_token_ms) if node.first_token_ms else 0.0
+                line += (f"  [{node.calls} calls, {node.prompt_tokens} in / {node.completion_tokens} out"
+                         f"{f' / {node.thinking_tokens} thinking' if node.thinking_tokens else ''}"
+                         f"{f' ({node.cached_tokens} cached)' if node.cached_tokens else ''}, "
+                         f"ttft {ttft:.0f} ms{f', {node.errors} errors' if node.errors else ''}]")
+            lines.append(line)
+        if not all_tokens and self.calls:
+            lines.append("(the model reported no token usage)")
+        return "\n".join(lines)
+
+
+def agent_path(agent) -> tuple[str, ...]:
+    names = []
+    while agent is not None:
+        names.append(agent.name)
+        agent = agent.parent_agent
+    return tuple(reversed(names))
+
+
+class TurnAccounting:
+    """Collects model-call records from agent callbacks and builds per-run reports."""
+
+    def __init__(self, max_runs: int = 256, output_dir: Optional[str] = None):
+        self._pending: dict[tuple[str, tuple[str, ...]], ModelCall] = {}
+        self._calls: dict[str, list[ModelCall]] = {}
+        self._run_started: dict[str, float] = {}
+        self.reports = TTLCache(max_entries=max_runs)
+        self.output_dir = output_dir
+
+    # --- Model callbacks ---------------------------------------------------------
+
+    def before_model(self, callback_context, llm_request) -> None:
+        path = agent_path(callback_context.get_invocation_context().agent)
+        call = ModelCall(path, time.perf_counter())
+        self._pending[(callback_context.invocation_id, path)] = call
+        self._calls.setdefault(callback_context.invocation_id, []).append(call)
+        return None
+
+    def after_model(self, callback_context, llm_response) -> None:
+        path = agent_path(callback_context.get_invocation_context().agent)
+        key = (callback_context.invocation_id, path)
+        call = self._pending.get(key)
+        if call is None:
+            return None
+        elapsed_ms = 1000 * (time.perf_counter() - call.started)
+        if call.first_token_ms is None:
+            call.first_token_ms = elapsed_ms
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            # Streaming chunks carry cumulative usage; the last one wins.
+            call.prompt_tokens = usage.prompt_token_count or call.prompt_tokens
+            call.completion_tokens = usage.candidates_token_count or call.completion_tokens
+            call.cached_tokens = usage.cached_content_token_count or call.cached_tokens
+            call.thinking_tokens = usage.thoughts_token_count or call.thinking_tokens
+        if llm_response.error_code:
+            call.error = str(llm_response.error_code)
+        if not llm_response.partial:
+            call.latency_ms = elapsed_ms
+            self._pending.pop(key, None)
+        return None
+
+    def on_model_error(self, callback_context, llm_request, error: Exception) -> None:
+        path = agent_path(callback_context.get_invocation_context().agent)
+        call = self._pending.pop((callback_context.invocation_id, path), None)
+        if call is not None:
+            call.latency_ms = 1000 * (time.perf_counter() - call.started)
+            call.error = type(error).__name__
+        return None
+
+    # --- Run callbacks (root agent) ----------------------------------------------
+
+    def before_run(self, callback_context) -> None:
+        self._run_started[callback_context.invocation_id] = time.perf_counter()
+        return None
+
+    def after_run(self, callback_context) -> None:
+        invocation_id = callback_context.invocation_id
+        started = self._run_started.pop(invocation_id, None)
+        calls = self._calls.pop(invocation_id, [])
+        for key in [key for key in self._pending if key[0] == invocation_id]:
+            self._pending.pop(key)
+        wall_ms = 1000 * (time.perf_counter() - started) if started is not None else 0.0
+        report = RunReport(invocation_id, wall_ms, calls)
+        self.reports.set(invocation_id, report)
+        if calls:
+            logger.info("Model turn accounting\n" + report.render())
+            output_dir = self.output_dir or os.environ.get("TURN_ACCOUNTING_DIR")
+            if output_dir:
+                write_report(report, output_dir)
+        return None
+
+    def report(self, invocation_id: str) -> Optional[RunReport]:
+        return self.reports.get(invocation_id)
+
+
+def write_report(report: RunReport, output_dir: str) -> None:
+    """Writes a run as JSON plus latency and token folded-stack files."""
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, report.invocation_id)
+    with open(f"{base}.latency.folded", "w", encoding="utf-8") as f:
+        f.write(report.folded("latency"))
+    with open(f"{base}.tokens.folded", "w", encoding="utf-8") as f:
+        f.write(report.folded("tokens"))
+    with open(f"{base}.json", "w", encoding="utf-8") as f:
+        json.dump({"invocation_id": report.invocation_id, "wall_ms": report.wall_ms,
+                   "calls": [asdict(call) for call in report.calls]}, f, indent=2)
+
+
+def account_model_calls(agent, accounting: Optional[TurnAccounting] = None):
+    """Adds the model-call callbacks to every LLM agent in the tree; returns the agent."""
+    if os.environ.get("TURN_ACCOUNTING", "on").lower() == "off":
+        return agent
+    accounting = accounting or turn_accounting
+    if hasattr(agent, "before_model_callback"):
+        add_callback(agent, "before_model_callback", accounting.before_model)
+        add_callback(agent, "after_model_callback", accounting.after_model)
+        add_callback(agent, "on_model_error_callback", accounting.on_model_error)
+    for sub_agent in agent.sub_agents:
+        account_model_calls(sub_agent, accounting)
+    return agent
+
+
+def account_turns(root_agent, accounting: Optional[TurnAccounting] = None):
+    """Accounts every model call below `root_agent` and reports each run when it ends."""
+    if os.environ.get("TURN_ACCOUNTING", "on").lower() == "off":
+        return root_agent
+    accounting = accounting or turn_accounting
+    account_model_calls(root_agent, accounting)
+    add_callback(root_agent, "before_agent_callback", accounting.before_run)
+    add_callback(root_agent, "after_agent_callback", accounting.after_run)
+    return root_agent
+
+
+# Process-wide accounting used by all agents.
+turn_accounting = TurnAccounting()
@@ -0,0 +1,4 @@
+"""Offline load and latency benchmarks for the agent projects.
+
+Run them from the repository root, for example `python -m benchmarks.toolbox_load`.
+"""
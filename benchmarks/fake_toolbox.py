@@ -0,0 +1,351 @@
+"""Offline stand-in for the MCP Toolbox for Databases server.
+
+Serves the `my_first_toolset` (hotels) and `my_bq_toolset` (release notes)
+toolsets from the project instructions, running the tool statements against a
+SQLite database seeded with synthetic data. It speaks the same HTTP protocols as
+the real `toolbox` binary: MCP JSON-RPC under /mcp/ (used by current
+toolbox-core) and the older /api/toolset + /api/tool/<name>/invoke endpoints.
+
+Run it on the port the agents expect:
+
+    python -m benchmarks.fake_toolbox --port 7000 --latency-ms 40 --jitter-ms 20
+
+or in-process from benchmarks and tests:
+
+    async with FakeToolboxServer(port=0, latency_ms=20) as server:
+        os.environ["TOOLBOX_URL"] = server.url
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+SERVER_VERSION = "0.0.0-fake"
+CITIES = ["Basel", "Zurich", "Geneva", "Bern", "Lucerne", "Lugano", "Lausanne", "Interlaken", "Montreux", "Zermatt"]
+HOTEL_WORDS = ["Grand", "Park", "Lake", "Alpine", "Royal", "City", "Garden", "Palace", "Central", "Boutique"]
+HOTEL_KINDS = ["Hotel", "Inn", "Suites", "Resort", "Lodge"]
+PRODUCTS = [
+    "BigQuery", "Cloud Run", "Cloud SQL", "Compute Engine", "Vertex AI", "Cloud Storage", "GKE",
+    "Cloud Functions", "Pub/Sub", "Dataflow", "Spanner", "AlloyDB", "Looker", "Cloud Build", "Firestore",
+]
+NOTE_TYPES = ["FEATURE", "FIX", "CHANGE", "ISSUE", "DEPRECATION", "ANNOUNCEMENT"]
+
+
+@dataclass(frozen=True)
+class FakeTool:
+    name: str
+    description: str
+    parameters: tuple[tuple[str, str, str], ...]  # (name, type, description)
+    statement: str
+
+
+# The statements of instructions.txt, translated to SQLite (ILIKE -> LIKE, which is
+# case-insensitive for ASCII in SQLite; CURRENT_DATE() -> DATE('now')).
+TOOLS = {
+    "search-hotels-by-name": FakeTool(
+        "search-hotels-by-name",
+        "Search for hotels based on name.",
+        (("name", "string", "The name of the hotel."),),
+        "SELECT * FROM hotels WHERE name LIKE '%' || ?1 || '%'",
+    ),
+    "search-hotels-by-location": FakeTool(
+        "search-hotels-by-location",
+        "Search for hotels based on location.",
+        (("location", "string", "The location of the hotel."),),
+        "SELECT * FROM hotels WHERE location LIKE '%' || ?1 || '%'",
+    ),
+    "search_release_notes_bq": FakeTool(
+        "search_release_notes_bq",
+        "Use this tool to get information on Google Cloud Release Notes.",
+        (),
+        "SELECT release_note_type, product_name, product_version_name, description FROM release_notes "
+        "WHERE DATE(published_at) = DATE('now') ORDER BY release_note_type, product_name",
+    ),
+}
+TOOLSETS = {
+    "my_first_toolset": ["search-hotels-by-name", "search-hotels-by-location"],
+    "my_bq_toolset": ["search_release_notes_bq"],
+}
+
+
+def seed_database(path: str, hotels: int = 500, release_notes: int = 120, seed: int = 0) -> None:
+    """Creates the hotels and release_notes tables filled with synthetic rows."""
+    rng = random.Random(seed)
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    with sqlite3.connect(path) as db:
+        db.executescript(
+            """
+            DROP TABLE IF EXISTS hotels;
+            DROP TABLE IF EXISTS release_notes;
+            CREATE TABLE hotels (
+                id INTEGER PRIMARY KEY, name TEXT, location TEXT, price_tier TEXT,
+                checkin_date TEXT, checkout_date TEXT, booked INTEGER
+            );
+            CREATE TABLE release_notes (
+                release_note_type TEXT, product_name TEXT, product_version_name TEXT,
+                description TEXT, published_at TEXT
+            );
+            """
+        )
+        db.executemany(
+            "INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    i,
+                    f"{rng.choice(HOTEL_WORDS)} {rng.choice(HOTEL_WORDS)} {rng.choice(HOTEL_KINDS)} {i}",
+                    rng.choice(CITIES),
+                    rng.choice(["Midscale", "Upscale", "Luxury", "Upper Midscale", "Economy"]),
+                    str(today + datetime.timedelta(days=rng.randint(0, 30))),
+                    str(today + datetime.timedelta(days=rng.randint(31, 40))),
+                    0,
+                )
+                for i in range(1, hotels + 1)
+            ],
+        )
+        notes = []
+        for i in range(release_notes):
+            # About two thirds are published today, the rest on earlier days.
+            days_ago = 0 if rng.random() < 0.66 else rng.randint(1, 30)
+            product = rng.choice(PRODUCTS)
+            notes.append((
+                rng.choice(NOTE_TYPES),
+                product,
+                None if rng.random() < 0.7 else f"{product} {rng.randint(1, 9)}.{rng.randint(0, 20)}",
+                f"{product}: synthetic release note {i}. " + " ".join(rng.choice(HOTEL_WORDS).lower() for _ in range(30)),
+                str(today - datetime.timedelta(days=days_ago)),
+            ))
+        db.executemany("INSERT INTO release_notes VALUES (?, ?, ?, ?, ?)", notes)
+
+
+class FakeToolboxServer:
+    """aiohttp server emulating the toolbox HTTP API on top of SQLite.
+
+    Args:
+        host, port: Listen address; port 0 picks a free port (see `url`).
+        latency_ms, jitter_ms: Injected delay per tool call, uniformly in
+            [latency_ms - jitter_ms, latency_ms + jitter_ms].
+        database: SQLite file to use; a seeded temporary file by default.
+        hotels, release_notes, seed: Size and seed of the synthetic data.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 7000,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        database: Optional[str] = None,
+        hotels: int = 500,
+        release_notes: int = 120,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._owns_database = database is None
+        self.database = database or os.path.join(tempfile.mkdtemp(prefix="fake-toolbox-"), "toolbox.db")
+        if self._owns_database or not os.path.exists(self.database):
+            seed_database(self.database, hotels, release_notes, seed)
+        self.calls: dict[str, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    # --- Lifecycle ---------------------------------------------------------------
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/mcp", self._handle_mcp)
+        app.router.add_post("/mcp/", self._handle_mcp)
+        app.router.add_post("/mcp/{toolset}", self._handle_mcp)
+        app.router.add_get("/api/toolset/", self._handle_rest_toolset)
+        app.router.add_get("/api/toolset/{toolset}", self._handle_rest_toolset)
+        app.router.add_get("/api/tool/{tool}", self._handle_rest_tool)
+        app.router.add_post("/api/tool/{tool}/invoke", self._handle_rest_invoke)
+        return app
+
+    async def start(self) -> "FakeToolboxServer":
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"Fake toolbox listening on {self.url} (database {self.database})")
+        return self
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeToolboxServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    # --- Tool execution ----------------------------------------------------------
+
+    def _query(self, tool: FakeTool, args: dict) -> list[dict]:
+        values = [args.get(name) for name, _, _ in tool.parameters]
+        with sqlite3.connect(self.database) as db:
+            db.row_factory = sqlite3.Row
+            return [dict(row) for row in db.execute(tool.statement, values)]
+
+    async def run_tool(self, name: str, args: dict) -> list[dict]:
+        tool = TOOLS[name]
+        missing = [p for p, _, _ in tool.parameters if p not in args]
+        if missing:
+            raise ValueError(f"missing parameters: {missing}")
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_ms or self.jitter_ms:
+            delay = random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            await asyncio.sleep(max(0.0, delay) / 1000)
+        return await asyncio.to_thread(self._query, tool, args)
+
+    @staticmethod
+    def _tools_in(toolset: Optional[str]) -> list[FakeTool]:
+        if not toolset:
+            return list(TOOLS.values())
+        if toolset not in TOOLSETS:
+            raise web.HTTPNotFound(text=f"toolset {toolset} does not exist")
+        return [TOOLS[name] for name in TOOLSETS[toolset]]
+
+    # --- MCP JSON-RPC ------------------------------------------------------------
+
+    @staticmethod
+    def _mcp_tool(tool: FakeTool) -> dict:
+        return {
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": {
+                "type": "object",
+                "properties": {name: {"type": kind, "description": desc} for name, kind, desc in tool.parameters},
+                "required": [name for name, _, _ in tool.parameters],
+            },
+        }
+
+    async def _handle_mcp(self, request: web.Request) -> web.Response:
+        message = await request.json()
+        method = message.get("method", "")
+        if "id" not in message:
+            # Notifications (e.g. notifications/initialized) get no body.
+            return web.Response(status=202)
+        params = message.get("params") or {}
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": params.get("protocolVersion"),
+                    "capabilities": {"tools": {"listChanged": False}},
+                    "serverInfo": {"name": "fake-toolbox", "version": SERVER_VERSION},
+                }
+            elif method == "tools/list":
+                tools = self._tools_in(request.match_info.get("toolset"))
+                result = {
+                    "tools": [self._mcp_tool(t) for t in tools],
+                    "_meta": {"serverInfo": {"name": "fake-toolbox", "version": SERVER_VERSION}},
+                }
+            elif method == "tools/call":
+                rows = await self.run_tool(params["name"], params.get("arguments") or {})
+                result = {
+                    "content": [{"type": "text", "text": json.dumps(row, default=str)} for row in rows],
+                    "isError": False,
+                }
+            else:
+                return web.json_response({
+                    "jsonrpc": "2.0", "id": message["id"],
+                    "error": {"code": -32601, "message": f"method not found: {method}"},
+                })
+        except (KeyError, ValueError, sqlite3.Error) as e:
+            result = {"content": [{"type": "text", "text": str(e)}], "isError": True}
+        return web.json_response({"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+    # --- Legacy REST API ---------------------------------------------------------
+
+    @staticmethod
+    def _rest_manifest(tools: list[FakeTool]) -> dict:
+        return {
+            "serverVersion": SERVER_VERSION,
+            "tools": {
+                t.name: {
+                    "description": t.description,
+                    "parameters": [
+                        {"name": name, "type": kind, "description": desc} for name, kind, desc in t.parameters
+                    ],
+                }
+                for t in tools
+            },
+        }
+
+    async def _handle_rest_toolset(self, request: web.Request) -> web.Response:
+        return web.json_response(self._rest_manifest(self._tools_in(request.match_info.get("toolset"))))
+
+    async def _handle_rest_tool(self, request: web.Request) -> web.Response:
+        name = request.match_info["tool"]
+        if name not in TOOLS:
+            raise web.HTTPNotFound(text=f"tool {name} does not exist")
+        return web.json_response(self._rest_manifest([TOOLS[name]]))
+
+    async def _handle_rest_invoke(self, request: web.Request) -> web.Response:
+        name = request.match_info["tool"]
+        if name not in TOOLS:
+            raise web.HTTPNotFound(text=f"tool {name} does not exist")
+        try:
+            rows = await self.run_tool(name, await request.json())
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"result": json.dumps(rows, default=str)})
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = FakeToolboxServer(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        database=args.database,
+        hotels=args.hotels,
+        release_notes=args.release_notes,
+        seed=args.seed,
+    )
+    async with server:
+        print(f"Fake toolbox serving {', '.join(TOOLSETS)} on {server.url}")
+        while True:
+            await asyncio.sleep(3600)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline fake of the MCP toolbox server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean injected latency per tool call.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter around the mean latency.")
+    parser.add_argument("--database", help="SQLite file to serve; seeded if it does not exist.")
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--release-notes", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
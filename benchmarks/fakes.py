@@ -0,0 +1,423 @@
+"""Offline stand-ins for the services the agents depend on, for the benchmarks.
+
+- `ScriptedModel` ("fake-*" models): a deterministic model that plays a script
+  of tool calls and texts, so agent pipelines run without Gemini.
+- `FixtureFeedServer`: a fixture RSS feed and its article pages, served over
+  HTTP from localhost.
+- `FilesystemStorageClient`: the part of the Cloud Storage client the agents
+  use (bucket -> blob -> upload), storing objects in a local directory.
+- `FakeTasksService`: the Google Tasks API calls the tasks agent makes
+  (list/insert/get/update), kept in memory.
+
+Toolbox-backed agents use `benchmarks.fake_toolbox.FakeToolboxServer`.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncGenerator, Callable, ClassVar, Optional, Union
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import Field
+
+FAKE_MODEL = "fake-scripted"
+WORDS = (
+    "cloud release region update service network storage latency model agent pipeline feature "
+    "support preview general availability security policy quota database cluster region zone "
+    "market city council weather report travel hotel flight museum harbour festival season"
+).split()
+
+
+# --- Scripted model --------------------------------------------------------------
+
+@dataclass
+class Turn:
+    """What a script step sees of the model request it answers."""
+    request: LlmRequest
+    step: int
+    user_text: str
+    # Responses to the tool calls of the previous step, by tool name.
+    tool_results: dict[str, list[Any]] = field(default_factory=dict)
+
+    def context_text(self) -> str:
+        """All text the model was sent: instruction, conversation and tool results."""
+        texts = [str(self.request.config.system_instruction or "")] if self.request.config else []
+        for content in self.request.contents or []:
+            for part in content.parts or []:
+                if part.text and not part.thought:
+                    texts.append(part.text)
+                elif part.function_response:
+                    texts.append(json.dumps(part.function_response.response, default=str))
+        return "\n".join(texts)
+
+
+# A step returns text, or the tool calls to make (in parallel) in this turn.
+StepResult = Union[str, list[types.FunctionCall]]
+Step = Union[str, list[types.FunctionCall], Callable[[Turn], StepResult]]
+
+
+def call(name: str, **args) -> list[types.FunctionCall]:
+    """A step calling one tool with fixed arguments."""
+    return [types.FunctionCall(name=name, args=args)]
+
+
+def calls(name: str, args_list: list[dict]) -> list[types.FunctionCall]:
+    return [types.FunctionCall(name=name, args=args) for args in args_list]
+
+
+def words_of(text: str, count: int) -> str:
+    return " ".join(re.findall(r"\w[\w'-]*", text)[:count])
+
+
+def summarize(prefix: str = "Summary:", words: int = 120) -> Callable[[Turn], str]:
+    """A text step that condenses what the model was sent into `words` words."""
+    return lambda turn: f"{prefix} {words_of(turn.context_text()[-20000:], words)}"
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class ScriptedModel(BaseLlm):
+    """Deterministic stand-in model that plays `script` one step per model call.
+
+    The step is the number of tool-call rounds since the last user message, so a
+    script reads like the conversation it produces: first call these tools, then
+    with their results call those, then answer. Once the script is exhausted the
+    last step repeats, which lets a final step page through results. Responses
+    carry estimated token usage, and streaming requests get partial chunks.
+
+    Attributes:
+        script: The steps; an agent without one summarizes what it was sent.
+        latency_ms: Delay before each response (`default_latency_ms` if unset).
+        chunk_chars: Size of partial chunks when streaming.
+        chunk_latency_ms: Delay before each partial chunk (`default_chunk_latency_ms`
+            if unset), which simulates the generation speed when streaming.
+    """
+
+    model: str = FAKE_MODEL
+    script: list[Any] = Field(default_factory=list)
+    latency_ms: Optional[float] = None
+    chunk_chars: int = 200
+    chunk_latency_ms: Optional[float] = None
+
+    # Used by instances the model registry creates from a "fake-*" name.
+    default_latency_ms: ClassVar[float] = 0.0
+    default_chunk_latency_ms: ClassVar[float] = 0.0
+    # Model calls answered by all instances.
+    calls: ClassVar[int] = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    def next_turn(self, llm_request: LlmRequest) -> Turn:
+        step, tool_results, user_text = 0, {}, ""
+        for content in reversed(llm_request.contents or []):
+            parts = content.parts or []
+            if content.role == "model" and any(part.function_call for part in parts):
+                step += 1
+            elif content.role == "user" and any(part.function_response for part in parts):
+                if step == 0:
+                    for part in parts:
+                        if part.function_response:
+                            tool_results.setdefault(part.function_response.name, []).append(
+                                part.function_response.response
+                            )
+            elif content.role == "user" and any(part.text for part in parts):
+                user_text = "".join(part.text for part in parts if part.text)
+                break
+        return Turn(llm_request, step, user_text, tool_results)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        ScriptedModel.calls += 1
+        latency_ms = self.default_latency_ms if self.latency_ms is None else self.latency_ms
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        turn = self.next_turn(llm_request)
+        script = self.script or [summarize()]
+        step = script[min(turn.step, len(script) - 1)]
+        result = step(turn) if callable(step) else step
+        prompt_tokens = _estimate_tokens(turn.context_text())
+
+        if not isinstance(result, str):
+            usage = types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens, candidates_token_count=8 * len(result)
+            )
+            parts = [types.Part(function_call=function_call) for function_call in result]
+            yield LlmResponse(content=types.Content(role="model", parts=parts), usage_metadata=usage)
+            return
+
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens, candidates_token_count=_estimate_tokens(result)
+        )
+        chunk_latency_ms = self.default_chunk_latency_ms if self.chunk_latency_ms is None else self.chunk_latency_ms
+        if stream:
+            for start in range(0, len(result), self.chunk_chars):
+                chunk = result[start:start + self.chunk_chars]
+                if chunk_latency_ms:
+                    await asyncio.sleep(chunk_latency_ms / 1000)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]), partial=True
+                )
+        elif chunk_latency_ms:
+            # The whole response takes as long to generate as its streamed chunks.
+            await asyncio.sleep(chunk_latency_ms * -(-len(result) // self.chunk_chars) / 1000)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=result)]),
+            usage_metadata=usage,
+            turn_complete=True,
+        )
+
+
+def use_scripted_models(agent, scripts: dict[str, list], latency_ms: Optional[float] = None) -> None:
+    """Gives every agent in the tree that has a model a `ScriptedModel` with its script.
+
+    Agents whose model is a plain name field (such as the release notes fan-out
+    agent, which creates LLM agents per run) get the registry name instead.
+    """
+    if isinstance(agent, LlmAgent):
+        agent.model = ScriptedModel(script=scripts.get(agent.name, []), latency_ms=latency_ms)
+    elif hasattr(agent, "model"):
+        agent.model = FAKE_MODEL
+    for sub_agent in agent.sub_agents:
+        use_scripted_models(sub_agent, scripts, latency_ms)
+
+
+# --- HTTP feeds ------------------------------------------------------------------
+
+def fixture_text(rng: random.Random, words: int) -> str:
+    sentences, current = [], []
+    for _ in range(words):
+        current.append(rng.choice(WORDS))
+        if len(current) >= rng.randint(8, 18):
+            sentences.append(" ".join(current).capitalize() + ".")
+            current = []
+    if current:
+        sentences.append(" ".join(current).capitalize() + ".")
+    return " ".join(sentences)
+
+
+class FixtureFeedServer:
+    """Serves /feed.xml (RSS 2.0) and the article pages it links to from localhost.
+
+    Runs in a daemon thread, so the agents' blocking `requests` calls work
+    whether or not ADK runs sync tools on the event loop.
+    """
+
+    def __init__(
+        self,
+        articles: int = 10,
+        article_words: int = 800,
+        latency_ms: float = 0.0,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        rng = random.Random(seed)
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self._pages = {
+            f"/articles/{index}.html": (
+                f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} {index}",
+                "\n".join(f"<p>{fixture_text(rng, 100)}</p>" for _ in range(max(1, article_words // 100))),
+            )
+            for index in range(articles)
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def feed_url(self) -> str:
+        return f"{self.url}/feed.xml"
+
+    def feed_xml(self) -> str:
+        items = "".join(
+            f"<item><title>{title}</title><link>{self.url}{path}</link>"
+            f"<guid>{self.url}{path}</guid><description>{title}</description></item>"
+            for path, (title, _) in self._pages.items()
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Fixture news</title><link>{self.url}/</link><description>Benchmark feed</description>"
+            f"{items}</channel></rss>"
+        )
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                if self.path == "/feed.xml":
+                    body, content_type = server.feed_xml(), "application/rss+xml; charset=utf-8"
+                elif self.path in server._pages:
+                    title, paragraphs = server._pages[self.path]
+                    body = (f"<html><head><title>{title}</title></head><body><nav>Home | World | Tech</nav>"
+                            f"<h1>{title}</h1>{paragraphs}<footer>Fixture news</footer></body></html>")
+                    content_type = "text/html; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FixtureFeedServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-feeds", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FixtureFeedServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+# --- Cloud Storage ---------------------------------------------------------------
+
+class FilesystemStorageClient:
+    """Cloud Storage client stand-in: gs://bucket/name is stored as root/bucket/name."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.uploads = 0
+
+    def bucket(self, name: str) -> "_Bucket":
+        return _Bucket(self, name)
+
+
+class _Bucket:
+    def __init__(self, client: FilesystemStorageClient, name: str):
+        self.client = client
+        self.name = name
+
+    def blob(self, name: str) -> "_Blob":
+        return _Blob(self, name)
+
+
+class _Blob:
+    def __init__(self, bucket: _Bucket, name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.client.root, bucket.name, name)
+
+    def upload_from_string(self, data: Union[bytes, str], content_type: Optional[str] = None) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "wb") as f:
+            f.write(data.encode("utf-8") if isinstance(data, str) else data)
+        self.bucket.client.uploads += 1
+
+    def download_as_bytes(self) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+
+# --- Google Tasks ----------------------------------------------------------------
+
+class _Request:
+    def __init__(self, service: "FakeTasksService", run: Callable[[], Any]):
+        self._service = service
+        self._run = run
+
+    def execute(self) -> Any:
+        if self._service.latency_ms:
+            time.sleep(self._service.latency_ms / 1000)
+        with self._service.lock:
+            self._service.requests += 1
+            return self._run()
+
+
+def _not_found(task: str):
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    return HttpError(httplib2.Response({"status": 404}), f"Task {task} not found".encode("utf-8"))
+
+
+class _TasksResource:
+    def __init__(self, service: "FakeTasksService"):
+        self._service = service
+
+    def list(self, tasklist: str, showCompleted: bool = True, showHidden: bool = False, maxResults: int = 20, **_):
+        def run():
+            items = [
+                dict(task) for task in self._service.lists.get(tasklist, {}).values()
+                if showCompleted or task["status"] != "completed"
+            ]
+            return {"kind": "tasks#tasks", "items": items[:maxResults]}
+
+        return _Request(self._service, run)
+
+    def insert(self, tasklist: str, body: dict, **_):
+        def run():
+            task = {"kind": "tasks#task", "id": uuid.uuid4().hex[:22], "status": "needsAction", **body}
+            self._service.lists.setdefault(tasklist, {})[task["id"]] = task
+            return dict(task)
+
+        return _Request(self._service, run)
+
+    def get(self, tasklist: str, task: str, **_):
+        def run():
+            found = self._service.lists.get(tasklist, {}).get(task)
+            if found is None:
+                raise _not_found(task)
+            return dict(found)
+
+        return _Request(self._service, run)
+
+    def update(self, tasklist: str, task: str, body: dict, **_):
+        def run():
+            found = self._service.lists.get(tasklist, {}).get(task)
+            if found is None:
+                raise _not_found(task)
+            found.update(body)
+            return dict(found)
+
+        return _Request(self._service, run)
+
+
+class FakeTasksService:
+    """In-memory Google Tasks API with the resource/request shape of the discovery client."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.lists: dict[str, dict[str, dict]] = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def tasks(self) -> _TasksResource:
+        return _TasksResource(self)
@@ -0,0 +1,186 @@
+"""Import-time profile of the agent projects, to catch cold-start regressions.
+
+Each project's `agent` module is imported in a fresh interpreter with
+`python -X importtime`. The report lists the wall time of the import, the
+cumulative time of each module the repository's code imports directly (where
+deferring an import helps), and the slowest modules overall:
+
+    python -m benchmarks.import_profile                       # all projects
+    python -m benchmarks.import_profile 4-renovation-agent --top 25
+    python -m benchmarks.import_profile --save-baseline import_baseline.json
+    python -m benchmarks.import_profile --baseline import_baseline.json --tolerance 0.25
+
+With --baseline the exit status is 1 if any project got slower than its
+baseline by more than the tolerance (and by more than --min-regression-ms, to
+ignore noise on fast imports). Baselines are machine-specific; record them on
+the machine that runs the check.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+_CHILD = (
+    "import importlib, sys, time\n"
+    "sys.path.insert(0, {root!r})\n"
+    "started = time.perf_counter()\n"
+    "importlib.import_module({module!r})\n"
+    "print(f'WALL_SECONDS {{time.perf_counter() - started}}')\n"
+)
+
+
+@dataclass
+class ImportProfile:
+    project: str
+    wall_ms: Optional[float] = None
+    error: Optional[str] = None
+    # module -> (self ms, cumulative ms)
+    modules: dict[str, tuple[float, float]] = field(default_factory=dict)
+    # Modules imported directly by code in this repository -> cumulative ms.
+    first_party_imports: dict[str, float] = field(default_factory=dict)
+
+    def top(self, count: int) -> list[tuple[str, float, float]]:
+        ranked = sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True)
+        return [(name, self_ms, cumulative_ms) for name, (self_ms, cumulative_ms) in ranked[:count]]
+
+    def top_imports(self, count: int) -> list[tuple[str, float]]:
+        """What the repository's own modules spend their import time on."""
+        return sorted(self.first_party_imports.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def _is_first_party(module: str) -> bool:
+    top = module.split(".", 1)[0]
+    return top in ("adk_common", "benchmarks") or top.split("-", 1)[0].isdigit()
+
+
+def discover_projects() -> list[str]:
+    return sorted(
+        (name for name in os.listdir(REPO_ROOT) if os.path.isfile(os.path.join(REPO_ROOT, name, "agent.py"))),
+        key=lambda name: (int(name.split("-", 1)[0]) if name.split("-", 1)[0].isdigit() else 1000, name),
+    )
+
+
+def profile_project(project: str, python: str = sys.executable) -> ImportProfile:
+    """Imports `<project>.agent` in a fresh interpreter and parses its import-time log."""
+    profile = ImportProfile(project)
+    code = _CHILD.format(root=REPO_ROOT, module=f"{project}.agent")
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=300,
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("WALL_SECONDS "):
+            profile.wall_ms = round(1000 * float(line.split()[1]), 1)
+    # -X importtime prints a module after everything it imported, indented two
+    # spaces deeper, so a stack of pending lines rebuilds the import tree.
+    pending: list[tuple[int, str, float]] = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        cumulative_ms = int(cumulative_us) / 1000
+        profile.modules[name] = (int(self_us) / 1000, cumulative_ms)
+        while pending and pending[-1][0] > depth:
+            _, child, child_ms = pending.pop()
+            if _is_first_party(name) and not _is_first_party(child):
+                profile.first_party_imports[child] = child_ms
+        pending.append((depth, name, cumulative_ms))
+    if completed.returncode != 0:
+        errors = [line for line in completed.stderr.splitlines() if not line.startswith("import time:")]
+        profile.error = errors[-1] if errors else f"exit status {completed.returncode}"
+    return profile
+
+
+def print_report(profiles: list[ImportProfile], top: int) -> None:
+    for profile in profiles:
+        if profile.error:
+            print(f"{profile.project}: FAILED ({profile.error})")
+            continue
+        print(f"{profile.project}: {profile.wall_ms:.1f} ms")
+        for name, cumulative in profile.top_imports(top):
+            print(f"    {cumulative:9.1f} ms  {name}")
+    print()
+    print("Slowest modules overall (cumulative ms, self ms):")
+    slowest: dict[str, tuple[float, float]] = {}
+    for profile in profiles:
+        for name, self_ms, cumulative_ms in profile.top(top):
+            if cumulative_ms > slowest.get(name, (0.0, 0.0))[0]:
+                slowest[name] = (cumulative_ms, self_ms)
+    for name, (cumulative_ms, self_ms) in sorted(slowest.items(), key=lambda i: i[1][0], reverse=True)[:top]:
+        print(f"    {cumulative_ms:9.1f} {self_ms:9.1f}  {name}")
+
+
+def check_regressions(
+    profiles: list[ImportProfile], baseline: dict, tolerance: float, min_regression_ms: float
+) -> list[str]:
+    regressions = []
+    for profile in profiles:
+        expected = baseline.get(profile.project)
+        if expected is None or profile.wall_ms is None:
+            continue
+        allowed = max(expected * (1 + tolerance), expected + min_regression_ms)
+        if profile.wall_ms > allowed:
+            regressions.append(
+                f"{profile.project}: {profile.wall_ms:.1f} ms, baseline {expected:.1f} ms (allowed {allowed:.1f} ms)"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile the import time of each agent project.")
+    parser.add_argument("projects", nargs="*", help="Project folders; all projects by default.")
+    parser.add_argument("--top", type=int, default=10, help="Modules to list per project.")
+    parser.add_argument("--repeat", type=int, default=3, help="Imports per project; the fastest is kept.")
+    parser.add_argument("--json", help="Write the full profile to this file.")
+    parser.add_argument("--save-baseline", help="Write the per-project wall times to this file.")
+    parser.add_argument("--baseline", help="Fail if a project is slower than in this baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown.")
+    parser.add_argument("--min-regression-ms", type=float, default=50.0, help="Ignore smaller slowdowns.")
+    args = parser.parse_args(argv)
+
+    profiles = []
+    for project in args.projects or discover_projects():
+        runs = [profile_project(project.rstrip("/")) for _ in range(max(1, args.repeat))]
+        # The fastest run is the least disturbed by disk cache and scheduling noise.
+        profiles.append(min(runs, key=lambda p: float("inf") if p.wall_ms is None else p.wall_ms))
+    print_report(profiles, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    p.project: {
+                        "wall_ms": p.wall_ms,
+                        "error": p.error,
+                        "imports": p.top_imports(args.top),
+                        "modules": p.top(args.top),
+                    }
+                    for p in profiles
+                },
+                f,
+                indent=2,
+            )
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({p.project: p.wall_ms for p in profiles if p.wall_ms is not None}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = check_regressions(profiles, json.load(f), args.tolerance, args.min_regression_ms)
+        if regressions:
+            print("\nImport time regressions:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,632 @@
+"""Offline end-to-end benchmark of the agent pipelines.
+
+Every pipeline runs through the real agent code and the ADK runner, with the
+outside world replaced by local stand-ins (see benchmarks/fakes.py):
+
+- Gemini by `ScriptedModel`, which plays a fixed script of tool calls and texts
+  per agent, with optional injected latency,
+- RSS feeds and article pages by a fixture HTTP server on localhost,
+- Cloud Storage by a directory, the Tasks API by an in-memory service,
+- the toolbox server by `benchmarks.fake_toolbox` (SQLite),
+- Vertex AI RAG by a local index built from fixture documents with the offline
+  hashing embedder.
+
+Each pipeline runs in its own interpreter, so imports and peak RSS are measured
+per pipeline:
+
+    python -m benchmarks.offline_suite                          # every pipeline
+    python -m benchmarks.offline_suite 9-news 10-release-notes-fanout --runs 50 --concurrency 4
+    python -m benchmarks.offline_suite --save-baseline offline_baseline.json
+    python -m benchmarks.offline_suite --baseline offline_baseline.json --tolerance 0.25
+
+A run is one conversation (one or more user messages). The report has runs per
+second, p50/p95/p99 run latency, model and tool calls per run and peak RSS.
+With --baseline the exit status is 1 if a pipeline's p95 latency or peak RSS
+grew, or its throughput dropped, by more than the tolerance (and by more than
+--min-regression-ms / --min-regression-mb). Baselines are machine-specific.
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional
+
+from google.adk.agents.run_config import RunConfig
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.models.registry import LLMRegistry
+from google.adk.runners import InMemoryRunner, Runner
+from google.genai import types
+
+from adk_common.memoize import agent_memo
+from adk_common.serving import RunnerPool
+from adk_common.streaming import TextStream, streaming_run_config
+from benchmarks.fakes import (
+    FakeTasksService,
+    FilesystemStorageClient,
+    FixtureFeedServer,
+    ScriptedModel,
+    call,
+    calls,
+    fixture_text,
+    summarize,
+    use_scripted_models,
+)
+from benchmarks.toolbox_load import _run_turns, percentiles
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS = [
+    "What should I pack for a week in Lisbon in spring?",
+    "Plan a three day trip to Kyoto with temples and food markets.",
+    "How do I get from the airport to the city centre in Singapore?",
+    "Which museums in Paris are free on the first Sunday?",
+    "What is the best time of year to visit Patagonia?",
+    "Suggest a family friendly itinerary for Copenhagen.",
+]
+CITIES = ["Basel", "Zurich", "Geneva", "Bern", "Lucerne", "Lugano"]
+
+
+@dataclass
+class Workload:
+    """An agent plus the conversations to run through it."""
+    agent: object
+    # One list of user messages per run.
+    conversations: list[list[str]]
+    # Request counters of the stand-in services, reported after the runs.
+    services: Callable[[], dict] = lambda: {}
+
+
+@dataclass
+class RunStats:
+    tool_calls: int = 0
+    errors: list[str] = field(default_factory=list)
+    # Time from each first message to the first text shown to the user.
+    first_text_ms: list[float] = field(default_factory=list)
+
+
+def _conversations(options, make: Callable[[random.Random, int], list[str]]) -> list[list[str]]:
+    rng = random.Random(options.seed)
+    return [make(rng, index) for index in range(options.runs + options.warmup)]
+
+
+def _load(project: str):
+    return importlib.import_module(f"{project}.agent")
+
+
+# --- Pipelines -------------------------------------------------------------------
+# Each one prepares its stand-ins and environment, imports the project's agent
+# and yields the workload. Environment variables are set before the import,
+# because some agents read them at import time.
+
+@contextlib.asynccontextmanager
+async def helpful_assistant(options, workdir: str) -> AsyncIterator[Workload]:
+    module = _load("1-helpful-assistant")
+    use_scripted_models(module.root_agent, {})
+    yield Workload(module.root_agent, _conversations(options, lambda rng, _: [rng.choice(QUESTIONS)]))
+
+
+@contextlib.asynccontextmanager
+async def travel_planner(options, workdir: str) -> AsyncIterator[Workload]:
+    module = _load("2-travel-planner-agent")
+    use_scripted_models(module.root_agent, {})
+    yield Workload(module.root_agent, _conversations(options, lambda rng, _: [rng.choice(QUESTIONS)]))
+
+
+def _itinerary(turn) -> list:
+    rng = random.Random(turn.user_text)
+    lines = [f"Trip plan: {turn.user_text}", ""]
+    for day in range(1, 8):
+        lines.append(f"Day {day}")
+        lines.extend(f"- {fixture_text(rng, 14)}" for _ in range(12))
+    return call("write_text_to_pdf_to_gcs", text_content="\n".join(lines))
+
+
+@contextlib.asynccontextmanager
+async def travel_planner_pdf(options, workdir: str) -> AsyncIterator[Workload]:
+    os.environ["GOOGLE_CLOUD_STORAGE_BUCKET"] = "bench-pdfs"
+    module = _load("3-travel-planner-pdf-agent")
+    storage = FilesystemStorageClient(os.path.join(workdir, "gcs"))
+    module.storage_client = lambda: storage
+    use_scripted_models(module.root_agent, {
+        "travel_planner_pdf_agent": [_itinerary, "Your trip plan has been written to a PDF."],
+    })
+    yield Workload(
+        module.root_agent,
+        _conversations(options, lambda rng, _: [rng.choice(QUESTIONS) + " Write it to a PDF."]),
+        lambda: {"gcs_uploads": storage.uploads},
+    )
+
+
+@contextlib.asynccontextmanager
+async def renovation(options, workdir: str) -> AsyncIterator[Workload]:
+    os.environ["STORAGE_BUCKET"] = "bench-proposals"
+    module = _load("4-renovation-agent")
+    storage = FilesystemStorageClient(os.path.join(workdir, "gcs"))
+    module.storage_client = lambda: storage
+    use_scripted_models(module.root_agent, {
+        "proposal_agent": [
+            lambda turn: call("update_proposal", field_updates={
+                "homeowner_name": turn.user_text.split(" for ")[-1].rstrip("."),
+                "contract_price": "$42,000.00",
+                "duration": "8 weeks",
+            }),
+            call("store_proposal_pdf"),
+            "The proposal document has been created and uploaded to the Cloud Storage bucket.",
+        ],
+    })
+    names = ["Ana Lima", "Kenji Sato", "Priya Nair", "Tom Weber"]
+    yield Workload(
+        module.root_agent,
+        _conversations(options, lambda rng, _: [f"Create a kitchen renovation proposal for {rng.choice(names)}."]),
+        lambda: {"gcs_uploads": storage.uploads},
+    )
+
+
+@contextlib.asynccontextmanager
+async def google_search(options, workdir: str) -> AsyncIterator[Workload]:
+    # The search cache wraps the model; the scripted model stands in for Gemini
+    # behind it, so cache hits and misses are part of the measurement.
+    os.environ["SEARCH_CACHE_DIR"] = os.path.join(workdir, "search")
+    module = _load("5-google-search-tool-agent")
+    agent = module.root_agent
+    answer = summarize("According to the search results:")
+    if hasattr(agent.model, "inner"):
+        agent.model.inner = ScriptedModel(script=[answer])
+    else:
+        use_scripted_models(agent, {})
+    # Skewed question mix, so repeats reach the cache at a realistic rate.
+    weights = [1 / (rank + 1) for rank in range(len(QUESTIONS))]
+    yield Workload(
+        agent,
+        _conversations(options, lambda rng, _: [rng.choices(QUESTIONS, weights)[0]]),
+        lambda: agent.model.stats() if hasattr(agent.model, "stats") else {},
+    )
+
+
+@contextlib.asynccontextmanager
+async def rag(options, workdir: str) -> AsyncIterator[Workload]:
+    index_dir = os.path.join(workdir, "rag_index")
+    documents = os.path.join(workdir, "documents")
+    os.makedirs(documents, exist_ok=True)
+    rng = random.Random(options.seed)
+    for index in range(options.documents):
+        with open(os.path.join(documents, f"doc_{index:03d}.txt"), "w", encoding="utf-8") as f:
+            f.write(fixture_text(rng, 1500))
+    os.environ.update(RAG_BACKEND="local", RAG_EMBEDDING_MODEL="hashing", RAG_LOCAL_INDEX_DIR=index_dir)
+    ingest = importlib.import_module("6-rag-engine-agent.ingest")
+    ingest.Ingestor(index_dir).ingest([documents])
+    module = _load("6-rag-engine-agent")
+    use_scripted_models(module.root_agent, {
+        "ask_rag_agent": [
+            lambda turn: call("retrieve_rag_documentation", query=turn.user_text),
+            summarize("Based on the documentation:"),
+        ],
+    })
+    yield Workload(
+        module.root_agent,
+        _conversations(options, lambda rng, _: [f"What does the documentation say about {fixture_text(rng, 6)}"]),
+    )
+
+
+@contextlib.asynccontextmanager
+async def _toolbox(options, workdir: str) -> AsyncIterator:
+    from benchmarks.fake_toolbox import FakeToolboxServer
+
+    os.environ["TOOLBOX_MANIFEST_DIR"] = os.path.join(workdir, "manifests")
+    server = FakeToolboxServer(
+        port=0, latency_ms=options.service_latency_ms, jitter_ms=0, seed=options.seed,
+        database=os.path.join(workdir, "toolbox.sqlite3"),
+    )
+    async with server:
+        os.environ["TOOLBOX_URL"] = server.url
+        yield server
+
+
+@contextlib.asynccontextmanager
+async def hotels(options, workdir: str) -> AsyncIterator[Workload]:
+    async with _toolbox(options, workdir) as server:
+        module = _load("7-bigquery-mcp-toolbox-agent")
+        use_scripted_models(module.root_agent, {
+            module.root_agent.name: [
+                lambda turn: call("search-hotels-by-location", location=turn.user_text.split()[-1].rstrip("?")),
+                summarize("Here are the hotels I found:"),
+            ],
+        })
+        yield Workload(
+            module.root_agent,
+            _conversations(options, lambda rng, _: [f"Find me a hotel in {rng.choice(CITIES)}"]),
+            lambda: {"toolbox_queries": sum(server.calls.values())},
+        )
+        await module.tools.close()
+
+
+@contextlib.asynccontextmanager
+async def google_tasks(options, workdir: str) -> AsyncIterator[Workload]:
+    module = _load("8-google-tasks-agent")
+    service = FakeTasksService(latency_ms=options.service_latency_ms)
+    module.get_tasks_service = lambda: service
+    use_scripted_models(module.root_agent, {
+        module.root_agent.name: [
+            lambda turn: call("add_task", description=turn.user_text.removeprefix("Add ").strip(".")),
+            call("list_tasks"),
+            call("complete_task", task_number=1),
+            "I added the task, listed your tasks and completed the first one.",
+        ],
+    })
+    chores = ["Buy milk", "Book dentist", "Renew passport", "Water plants", "Pay rent"]
+    yield Workload(
+        module.root_agent,
+        _conversations(options, lambda rng, _: [f"Add {rng.choice(chores)}."]),
+        lambda: {"tasks_requests": service.requests},
+    )
+
+
+def _article_calls(turn):
+    urls = [url for response in turn.tool_results.get("get_rss_feed", []) for url in response.get("result", [])]
+    return calls("read_rss_feed_article", [{"url": url} for url in urls])
+
+
+def _paragraphs(step: Callable, paragraphs: int) -> Callable:
+    """Splits the text of a scripted step into paragraphs, as a model's summary would be."""
+    def split(turn) -> str:
+        words = step(turn).split()
+        size = -(-len(words) // paragraphs)
+        return "\n\n".join(" ".join(words[i:i + size]) for i in range(0, len(words), size))
+    return split
+
+
+@contextlib.asynccontextmanager
+async def news(options, workdir: str) -> AsyncIterator[Workload]:
+    with FixtureFeedServer(
+        articles=options.articles, article_words=options.article_words,
+        latency_ms=options.service_latency_ms, seed=options.seed,
+    ) as feeds:
+        module = _load("9-news-distribution-multi-agent")
+        logging.getLogger().setLevel(logging.WARNING)
+        def translate(language: str) -> Callable:
+            # A translation is as long as the report it was sent: a chunk of
+            # paragraphs, or the summary in the latest turn of the conversation.
+            def step(turn) -> str:
+                return f"[{language}] {' '.join(turn.user_text.split())}"
+            return step
+
+        use_scripted_models(module.root_agent, {
+            # Each article of the digest (the default NEWS_SUMMARY) is summarized alone.
+            "article_summary_agent": [summarize("- **Story**", words=60)],
+            # Only scripted with NEWS_SUMMARY=agent.
+            "rss_feed_agent": [
+                lambda turn: call("get_rss_feed", feed_url=re.search(r"https?://\S+", turn.user_text).group(0)),
+                _article_calls,
+                # A summary of fixed length, however much of the articles could be read.
+                _paragraphs(
+                    lambda turn: f"Today's news: {fixture_text(random.Random(options.seed), 600)}", paragraphs=6
+                ),
+            ],
+            "BahasaAgent": [translate("Bahasa")],
+            "ThaiAgent": [translate("Thai")],
+            "VietnameseAgent": [translate("Vietnamese")],
+            "page_intro_agent": [summarize("# Today's headlines\n", words=40)],
+            # Only scripted with NEWS_WEBPAGE=llm; the templated page needs no model.
+            "generate_webpage": [lambda turn: f"<html><body><pre>{summarize('', 800)(turn)}</pre></body></html>"],
+        })
+        yield Workload(
+            module.root_agent,
+            _conversations(options, lambda rng, _: [f"Summarize the news from {feeds.feed_url}"]),
+            lambda: {"feed_requests": feeds.requests},
+        )
+
+
+def _read_remaining_pages(turn):
+    for response in turn.tool_results.get("search_release_notes_bq", []) + turn.tool_results.get("read_result_page", []):
+        if isinstance(response, dict) and response.get("page", 1) < response.get("page_count", 1):
+            return call("read_result_page", result_id=response["result_id"], page=response["page"] + 1)
+    return summarize("Release notes by product:", words=400)(turn)
+
+
+@contextlib.asynccontextmanager
+async def release_notes(options, workdir: str, pipeline: str) -> AsyncIterator[Workload]:
+    os.environ["RELEASE_NOTES_PIPELINE"] = pipeline
+    async with _toolbox(options, workdir) as server:
+        module = _load("10-gcp-release-notes-multi-agent")
+        agent = module.sequential_root_agent if pipeline == "sequential" else module.fan_out_root_agent
+        use_scripted_models(agent, {
+            "google_release_notes_agent": [call("search_release_notes_bq"), _read_remaining_pages],
+        })
+        yield Workload(
+            agent,
+            _conversations(options, lambda rng, _: ["What changed in Google Cloud today?"]),
+            lambda: {"toolbox_queries": sum(server.calls.values())},
+        )
+        await module.tools.close()
+
+
+PIPELINES = {
+    "1-helpful-assistant": helpful_assistant,
+    "2-travel-planner": travel_planner,
+    "3-travel-planner-pdf": travel_planner_pdf,
+    "4-renovation": renovation,
+    "5-google-search": google_search,
+    "6-rag": rag,
+    "7-hotels": hotels,
+    "8-google-tasks": google_tasks,
+    "9-news": news,
+    "10-release-notes-fanout": lambda options, workdir: release_notes(options, workdir, "fanout"),
+    "10-release-notes-sequential": lambda options, workdir: release_notes(options, workdir, "sequential"),
+}
+
+
+# --- Running ---------------------------------------------------------------------
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_conversation(
+    send: Callable[[str, types.Content], AsyncIterator], user_id: str, messages: list[str], stats: RunStats
+) -> None:
+    started, stream = time.perf_counter(), TextStream()
+    for text in messages:
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for event in send(user_id, message):
+            if started is not None and stream.update(event):
+                stats.first_text_ms.append(1000 * (time.perf_counter() - started))
+                started = None
+            stats.tool_calls += len(event.get_function_calls())
+            if event.error_code:
+                stats.errors.append(f"{event.author}: {event.error_code} {event.error_message}")
+
+
+def _conversation_sender(runner: Runner, run_config: RunConfig, serving: str) -> Callable[[], Callable]:
+    """Returns a factory of `send(user_id, message)` functions, one per conversation.
+
+    shared: one runner, a new session per conversation.
+    per-query: a new runner and session per conversation, as a simple CLI does.
+    """
+    def conversation() -> Callable:
+        session_id, conversation_runner = None, runner
+
+        async def send(user_id: str, message: types.Content) -> AsyncIterator:
+            nonlocal session_id, conversation_runner
+            if session_id is None:
+                if serving == "per-query":
+                    conversation_runner = Runner(
+                        agent=runner.agent, app_name=runner.app_name,
+                        artifact_service=runner.artifact_service, session_service=runner.session_service,
+                    )
+                session = await runner.session_service.create_session(app_name=runner.app_name, user_id=user_id)
+                session_id = session.id
+            async for event in conversation_runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=message, run_config=run_config
+            ):
+                yield event
+        return send
+    return conversation
+
+
+async def run_pipeline(name: str, options) -> dict:
+    """Runs one pipeline in this process and returns its measurements."""
+    ScriptedModel.default_latency_ms = options.model_latency_ms
+    ScriptedModel.default_chunk_latency_ms = options.model_chunk_ms
+    run_config = streaming_run_config() if options.streaming else RunConfig()
+    # Every run repeats the same inputs, so memoized agents would answer all but
+    # the first from the store; they are measured only with --agent-memo.
+    os.environ["AGENT_MEMO"] = "on" if options.agent_memo else "off"
+    LLMRegistry.register(ScriptedModel)
+    with tempfile.TemporaryDirectory(prefix="offline-bench-") as workdir:
+        async with PIPELINES[name](options, workdir) as workload:
+            if options.session_service == "compact":
+                from adk_common.sessions import CompactSqliteSessionService
+
+                runner = Runner(
+                    agent=workload.agent, app_name="bench", artifact_service=InMemoryArtifactService(),
+                    session_service=CompactSqliteSessionService(os.path.join(workdir, "sessions.db")),
+                )
+            else:
+                runner = InMemoryRunner(agent=workload.agent, app_name="bench")
+            pool = None
+            if options.serving == "pool":
+                # Runs share a fixed set of runners and are admitted per user.
+                pool = await RunnerPool(
+                    workload.agent, "bench", runners=options.concurrency, max_queue=max(64, 2 * options.concurrency),
+                    max_user_requests=options.concurrency, session_service=runner.session_service,
+                    artifact_service=runner.artifact_service, run_config=run_config,
+                ).start()
+
+                def conversation() -> Callable:
+                    # A run is one conversation, so each gets its own session of a returning user.
+                    session_id = uuid.uuid4().hex
+                    return lambda user_id, message: pool.run(user_id, message, session_id=session_id)
+                user = lambda index: f"user{index % options.users}"
+            else:
+                conversation = _conversation_sender(runner, run_config, options.serving)
+                user = lambda index: f"user{index}"
+            stats = RunStats()
+            for messages in workload.conversations[:options.warmup]:
+                await _run_conversation(conversation(), "warmup", messages, stats)
+            rss_after_warmup = peak_rss_mb()
+            stats = RunStats()
+            model_calls = ScriptedModel.calls
+
+            async def turn(index: int, messages: list[str]) -> None:
+                await _run_conversation(conversation(), user(index), messages, stats)
+
+            samples, elapsed = await _run_turns(
+                options.concurrency, workload.conversations[options.warmup:], turn
+            )
+            if pool is not None:
+                await pool.close()
+            services = workload.services()
+            model_calls = ScriptedModel.calls - model_calls
+    runs = len(samples)
+    return {
+        "pipeline": name,
+        "runs": runs,
+        "concurrency": options.concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "runs_per_second": round(runs / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": percentiles(samples),
+        "first_text_ms": percentiles(stats.first_text_ms),
+        "model_calls_per_run": round(model_calls / runs, 2) if runs else 0.0,
+        "tool_calls_per_run": round(stats.tool_calls / runs, 2) if runs else 0.0,
+        "errors": stats.errors[:10],
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_after_warmup_mb": rss_after_warmup,
+        "services": services,
+        **({"agent_memo": agent_memo.stats()} if options.agent_memo else {}),
+    }
+
+
+def run_isolated(name: str, argv: list[str]) -> dict:
+    """Runs one pipeline in a fresh interpreter, so peak RSS and imports are its own."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.offline_suite", "--child", name, *argv],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=3600,
+    )
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    errors = [line for line in completed.stderr.splitlines() if line.strip()]
+    return {"pipeline": name, "error": errors[-1] if errors else f"exit status {completed.returncode}"}
+
+
+def print_report(results: list[dict]) -> None:
+    print(f"{'pipeline':<30} {'runs/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'first':>9} "
+          f"{'model':>6} {'tools':>6} {'RSS MB':>8}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['pipeline']:<30} FAILED ({result['error']})")
+            continue
+        latency = result["latency_ms"]
+        print(f"{result['pipeline']:<30} {result['runs_per_second']:>8.2f} {latency.get('p50', 0):>9.1f} "
+              f"{latency.get('p95', 0):>9.1f} {latency.get('p99', 0):>9.1f} "
+              f"{result.get('first_text_ms', {}).get('p50', 0):>9.1f} {result['model_calls_per_run']:>6.1f} "
+              f"{result['tool_calls_per_run']:>6.1f} {result['peak_rss_mb']:>8.1f}")
+        for error in result["errors"]:
+            print(f"    error: {error}")
+
+
+def check_regressions(
+    results: list[dict], baseline: dict, tolerance: float, min_regression_ms: float, min_regression_mb: float
+) -> list[str]:
+    regressions = []
+    for result in results:
+        expected = baseline.get(result["pipeline"])
+        if expected is None or "error" in result:
+            continue
+        checks = [
+            ("p95 latency", result["latency_ms"].get("p95", 0.0), expected["p95_ms"], min_regression_ms, "ms"),
+            ("peak RSS", result["peak_rss_mb"], expected["peak_rss_mb"], min_regression_mb, "MB"),
+        ]
+        for label, value, reference, minimum, unit in checks:
+            allowed = max(reference * (1 + tolerance), reference + minimum)
+            if value > allowed:
+                regressions.append(f"{result['pipeline']}: {label} {value:.1f} {unit}, "
+                                   f"baseline {reference:.1f} {unit} (allowed {allowed:.1f} {unit})")
+        floor = expected["runs_per_second"] / (1 + tolerance)
+        if result["runs_per_second"] < floor:
+            regressions.append(f"{result['pipeline']}: {result['runs_per_second']:.2f} runs/s, "
+                               f"baseline {expected['runs_per_second']:.2f} (allowed {floor:.2f})")
+    return regressions
+
+
+def _baseline_entry(result: dict) -> dict:
+    return {
+        "p95_ms": result["latency_ms"].get("p95", 0.0),
+        "runs_per_second": result["runs_per_second"],
+        "peak_rss_mb": result["peak_rss_mb"],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the agent pipelines.")
+    parser.add_argument("pipelines", nargs="*", help="Pipeline names or prefixes; all pipelines by default.")
+    parser.add_argument("--runs", type=int, default=20, help="Measured runs per pipeline.")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured runs before the measured ones.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at the same time.")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Scripted model latency per call.")
+    parser.add_argument("--service-latency-ms", type=float, default=0.0,
+                        help="Latency of the feed, Tasks and toolbox stand-ins per request.")
+    parser.add_argument("--articles", type=int, default=8, help="Articles in the fixture RSS feed.")
+    parser.add_argument("--article-words", type=int, default=800)
+    parser.add_argument("--documents", type=int, default=40, help="Fixture documents in the RAG index.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--streaming", action="store_true",
+                        help="Run with SSE streaming; the report's 'first' column is the time to the first text.")
+    parser.add_argument("--model-chunk-ms", type=float, default=0.0,
+                        help="Scripted model delay per 200-character chunk of text, streamed or not.")
+    parser.add_argument("--agent-memo", action="store_true",
+                        help="Memoize agent answers (adk_common/memoize.py); repeated runs are then served from the store.")
+    parser.add_argument("--serving", choices=["shared", "per-query", "pool"], default="shared",
+                        help="One shared runner, a new runner per conversation, or a RunnerPool with per-user sessions.")
+    parser.add_argument("--users", type=int, default=16, help="Users the conversations belong to with --serving pool (for the per-user limits).")
+    parser.add_argument("--session-service", choices=["memory", "compact"], default="memory",
+                        help="In-memory sessions, or the SQLite service of adk_common/sessions.py.")
+    parser.add_argument("--json", help="Write the full results to this file.")
+    parser.add_argument("--save-baseline", help="Write p95 latency, throughput and peak RSS to this file.")
+    parser.add_argument("--baseline", help="Fail if a pipeline regressed against this baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression.")
+    parser.add_argument("--min-regression-ms", type=float, default=20.0, help="Ignore smaller latency regressions.")
+    parser.add_argument("--min-regression-mb", type=float, default=16.0, help="Ignore smaller RSS regressions.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        logging.basicConfig(level=logging.WARNING)
+        print(json.dumps(asyncio.run(run_pipeline(args.child, args))))
+        return 0
+
+    names = [
+        name for name in PIPELINES
+        if not args.pipelines or any(name == p or name.startswith(p) for p in args.pipelines)
+    ]
+    if not names:
+        parser.error(f"no pipeline matches {args.pipelines}; choose from {', '.join(PIPELINES)}")
+    child_argv = [
+        f"--runs={args.runs}", f"--warmup={args.warmup}", f"--concurrency={args.concurrency}",
+        f"--model-latency-ms={args.model_latency_ms}", f"--service-latency-ms={args.service_latency_ms}",
+        f"--articles={args.articles}", f"--article-words={args.article_words}",
+        f"--documents={args.documents}", f"--seed={args.seed}", f"--session-service={args.session_service}",
+        f"--model-chunk-ms={args.model_chunk_ms}", *(["--streaming"] if args.streaming else []),
+        *(["--agent-memo"] if args.agent_memo else []), f"--serving={args.serving}", f"--users={args.users}",
+    ]
+    results = []
+    for name in names:
+        started = time.perf_counter()
+        results.append(run_isolated(name, child_argv))
+        print(f"{name}: done in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({r["pipeline"]: _baseline_entry(r) for r in results if "error" not in r}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = check_regressions(
+                results, json.load(f), args.tolerance, args.min_regression_ms, args.min_regression_mb
+            )
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"    {regression}")
+            return 1
+    return 0 if all("error" not in r for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""Load benchmark for the toolbox-backed agents (projects 7 and 10).
+
+Starts the fake toolbox server in-process (see benchmarks/fake_toolbox.py),
+then drives concurrent conversations through the real agents with a scripted
+stand-in model, so every turn goes through the ADK runner, the pooled toolbox
+client, the result cache and paging exactly as in production:
+
+    python -m benchmarks.toolbox_load --agent hotels --sessions 32 --turns 500 --latency-ms 40
+    python -m benchmarks.toolbox_load --agent release-notes --cache off --json results.json
+
+Reports turn and tool-call throughput plus p50/p95/p99 latencies. `--mode direct`
+skips the agents and measures raw tool calls through the toolset.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import tempfile
+import time
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmarks.fake_toolbox import CITIES, HOTEL_KINDS, HOTEL_WORDS, FakeToolboxServer
+
+BENCH_MODEL = "bench-scripted"
+# Set from --model-latency-ms; agents create their model instances from the name.
+MODEL_LATENCY_MS = 0.0
+AGENT_MODULES = {
+    "hotels": "7-bigquery-mcp-toolbox-agent.agent",
+    "release-notes": "10-gcp-release-notes-multi-agent.agent",
+}
+
+
+class ScriptedLlm(BaseLlm):
+    """Stand-in model: calls the first available tool once per turn, then answers.
+
+    Every required string parameter of the tool gets the user message, so the
+    query text decides which rows come back.
+    """
+
+    model: str = BENCH_MODEL
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"bench-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if MODEL_LATENCY_MS:
+            await asyncio.sleep(MODEL_LATENCY_MS / 1000)
+        last = llm_request.contents[-1] if llm_request.contents else None
+        answered = last is not None and any(part.function_response for part in last.parts or [])
+        tools = [t for name, t in llm_request.tools_dict.items() if name != "read_result_page"]
+        if answered or not tools:
+            part = types.Part(text="Done.")
+        else:
+            tool = tools[0]
+            declaration = tool._get_declaration()
+            required = (declaration.parameters.required or []) if declaration and declaration.parameters else []
+            user_text = _user_text(llm_request)
+            part = types.Part(function_call=types.FunctionCall(
+                name=tool.name, args={name: user_text for name in required}
+            ))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def _user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents):
+        if content.role == "user":
+            for part in content.parts or []:
+                if part.text:
+                    return part.text
+    return ""
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Returns count, mean and nearest-rank p50/p95/p99/max of millisecond samples."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))], 2)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": rank(50),
+        "p95": rank(95),
+        "p99": rank(99),
+        "max": round(ordered[-1], 2),
+    }
+
+
+def hotel_queries(count: int, seed: int) -> list[str]:
+    """Skewed mix of city and hotel-name queries, so a cache sees realistic repeats."""
+    rng = random.Random(seed)
+    vocabulary = CITIES + HOTEL_WORDS + HOTEL_KINDS
+    # Zipf-like weights: the first terms are asked far more often than the last.
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return rng.choices(vocabulary, weights=weights, k=count)
+
+
+class ToolTimer:
+    """Wraps a toolset's `call` to record the latency of every tool call."""
+
+    def __init__(self, toolset):
+        self.samples: list[float] = []
+        self.errors = 0
+        self._call = toolset.call
+        toolset.call = self.call
+
+    async def call(self, tool_name: str, args: dict, agent_name: Optional[str] = None):
+        started = time.perf_counter()
+        try:
+            return await self._call(tool_name, args, agent_name=agent_name)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.samples.append(1000 * (time.perf_counter() - started))
+
+
+async def _run_turns(sessions: int, queries: list[str], turn) -> tuple[list[float], float]:
+    """Runs `turn(session_index, query)` for every query with `sessions` concurrent workers."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for query in queries:
+        queue.put_nowait(query)
+    samples: list[float] = []
+
+    async def worker(index: int) -> None:
+        while not queue.empty():
+            query = queue.get_nowait()
+            started = time.perf_counter()
+            await turn(index, query)
+            samples.append(1000 * (time.perf_counter() - started))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(sessions)))
+    return samples, time.perf_counter() - started
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    os.environ["TOOLBOX_CACHE"] = args.cache
+    os.environ.setdefault("TOOLBOX_MANIFEST_DIR", tempfile.mkdtemp(prefix="toolbox-manifests-"))
+    server = FakeToolboxServer(
+        port=0, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        hotels=args.hotels, release_notes=args.release_notes, seed=args.seed,
+    )
+    async with server:
+        os.environ["TOOLBOX_URL"] = server.url
+        module = importlib.import_module(AGENT_MODULES[args.agent])
+        timer = ToolTimer(module.tools)
+        if args.agent == "hotels":
+            queries = hotel_queries(args.turns, args.seed)
+            direct_tool, direct_param = "search-hotels-by-location", "location"
+        else:
+            queries = ["What changed in Google Cloud today?"] * args.turns
+            direct_tool, direct_param = "search_release_notes_bq", None
+
+        if args.mode == "direct":
+            async def turn(_index: int, query: str) -> None:
+                await module.tools.call(direct_tool, {direct_param: query} if direct_param else {})
+        else:
+            global MODEL_LATENCY_MS
+            MODEL_LATENCY_MS = args.model_latency_ms
+            LLMRegistry.register(ScriptedLlm)
+            agent = module.root_agent
+            _use_model(agent)
+            runner = InMemoryRunner(agent=agent, app_name="bench")
+            session_ids = [
+                (await runner.session_service.create_session(app_name="bench", user_id=f"user{i}")).id
+                for i in range(args.sessions)
+            ]
+
+            async def turn(index: int, query: str) -> None:
+                message = types.Content(role="user", parts=[types.Part(text=query)])
+                async for _ in runner.run_async(user_id=f"user{index}", session_id=session_ids[index], new_message=message):
+                    pass
+
+        # One warm-up call loads the toolset manifest and opens the connection pool.
+        # It bypasses the result cache so the measured run starts cold.
+        await module.tools.pool.invoke(module.tools.toolset_name, direct_tool,
+                                       {direct_param: queries[0]} if direct_param else {})
+        turn_samples, elapsed = await _run_turns(args.sessions, queries, turn)
+        await module.tools.close()
+
+    return {
+        "agent": args.agent,
+        "mode": args.mode,
+        "cache": args.cache,
+        "sessions": args.sessions,
+        "turns": len(turn_samples),
+        "injected_latency_ms": [args.latency_ms, args.jitter_ms],
+        "elapsed_seconds": round(elapsed, 3),
+        "turns_per_second": round(len(turn_samples) / elapsed, 2),
+        "tool_calls_per_second": round(len(timer.samples) / elapsed, 2),
+        "tool_errors": timer.errors,
+        "server_queries": sum(server.calls.values()),
+        "turn_latency_ms": percentiles(turn_samples),
+        "tool_latency_ms": percentiles(timer.samples),
+        "result_cache": module.result_cache.stats() if module.result_cache is not None else None,
+    }
+
+
+def _use_model(agent) -> None:
+    """Points every agent in the tree that has a model (including fan-out pipelines) at the scripted one."""
+    if hasattr(agent, "model"):
+        agent.model = BENCH_MODEL
+    for sub_agent in agent.sub_agents:
+        _use_model(sub_agent)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Tool-call load benchmark against the fake toolbox server.")
+    parser.add_argument("--agent", choices=sorted(AGENT_MODULES), default="hotels")
+    parser.add_argument("--mode", choices=["agent", "direct"], default="agent")
+    parser.add_argument("--cache", choices=["on", "off"], default="on", help="Tool result cache (TOOLBOX_CACHE).")
+    parser.add_argument("--sessions", type=int, default=16, help="Concurrent conversations.")
+    parser.add_argument("--turns", type=int, default=200, help="Total user turns across all sessions.")
+    parser.add_argument("--latency-ms", type=float, default=25.0, help="Injected toolbox latency per call.")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Scripted model latency per call.")
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--release-notes", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(benchmark(args))
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Custom service URI schemes for `adk web` / `adk api_server` run from this folder.
+
+    adk web --session_service_uri "compactsqlite:///tmp/adk_sessions.db?ttl_seconds=86400"
+
+See adk_common/sessions.py.
+"""
+from google.adk.cli.service_registry import get_service_registry
+
+from adk_common.sessions import session_service_from_uri
+
+get_service_registry().register_session_service("compactsqlite", session_service_from_uri)